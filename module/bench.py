@@ -0,0 +1,274 @@
+# ======================================================== 섹션별 벤치마크 =============================================================
+# 합성 데이터(synth_data.py)를 크기별로 만들고, 페이지의 무거운 계산을 섹션마다 따로 돌려서
+# 걸린 시간(wall / CPU)과 최대 메모리(tracemalloc peak)를 JSON 리포트로 남긴다.
+# 릴리스마다 리포트를 남겨 두고 --compare로 비교한다.
+#   - 시간은 --repeat 번 돌린 중앙값 (tracemalloc 없이), 메모리는 tracemalloc을 켜고 한 번 더 돌린 값
+#   - 캐시(data/.cache, 차트 캐시)를 거치지 않고 계산 자체만 잰다
+#
+#   python module/bench.py --rows 10k 1m                     # data/synth 에 없으면 먼저 생성
+#   python module/bench.py --rows 10m --sections km_fit corr
+#   python module/bench.py --compare data/bench/old.json data/bench/benchmark.json
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from churn_data import read_csv_compact
+from synth_data import SYNTH_DIR, dataset_path, parse_size, write_dataset
+
+BENCH_OUT = "data/bench/benchmark.json"
+REPORT_VERSION = 1
+REPEAT = 3
+
+LONG_TERM_MONTHS = 6
+
+
+# ======================================================== 섹션 =================================================================
+# 각 섹션: (데이터프레임, 이전 섹션 결과 dict) → 결과 (다음 섹션이 쓸 값만)
+def _km_fit(df, state):
+    from survival import km_curves
+    return km_curves(df['AccountAge'], df['Churn'], df['AccountAge'] >= LONG_TERM_MONTHS)
+
+
+def _qcut_groupby(df, state):
+    from churn_cube import ChurnCube
+    cube = ChurnCube.build(df)
+    return [cube.rate_by(dim) for dim in ('3개월구간', '시청구간', '요금제')]
+
+
+def _corr(df, state):
+    from churn_model import FEATURES
+    return df[list(FEATURES) + ['Churn']].corr()
+
+
+def _logistic_fit(df, state):
+    from churn_model import fit_model
+    fitted = fit_model(df)
+    state['scoring_params'] = {
+        'features': fitted['features'],
+        'mean': fitted['scaler'].mean_.tolist(),
+        'scale': fitted['scaler'].scale_.tolist(),
+        'coef': fitted['model'].coef_[0].tolist(),
+        'intercept': float(fitted['model'].intercept_[0]),
+    }
+    return fitted
+
+
+def _risk_scoring(df, state):
+    from risk_scoring import calibrate, fit_calibration, raw_probability, risk_tier
+    params = state['scoring_params']
+    raw = raw_probability(df[params['features']].to_numpy(dtype=np.float32), params)
+    prob = calibrate(raw, fit_calibration(raw, df['Churn'].to_numpy(dtype=np.float64)))
+    return risk_tier(prob)
+
+
+def _kmeans(df, state):
+    from segmentation import SEG_FEATURES, assign_segments, fit_segments
+    model = fit_segments(df)
+    return assign_segments(df[SEG_FEATURES].to_numpy(dtype=np.float64), model)
+
+
+def _simulation(df, state):
+    from policy_sim import monte_carlo_policy
+    return monte_carlo_policy(df['AccountAge'], df['ViewingHoursPerWeek'],
+                              fracs=[0.2, 0.3, 0.4, 0.5, 0.6], max_tenures=[3, 6],
+                              viewing_cutoffs=[10, 15], seed=42)
+
+
+def _figure_render(df, state):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from figure_cache import SAVEFIG_OPTIONS
+    from survival import km_curves, plot_km
+
+    curves = state.get('km') or km_curves(df['AccountAge'], df['Churn'], df['AccountAge'] >= LONG_TERM_MONTHS)
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for label, curve in curves.items():
+        plot_km(ax, curve, label=str(label))
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', **SAVEFIG_OPTIONS)
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+
+SECTIONS = {
+    'km_fit': _km_fit,
+    'qcut_groupby': _qcut_groupby,
+    'corr': _corr,
+    'logistic_fit': _logistic_fit,
+    'risk_scoring': _risk_scoring,
+    'kmeans': _kmeans,
+    'simulation': _simulation,
+    'figure_render': _figure_render,
+}
+# 다른 섹션 결과가 필요한 섹션
+REQUIRES = {'risk_scoring': 'logistic_fit'}
+
+
+# ======================================================== 측정 =================================================================
+def _measure(fn, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def _peak_mb(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def max_rss_mb():
+    # 프로세스 최대 RSS (resource 모듈이 없는 Windows는 None)
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 byte, Linux는 KB
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+
+def bench_dataset(path, sections, repeat=REPEAT):
+    result = {'path': path, 'sections': {}}
+
+    load = [_measure(read_csv_compact, path) for _ in range(repeat)]
+    df = load[-1][0]
+    result['rows'] = len(df)
+    result['sections']['load_csv'] = {
+        'seconds': round(float(np.median([w for _, w, _ in load])), 4),
+        'cpu_seconds': round(float(np.median([c for _, _, c in load])), 4),
+        'peak_mb': round(_peak_mb(read_csv_compact, path), 2),
+    }
+
+    state = {}
+    for name in sections:
+        if name in REQUIRES and REQUIRES[name] not in state:
+            SECTIONS[REQUIRES[name]](df, state)
+            state[REQUIRES[name]] = True
+        runs = [_measure(SECTIONS[name], df, state) for _ in range(repeat)]
+        state[name] = runs[-1][0]
+        if name == 'km_fit':
+            state['km'] = runs[-1][0]
+        result['sections'][name] = {
+            'seconds': round(float(np.median([w for _, w, _ in runs])), 4),
+            'cpu_seconds': round(float(np.median([c for _, _, c in runs])), 4),
+            'peak_mb': round(_peak_mb(SECTIONS[name], df, state), 2),
+        }
+    result['total_seconds'] = round(sum(s['seconds'] for s in result['sections'].values()), 4)
+    rss = max_rss_mb()
+    result['max_rss_mb'] = round(rss, 1) if rss is not None else None
+    return result
+
+
+def environment():
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    try:
+        import sklearn
+        env['sklearn'] = sklearn.__version__
+    except ImportError:
+        pass
+    try:
+        env['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                       text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return env
+
+
+def run(sizes, sections=None, repeat=REPEAT, synth_dir=SYNTH_DIR, seed=42):
+    sections = list(sections or SECTIONS)
+    report = {
+        'version': REPORT_VERSION,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment(),
+        'repeat': repeat,
+        'datasets': {},
+    }
+    for size in sizes:
+        path = dataset_path(size, synth_dir)
+        if not os.path.exists(path):
+            write_dataset(path, parse_size(size), seed)
+        report['datasets'][size] = bench_dataset(path, sections, repeat)
+    return report
+
+
+def write_report(report, out=BENCH_OUT):
+    folder = os.path.dirname(out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, out)
+    return out
+
+
+# ======================================================== 출력 / 비교 =================================================================
+def format_report(report):
+    lines = []
+    for size, data in report['datasets'].items():
+        rss = f", max RSS {data['max_rss_mb']:.0f} MB" if data.get('max_rss_mb') is not None else ''
+        lines.append(f"{size} ({data['rows']:,} rows) total {data['total_seconds']:.3f}s{rss}")
+        for name, s in data['sections'].items():
+            lines.append(f"  {name:<16}{s['seconds']:>10.4f}s{s['cpu_seconds']:>10.4f}s cpu{s['peak_mb']:>10.1f} MB")
+    return '\n'.join(lines)
+
+
+def compare(old, new):
+    # 섹션별 시간 / 메모리 비율 (new / old)
+    lines = []
+    for size, data in new['datasets'].items():
+        before = old['datasets'].get(size)
+        if before is None:
+            continue
+        lines.append(f"{size}: total {before['total_seconds']:.3f}s → {data['total_seconds']:.3f}s "
+                     f"(x{data['total_seconds'] / before['total_seconds']:.2f})")
+        for name, s in data['sections'].items():
+            b = before['sections'].get(name)
+            if b is None:
+                lines.append(f"  {name:<16}{'new':>10}")
+                continue
+            time_ratio = s['seconds'] / b['seconds'] if b['seconds'] else float('nan')
+            mem_ratio = s['peak_mb'] / b['peak_mb'] if b['peak_mb'] else float('nan')
+            lines.append(f"  {name:<16}{b['seconds']:>10.4f}s →{s['seconds']:>10.4f}s  x{time_ratio:<6.2f}"
+                         f"{b['peak_mb']:>10.1f} MB →{s['peak_mb']:>8.1f} MB  x{mem_ratio:.2f}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='대시보드 섹션별 시간 / 메모리 벤치마크')
+    parser.add_argument('--rows', nargs='+', default=['10k', '1m'], help='데이터 크기 (10k, 1m, 10m ...)')
+    parser.add_argument('--sections', nargs='+', choices=list(SECTIONS), default=None)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--synth-dir', default=SYNTH_DIR)
+    parser.add_argument('--out', default=BENCH_OUT)
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='두 리포트 비교만 출력')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f_old, open(args.compare[1], encoding='utf-8') as f_new:
+            print(compare(json.load(f_old), json.load(f_new)))
+    else:
+        report = run(args.rows, args.sections, args.repeat, args.synth_dir)
+        print(format_report(report))
+        print(f"→ {write_report(report, args.out)}")
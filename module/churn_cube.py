@@ -0,0 +1,153 @@
+# ======================================================== 이탈 집계 큐브 =============================================================
+# 'reason' 페이지의 groupby 차트들(3개월구간 / 시청구간 / 요금제)을
+# 매번 전체 데이터를 스캔해서 계산하지 않도록,
+# (가입기간 구간 × 시청 5분위 × 요금제 × 구독 유형)별 (고객 수, 이탈 수)를
+# 한 번의 패스로 집계해 data/.cache 에 저장해 둔다.
+# 각 차트는 이 작은 배열을 합산해서 읽기만 한다.
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import CHURN_CSV, artifact_path, dataset_version, load_churn
+from plan_index import filtered_frame, is_filtered
+
+CUBE_NAME = "cube.npz"
+
+TENURE_LABELS = ['3개월 이전', '3개월 이후']
+VIEWING_LABELS = ['매우 낮음', '낮음', '보통', '높음', '매우 높음']
+PRICE_BINS = [0, 12, 17, 25]
+PRICE_LABELS = ['베이직', '스탠다드', '프리미엄']
+
+DIMS = ['3개월구간', '시청구간', '요금제', 'SubscriptionType']
+
+
+def _tenure_codes(account_age):
+    return (np.asarray(account_age) > 3).astype(np.int64)
+
+
+def _viewing_edges(viewing):
+    # pd.qcut(q=5)과 같은 분위 경계
+    return np.nanquantile(np.asarray(viewing, dtype=np.float64), np.linspace(0, 1, 6))
+
+
+def _viewing_codes(viewing, edges):
+    # qcut 구간은 오른쪽 닫힘: (e0, e1], (e1, e2], ... (첫 구간은 최솟값 포함)
+    viewing = np.asarray(viewing, dtype=np.float64)
+    codes = np.searchsorted(edges[1:-1], viewing, side='left')
+    codes[np.isnan(viewing)] = -1
+    return codes
+
+
+def _price_codes(charges):
+    # pd.cut(bins=PRICE_BINS)와 같은 오른쪽 닫힘 구간, 범위 밖/결측은 -1
+    charges = np.asarray(charges, dtype=np.float64)
+    codes = np.searchsorted(PRICE_BINS, charges, side='left') - 1
+    codes[(codes < 0) | (codes >= len(PRICE_LABELS)) | np.isnan(charges)] = -1
+    return codes
+
+
+class ChurnCube:
+    # counts / churned: 각 차원 마지막 칸은 결측(-1) 자리
+
+    def __init__(self, labels, counts, churned, viewing_edges):
+        self.labels = labels
+        self.counts = counts
+        self.churned = churned
+        self.viewing_edges = viewing_edges
+
+    @classmethod
+    def build(cls, df, viewing_edges=None):
+        # viewing_edges: 필터한 일부 데이터로 만들 때 전체 데이터의 시청 분위 경계를 그대로 쓴다
+        edges = _viewing_edges(df['ViewingHoursPerWeek']) if viewing_edges is None else viewing_edges
+        sub = df['SubscriptionType'].astype('category')
+
+        labels = {
+            '3개월구간': TENURE_LABELS,
+            '시청구간': VIEWING_LABELS,
+            '요금제': PRICE_LABELS,
+            'SubscriptionType': [str(c) for c in sub.cat.categories],
+        }
+        codes = [
+            _tenure_codes(df['AccountAge']),
+            _viewing_codes(df['ViewingHoursPerWeek'], edges),
+            _price_codes(df['MonthlyCharges']),
+            sub.cat.codes.to_numpy().astype(np.int64),
+        ]
+
+        shape = tuple(len(labels[d]) + 1 for d in DIMS)
+        # 결측(-1)은 각 차원의 마지막 칸으로 보낸다
+        codes = [np.where(c < 0, n - 1, c) for c, n in zip(codes, shape)]
+        flat = np.ravel_multi_index(codes, shape)
+
+        size = int(np.prod(shape))
+        counts = np.bincount(flat, minlength=size).reshape(shape)
+        churned = np.bincount(flat, weights=np.asarray(df['Churn'], dtype=np.float64),
+                              minlength=size).reshape(shape)
+        return cls(labels, counts, churned, edges)
+
+    # ---------------------------------------------------- 저장 / 읽기
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, counts=self.counts, churned=self.churned,
+                 viewing_edges=self.viewing_edges,
+                 labels=np.array(json.dumps(self.labels, ensure_ascii=False)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(json.loads(str(data['labels'])), data['counts'],
+                       data['churned'], data['viewing_edges'])
+
+    # ---------------------------------------------------- 조회
+    def select(self, **where):
+        # 특정 차원 값으로 자른 큐브 (예: select(요금제='스탠다드'))
+        index = [slice(None)] * len(DIMS)
+        for dim, label in where.items():
+            pos = self.labels[dim].index(label)
+            index[DIMS.index(dim)] = slice(pos, pos + 1)
+        index = tuple(index)
+        return ChurnCube(self.labels, self.counts[index], self.churned[index], self.viewing_edges)
+
+    def rate_by(self, dim):
+        # df.groupby(dim)['이탈여부'].mean() 과 같은 결과 (결측 그룹 제외)
+        axis = DIMS.index(dim)
+        others = tuple(i for i in range(len(DIMS)) if i != axis)
+        counts = self.counts.sum(axis=others)[:-1]
+        churned = self.churned.sum(axis=others)[:-1]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = churned / counts
+        index = pd.CategoricalIndex(self.labels[dim], categories=self.labels[dim],
+                                    ordered=True, name=dim)
+        return pd.Series(rate, index=index, name='이탈여부')
+
+
+@lru_cache(maxsize=4)
+def _load_cube(path, cube_path):
+    if os.path.exists(cube_path):
+        return ChurnCube.load(cube_path)
+    cube = ChurnCube.build(load_churn(path))
+    cube.save(cube_path)
+    return cube
+
+
+@lru_cache(maxsize=16)
+def _filtered_cube(path, version, plan, month):
+    cube = _load_cube(path, artifact_path(path, CUBE_NAME))
+    if month is None:
+        # 요금제만 고르면 저장된 큐브의 SubscriptionType 칸만 잘라 쓴다
+        return cube.select(SubscriptionType=plan)
+    return ChurnCube.build(filtered_frame(path, plan, month), cube.viewing_edges)
+
+
+def load_cube(path=CHURN_CSV, plan=None, month=None):
+    # plan / month: 사이드바 필터 (plan_index 참고)
+    path = os.path.abspath(path)
+    if not is_filtered(path, plan, month):
+        return _load_cube(path, artifact_path(path, CUBE_NAME))
+    return _filtered_cube(path, dataset_version(path), plan, month)
@@ -0,0 +1,238 @@
+# ======================================================== 이탈 데이터 로더 =============================================================
+# 모든 페이지가 같은 CSV를 매 rerun마다 pd.read_csv로 다시 읽지 않도록
+# 한 번만 파싱해서 (파일 경로 + 수정 시각) 기준으로 캐시해 둔다.
+# 반환되는 DataFrame은 여러 페이지/세션이 공유하므로 직접 수정하지 말고,
+# 컬럼을 추가해야 하면 df.copy(deep=False) 후에 사용한다.
+# (값을 덮어쓰면 ValueError가 나도록 배열을 읽기 전용으로 만들어 둔다: read_only)
+#
+# pyarrow가 설치되어 있으면 CSV 옆에 Arrow IPC 스냅샷(.arrow)을 만들어 두고
+# 메모리 맵으로 읽는다. 스냅샷은 CSV의 크기/수정 시각이 바뀔 때만 다시 만든다.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+CHURN_CSV = "data/Rapid_Churn_Reduction_Dataset_v3_price_structure.csv"
+SUBSCRIPTION_CSV = "data/Subscription_Service_Churn_Dataset.csv"
+
+SNAPSHOT_SUFFIX = ".arrow"
+ARTIFACT_DIR = ".cache"
+
+# CSV에 이미 들어있는 한글 파생 컬럼. 읽을 때 버리고 features.py가 원본 컬럼에서 만든다.
+# 저장된 값을 그대로 쓸 수 없는 이유 (v3 CSV 963행 기준):
+#   - 이탈여부: Churn과 417행이 다르다. 페이지 / 모델 / KPI는 모두 Churn 기준
+#   - 요금제: 영어 등급(Basic/Standard/Premium)이 일부 행에만 있고 SubscriptionType과도 다르다.
+#     페이지는 MonthlyCharges 가격대(churn_cube.PRICE_LABELS: 베이직/스탠다드/프리미엄)로 나눈다
+#   - 가입기간 / 장기고객: AccountAge / AccountAge >= 6과 같아서 다시 읽으면 같은 값을 두 벌 들고 있게 된다
+#   - churn_model.append_rows로 붙인 행은 이 컬럼들이 비어 있다
+# 그래서 원본 컬럼(AccountAge, Churn, MonthlyCharges)만 한 벌 저장하고, 파생 컬럼은 데이터 버전별로 한 번만 계산한다.
+DERIVED_COLUMNS = ['가입기간', '이탈여부', '장기고객', '요금제']
+
+# 범주형 컬럼 (문자열 object 대신 category로 저장)
+CATEGORY_COLUMNS = [
+    'SubscriptionType',
+    'PaymentMethod',
+    'ContentType',
+    'DeviceRegistered',
+    'GenrePreference',
+    'Gender',
+]
+
+# Yes/No 컬럼 (결측이 있을 수 있으므로 nullable boolean)
+YES_NO_COLUMNS = [
+    'PaperlessBilling',
+    'MultiDeviceAccess',
+    'ParentalControl',
+    'SubtitlesEnabled',
+]
+
+# 숫자형 컬럼은 값 범위에 맞는 작은 타입으로 읽는다
+NUMERIC_DTYPES = {
+    'AccountAge': 'int16',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    'ViewingHoursPerWeek': 'float32',
+    'AverageViewingDuration': 'float32',
+    'ContentDownloadsPerMonth': 'int16',
+    'UserRating': 'float32',
+    'SupportTicketsPerMonth': 'int8',
+    'WatchlistSize': 'int16',
+    'Churn': 'int8',
+}
+
+
+def _dtypes_for(columns):
+    dtypes = {}
+    for col in columns:
+        if col in NUMERIC_DTYPES:
+            dtypes[col] = NUMERIC_DTYPES[col]
+        elif col in CATEGORY_COLUMNS or col in YES_NO_COLUMNS:
+            dtypes[col] = 'category'
+    return dtypes
+
+
+def _pyarrow():
+    # pyarrow는 선택 의존성: 없으면 CSV를 직접 읽는다
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def read_only(df):
+    # 공유하는 DataFrame의 값 배열을 읽기 전용으로 (df.loc[...] = ... 같은 덮어쓰기는 ValueError)
+    # 범주형 / nullable 컬럼은 안쪽 배열(codes, 값 / 결측 mask)까지 막는다
+    for arr in df._mgr.arrays:
+        for buf in (arr, getattr(arr, '_ndarray', None), getattr(arr, '_data', None), getattr(arr, '_mask', None)):
+            if isinstance(buf, np.ndarray):
+                buf.flags.writeable = False
+    return df
+
+
+def read_csv_compact(path):
+    columns = [c for c in pd.read_csv(path, nrows=0).columns if c not in DERIVED_COLUMNS]
+    df = pd.read_csv(path, usecols=columns, dtype=_dtypes_for(columns))
+
+    for col in YES_NO_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map({'Yes': True, 'No': False}).astype('boolean')
+    return df
+
+
+def to_csv_rows(rows, columns):
+    # CSV 뒤에 붙일 행을 기존 컬럼 순서 / 타입에 맞춘다 (맞출 수 없는 값이면 ValueError)
+    #   - 숫자 컬럼은 NUMERIC_DTYPES로 변환 (정수 컬럼에 소수나 범위를 넘는 값이 있으면 거부)
+    #   - Yes/No 컬럼은 True/False도 받아서 'Yes'/'No'로 쓴다
+    #   - rows에 없는 컬럼은 빈 값(결측)으로 쓴다. 단 정수 컬럼은 결측이 있으면 읽을 수 없으므로 빠지면 거부
+    unknown = [c for c in rows.columns if c not in columns]
+    if unknown:
+        raise ValueError(f"CSV에 없는 컬럼: {unknown}")
+    required = [c for c in columns if NUMERIC_DTYPES.get(c, '').startswith('int')]
+    missing = [c for c in required if c not in rows.columns or rows[c].isna().any()]
+    if missing:
+        raise ValueError(f"결측이 허용되지 않는 정수 컬럼이 없거나 비어 있습니다: {missing}")
+
+    out = pd.DataFrame(index=rows.index)
+    for col in columns:
+        if col not in rows.columns:
+            out[col] = pd.Series(pd.NA, index=rows.index, dtype='object')
+        elif col in NUMERIC_DTYPES:
+            dtype = NUMERIC_DTYPES[col]
+            values = pd.to_numeric(rows[col], errors='coerce')
+            if (values.isna() & rows[col].notna()).any():
+                raise ValueError(f"{col}: 숫자가 아닌 값이 있습니다")
+            try:
+                # nullable 정수로 바꾸면 소수 / 범위 초과는 TypeError
+                out[col] = values.astype(dtype.capitalize() if dtype.startswith('int') else dtype)
+            except TypeError:
+                raise ValueError(f"{col}: {dtype}로 저장할 수 없는 값이 있습니다") from None
+        elif col in YES_NO_COLUMNS:
+            values = rows[col].map({True: 'Yes', False: 'No', 'Yes': 'Yes', 'No': 'No'})
+            if (values.isna() & rows[col].notna()).any():
+                raise ValueError(f"{col}: Yes/No가 아닌 값이 있습니다")
+            out[col] = values
+        else:
+            out[col] = rows[col].astype('string')
+    return out
+
+
+def iter_csv_chunks(path, usecols, chunksize):
+    # 메모리에 다 올리지 않고 필요한 컬럼만 chunksize 행씩 읽는다
+    return pd.read_csv(path, usecols=usecols, dtype=_dtypes_for(usecols), chunksize=chunksize)
+
+
+# ======================================================== 스냅샷 =================================================================
+def snapshot_path(path):
+    return os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+
+
+def _source_tag(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def dataset_version(path=CHURN_CSV):
+    # 원본 CSV가 바뀌면 달라지는 짧은 버전 문자열 (집계/모델 캐시 키로 사용)
+    stat = os.stat(path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def artifact_path(path, name):
+    # 데이터에서 파생된 결과물은 data/.cache/<파일명>.<버전>.<name> 에 저장한다
+    path = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    folder = os.path.join(os.path.dirname(path), ARTIFACT_DIR)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{stem}.{dataset_version(path)}.{name}")
+
+
+def _snapshot_is_fresh(pa, path, snap):
+    if not os.path.exists(snap):
+        return False
+    try:
+        with pa.memory_map(snap) as source:
+            meta = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return meta.get(b'source') == _source_tag(path).encode()
+
+
+def build_snapshot(path):
+    pa = _pyarrow()
+    snap = snapshot_path(path)
+    tag = _source_tag(path)
+
+    table = pa.Table.from_pandas(read_csv_compact(path), preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[b'source'] = tag.encode()
+    table = table.replace_schema_metadata(meta)
+
+    # 메모리 맵으로 그대로 읽을 수 있도록 압축하지 않고, 임시 파일에 쓴 뒤 교체한다
+    tmp = f"{snap}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, snap)
+    return snap
+
+
+@lru_cache(maxsize=8)
+def _ensure_snapshot(path, tag):
+    # tag(크기:수정 시각)가 바뀌었을 때만 스냅샷 메타데이터를 다시 확인한다
+    pa = _pyarrow()
+    snap = snapshot_path(path)
+    if not _snapshot_is_fresh(pa, path, snap):
+        build_snapshot(path)
+    return snap
+
+
+def ensure_snapshot(path):
+    return _ensure_snapshot(path, _source_tag(path))
+
+
+@lru_cache(maxsize=4)
+def _read_snapshot(snap, mtime_ns):
+    pa = _pyarrow()
+    # split_blocks: 결측 없는 숫자 컬럼은 메모리 맵을 복사 없이 그대로 쓴다 (읽기 전용)
+    # 메모리 맵은 테이블 버퍼가 참조하고 있으므로 닫지 않는다
+    table = pa.ipc.open_file(pa.memory_map(snap)).read_all()
+    return read_only(table.to_pandas(split_blocks=True))
+
+
+@lru_cache(maxsize=4)
+def _read_churn(path, mtime_ns):
+    # mtime_ns는 캐시 키로만 사용 (파일이 바뀌면 새로 읽음)
+    return read_only(read_csv_compact(path))
+
+
+def load_churn(path=CHURN_CSV):
+    path = os.path.abspath(path)
+    if _pyarrow() is None:
+        return _read_churn(path, os.stat(path).st_mtime_ns)
+
+    snap = ensure_snapshot(path)
+    return _read_snapshot(snap, os.stat(snap).st_mtime_ns)
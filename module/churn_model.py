@@ -0,0 +1,208 @@
+# ======================================================== 이탈 원인 중요도 모델 =============================================================
+# 'reason' 페이지 6번 섹션의 StandardScaler + LogisticRegression을
+# 페이지를 열 때마다 다시 학습하지 않도록, 데이터 버전별로 한 번만 학습해서
+# data/.cache 에 joblib으로 저장하고 이후에는 불러와서 쓴다.
+#
+# CSV가 ONLINE_MIN_BYTES보다 크면 전체를 메모리에 올리지 않고
+# chunk 단위로 읽으면서 StandardScaler.partial_fit + SGDClassifier(log_loss).partial_fit
+# 으로 학습한다 (온라인 모드). 온라인 모델은 새로 들어온 행만으로 이어서 학습할 수 있다.
+
+import copy
+import json
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from churn_data import CHURN_CSV, artifact_path, dataset_version, iter_csv_chunks, load_churn, to_csv_rows
+from lazy_import import lazy
+from plan_index import filtered_frame, is_filtered
+
+MODEL_NAME = "importance_model.joblib"
+# 차트에는 계수만 필요하므로 따로 저장해 두면 sklearn을 import하지 않아도 된다
+COEF_NAME = "importance_coef.json"
+PARAMS_NAME = "scoring_params.json"
+
+# 이 크기(byte)를 넘는 CSV는 온라인 모드로 학습
+ONLINE_MIN_BYTES = 512 * 1024 * 1024
+ONLINE_CHUNKSIZE = 200_000
+
+# 모델 입력 변수 (컬럼명: 화면 표시 이름)
+FEATURES = {
+    'ViewingHoursPerWeek':'주간 시청 시간',
+    'SupportTicketsPerMonth':'월 문의 횟수',
+    'MonthlyCharges':'월 요금',
+    'ContentDownloadsPerMonth':'월 다운로드 수',
+    'WatchlistSize':'찜 목록 크기',
+}
+
+
+def fit_model(df):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X = df[list(FEATURES.keys())]
+    y = df['Churn']
+    mask = X.notna().all(axis=1)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X[mask])
+
+    model = LogisticRegression()
+    model.fit(X_scaled, y[mask])
+    return {'features': list(FEATURES.keys()), 'scaler': scaler, 'model': model,
+            'mode': 'batch', 'rows_seen': int(mask.sum())}
+
+
+# ======================================================== 온라인 학습 =================================================================
+def new_online_model():
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    return {'features': list(FEATURES.keys()), 'scaler': StandardScaler(),
+            'model': SGDClassifier(loss='log_loss', random_state=42),
+            'mode': 'online', 'rows_seen': 0}
+
+
+def partial_fit(fitted, chunk):
+    # chunk 하나로 스케일러 통계와 모델을 이어서 갱신 (fitted를 직접 수정)
+    chunk = chunk.dropna(subset=fitted['features'] + ['Churn'])
+    if chunk.empty:
+        return fitted
+
+    X = chunk[fitted['features']].to_numpy(dtype='float64')
+    y = chunk['Churn'].to_numpy()
+
+    fitted['scaler'].partial_fit(X)
+    fitted['model'].partial_fit(fitted['scaler'].transform(X), y, classes=[0, 1])
+    fitted['rows_seen'] += len(chunk)
+    return fitted
+
+
+def fit_online(path, chunksize=ONLINE_CHUNKSIZE):
+    fitted = new_online_model()
+    for chunk in iter_csv_chunks(path, list(FEATURES.keys()) + ['Churn'], chunksize):
+        partial_fit(fitted, chunk)
+    return fitted
+
+
+def fit_for(path):
+    if os.path.getsize(path) >= ONLINE_MIN_BYTES:
+        return fit_online(path)
+    return fit_model(load_churn(path))
+
+
+def _save_model(fitted, model_path):
+    tmp = f"{model_path}.{os.getpid()}.tmp"
+    lazy('joblib').dump(fitted, tmp)
+    os.replace(tmp, model_path)
+
+
+@lru_cache(maxsize=4)
+def _load_model(path, model_path):
+    if os.path.exists(model_path):
+        return lazy('joblib').load(model_path)
+
+    fitted = fit_for(path)
+    _save_model(fitted, model_path)
+    return fitted
+
+
+def load_model(path=CHURN_CSV):
+    path = os.path.abspath(path)
+    return _load_model(path, artifact_path(path, MODEL_NAME))
+
+
+def append_rows(new_rows, path=CHURN_CSV):
+    # 하루치 신규 행을 CSV 뒤에 붙이고, 온라인 모델이면 그 행들로만 이어서 학습한다.
+    # 배치 모델은 데이터 버전이 바뀌었으므로 다음 조회 때 새로 학습된다.
+    # 모델 입력 변수와 Churn(0/1), 그리고 결측 없이 읽는 정수 컬럼(AccountAge 등)이 빠진 행은 받지 않고
+    # 값은 CSV의 기존 타입으로 맞춘 뒤 쓴다 (ValueError, 이때 CSV는 그대로).
+    path = os.path.abspath(path)
+    required = list(FEATURES.keys()) + ['Churn']
+    missing = [c for c in required if c not in new_rows.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {missing}")
+    incomplete = new_rows[required].isna().any(axis=1)
+    if incomplete.any():
+        raise ValueError(f"필수 컬럼에 결측이 있는 행이 {int(incomplete.sum())}개 있습니다: {required}")
+
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    new_rows = to_csv_rows(new_rows, columns)
+    if not new_rows['Churn'].isin([0, 1]).all():
+        raise ValueError("Churn은 0 또는 1이어야 합니다")
+
+    fitted = load_model(path)
+    new_rows.to_csv(path, mode='a', header=False, index=False)
+
+    if fitted['mode'] == 'online':
+        # 캐시에 들어있는 이전 버전 모델은 그대로 두고 복사본을 갱신해 새 버전으로 저장
+        fitted = partial_fit(copy.deepcopy(fitted), new_rows)
+        _save_model(fitted, artifact_path(path, MODEL_NAME))
+    return load_model(path)
+
+
+@lru_cache(maxsize=4)
+def _load_coefficients(path, coef_path):
+    if os.path.exists(coef_path):
+        with open(coef_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    fitted = load_model(path)
+    coef = dict(zip(fitted['features'], fitted['model'].coef_[0].tolist()))
+    tmp = f"{coef_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(coef, f)
+    os.replace(tmp, coef_path)
+    return coef
+
+
+@lru_cache(maxsize=16)
+def _filtered_coefficients(path, version, plan, month):
+    # 필터한 고객만으로 다시 학습한 계수 (결측 없는 행에 이탈 / 유지 고객이 모두 있어야 학습 가능, 아니면 None)
+    df = filtered_frame(path, plan, month)
+    churn = df['Churn'][df[list(FEATURES.keys())].notna().all(axis=1)]
+    if churn.nunique() < 2:
+        return None
+    fitted = fit_model(df)
+    return dict(zip(fitted['features'], fitted['model'].coef_[0].tolist()))
+
+
+def feature_importance(path=CHURN_CSV, plan=None, month=None):
+    # 표준화된 변수 기준 로지스틱 회귀 계수 (작은 값 → 큰 값 순)
+    # plan / month: 사이드바 필터 (plan_index 참고). 필터한 고객으로 학습할 수 없으면 None
+    path = os.path.abspath(path)
+    if is_filtered(path, plan, month):
+        coef = _filtered_coefficients(path, dataset_version(path), plan, month)
+        if coef is None:
+            return None
+    else:
+        coef = _load_coefficients(path, artifact_path(path, COEF_NAME))
+    return pd.Series(list(coef.values()), index=[FEATURES[c] for c in coef]).sort_values()
+
+
+@lru_cache(maxsize=4)
+def _load_scoring_params(path, params_path):
+    if os.path.exists(params_path):
+        with open(params_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    fitted = load_model(path)
+    params = {
+        'features': fitted['features'],
+        'mean': fitted['scaler'].mean_.tolist(),
+        'scale': fitted['scaler'].scale_.tolist(),
+        'coef': fitted['model'].coef_[0].tolist(),
+        'intercept': float(fitted['model'].intercept_[0]),
+    }
+    tmp = f"{params_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    os.replace(tmp, params_path)
+    return params
+
+
+def scoring_params(path=CHURN_CSV):
+    # 스케일러 + 로지스틱 계수만 (NumPy로 점수를 계산할 때 sklearn 없이 쓴다)
+    path = os.path.abspath(path)
+    return _load_scoring_params(path, artifact_path(path, PARAMS_NAME))
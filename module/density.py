@@ -0,0 +1,86 @@
+# ======================================================== 밀도(2D 히스토그램) 차트 =============================================================
+# 고객 전체를 점으로 찍는 산점도는 행이 많아지면 느리고 알아보기도 어렵다.
+# 행 수가 DENSITY_ROW_THRESHOLD를 넘으면 점 대신 격자별 고객 수(2D 히스토그램)를 그린다.
+#   - 모든 그룹(layer)의 격자를 bincount 한 번으로 같이 센다
+#   - 필요하면 scipy.ndimage.gaussian_filter로 부드럽게 만든다
+#   - 전체 밀도는 회색 배경, 그룹별 밀도는 색깔 등고선으로 겹쳐 그린다
+
+import numpy as np
+import pandas as pd
+
+from lazy_import import lazy
+
+DENSITY_ROW_THRESHOLD = 20000
+DENSITY_BINS = 120
+DENSITY_SIGMA = 1.0
+
+
+def use_density(n_rows, threshold=None):
+    return n_rows > (DENSITY_ROW_THRESHOLD if threshold is None else threshold)
+
+
+def _edges(values, bins):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if hi <= lo:
+        hi = lo + 1.0
+    return np.linspace(lo, hi, bins + 1)
+
+
+def _bin_index(values, edges):
+    bins = len(edges) - 1
+    idx = ((values - edges[0]) / (edges[-1] - edges[0]) * bins).astype(np.int64)
+    return np.clip(idx, 0, bins - 1)
+
+
+def density_layers(x, y, layers=None, bins=DENSITY_BINS, sigma=DENSITY_SIGMA):
+    # 반환: (x 경계, y 경계, {그룹: (bins x bins) 배열})
+    # 필터 결과 유효한 점이 하나도 없으면 경계는 빈 배열, 그룹은 {} (plot_density는 아무것도 그리지 않는다)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+
+    if layers is None:
+        codes, labels = np.zeros(len(x), dtype=np.int64), ['all']
+    else:
+        codes, labels = pd.factorize(pd.Series(layers), sort=True)
+        labels = list(labels)
+    valid &= codes >= 0
+
+    x, y, codes = x[valid], y[valid], codes[valid]
+    if not len(x):
+        return np.empty(0), np.empty(0), {}
+    xedges, yedges = _edges(x, bins), _edges(y, bins)
+    flat = (codes * bins + _bin_index(x, xedges)) * bins + _bin_index(y, yedges)
+    grids = np.bincount(flat, minlength=len(labels) * bins * bins)
+    grids = grids.reshape(len(labels), bins, bins).astype(np.float64)
+
+    if sigma:
+        gaussian_filter = lazy('scipy.ndimage').gaussian_filter
+        grids = gaussian_filter(grids, sigma=(0, sigma, sigma))
+    return xedges, yedges, dict(zip(labels, grids))
+
+
+def plot_density(ax, xedges, yedges, grids, colors=None, legend_title=None):
+    Line2D = lazy('matplotlib.lines').Line2D
+
+    if not grids:
+        return ax
+    total = sum(grids.values())
+    ax.imshow(np.log1p(total).T, origin='lower', aspect='auto', cmap='Greys',
+              extent=[xedges[0], xedges[-1], yedges[0], yedges[-1]])
+
+    xc = (xedges[:-1] + xedges[1:]) / 2
+    yc = (yedges[:-1] + yedges[1:]) / 2
+    handles = []
+    for i, (label, grid) in enumerate(grids.items()):
+        color = (colors or {}).get(label, f"C{i}")
+        top = grid.max()
+        if top > 0:
+            # 가장 바깥 선은 최대 밀도의 10% (0 근처 잡음 선 제외)
+            ax.contour(xc, yc, grid.T, levels=np.linspace(0.1, 0.9, 4) * top,
+                       colors=[color], linewidths=1.2)
+        handles.append(Line2D([0], [0], color=color, label=str(label)))
+    if len(grids) > 1:
+        ax.legend(handles=handles, title=legend_title)
+    return ax
+
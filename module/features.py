@@ -0,0 +1,174 @@
+# ======================================================== 파생 컬럼 레지스트리 =============================================================
+# 페이지가 매 rerun마다 df에 직접 붙이던 파생 컬럼(가입기간 / 장기고객 / tenure / engagement_score ...)을
+# 여기 한 곳에 (의존 컬럼, 계산 함수)로 선언해 둔다.
+#   - 컬럼은 처음 요청될 때만 계산하고 (파일, 데이터 버전, 요금제, 월, 파라미터)별로 캐시한다
+#     → 같은 프로세스의 페이지 / 세션이 같은 배열을 공유
+#   - 의존 컬럼이 파생 컬럼이면 그것도 같은 캐시를 거친다 (예: long_term ← tenure ← AccountAge)
+#   - feature_frame(path, names): 원본(사이드바 필터 적용) 컬럼 + 요청한 파생 컬럼으로 된 데이터프레임 (이것도 캐시)
+# 반환값은 여러 세션이 공유하므로 수정하지 말고, 바꿔야 하면 복사해서 쓴다.
+# CSV에 저장돼 있던 한글 파생 컬럼(churn_data.DERIVED_COLUMNS)은 원본과 맞지 않아 읽을 때 버리고 여기서 만든다
+# (이유는 churn_data.py 참고).
+#
+#   df = feature_frame(CHURN_CSV, ('가입기간', '장기고객'), plan=plan, month=month)
+#   df = feature_frame(SUBSCRIPTION_CSV, ('tenure', 'segment'), k=4)
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import CHURN_CSV, dataset_version, read_only
+from plan_index import filtered_frame, plan_rows
+
+LONG_TERM_MONTHS = 6
+
+# 의존 컬럼 대신 쓸 수 있는 특수 이름: (파일 경로, 원본 기준 행 번호(필터가 없으면 None))
+# 원본 전체 기준으로 저장된 결과(세그먼트 배정 등)를 필터한 행에 맞출 때 쓴다
+SOURCE = '@source'
+
+# 이름 → (의존 컬럼, 파라미터 이름, 계산 함수)
+FEATURES = {}
+
+
+def feature(name, *deps, params=()):
+    # 계산 함수는 의존 컬럼 값을 순서대로 받고, params는 키워드 인자로 받는다
+    def register(fn):
+        FEATURES[name] = (deps, tuple(params), fn)
+        return fn
+    return register
+
+
+# ======================================================== reason 페이지 =================================================================
+@feature('가입기간', 'AccountAge')
+def _signup_months(age):
+    return age
+
+
+@feature('이탈여부', 'Churn')
+def _churned(churn):
+    return churn
+
+
+@feature('장기고객', '가입기간')
+def _long_term_ko(months):
+    return months >= LONG_TERM_MONTHS
+
+
+@feature('고객유형', '장기고객')
+def _customer_type(long_term):
+    return np.where(long_term, '장기 고객', '초기 이탈 고객')
+
+
+@feature('3개월구간', 'AccountAge')
+def _tenure_band(age):
+    from churn_cube import TENURE_LABELS, _tenure_codes
+    return pd.Categorical.from_codes(_tenure_codes(age), TENURE_LABELS, ordered=True)
+
+
+@feature('시청구간', 'ViewingHoursPerWeek', SOURCE)
+def _viewing_band(viewing, source):
+    # 필터한 데이터도 전체 데이터의 시청 5분위 경계를 그대로 쓴다 (churn_cube와 같은 기준)
+    from churn_cube import VIEWING_LABELS, _viewing_codes, load_cube
+    edges = load_cube(source[0]).viewing_edges
+    return pd.Categorical.from_codes(_viewing_codes(viewing, edges), VIEWING_LABELS, ordered=True)
+
+
+@feature('요금제', 'MonthlyCharges')
+def _price_band(charges):
+    from churn_cube import PRICE_LABELS, _price_codes
+    return pd.Categorical.from_codes(_price_codes(charges), PRICE_LABELS, ordered=True)
+
+
+# ======================================================== myApp3 =================================================================
+@feature('tenure', 'AccountAge')
+def _tenure(age):
+    return age
+
+
+@feature('churn', 'Churn')
+def _churn(churn):
+    return churn
+
+
+@feature('long_term', 'tenure')
+def _long_term(tenure):
+    return tenure >= LONG_TERM_MONTHS
+
+
+@feature('engagement_score', 'ViewingHoursPerWeek', 'ContentDownloadsPerMonth', 'WatchlistSize', 'UserRating')
+def _engagement_score(viewing, downloads, watchlist, rating):
+    return viewing * 0.4 + downloads * 0.3 + watchlist * 0.2 + rating * 0.1
+
+
+@feature('segment', SOURCE, params=('k',))
+def _segment(source, k=None):
+    # 세그먼트 배정은 (데이터 버전, k)별로 segmentation이 한 번만 계산해서 저장해 둔 것을 읽는다
+    from segmentation import N_SEGMENTS, load_segments
+    path, rows = source
+    segment = load_segments(path, N_SEGMENTS if k is None else k)
+    return segment if rows is None else np.asarray(segment)[rows]
+
+
+# ======================================================== 계산 / 캐시 =================================================================
+@lru_cache(maxsize=None)
+def _param_names(name):
+    # 이 컬럼과 의존 컬럼들이 받는 파라미터 (캐시 키를 필요한 파라미터로만 나누기 위해)
+    deps, params, _ = FEATURES[name]
+    names = set(params)
+    for dep in deps:
+        if dep in FEATURES:
+            names.update(_param_names(dep))
+    return frozenset(names)
+
+
+def _params_for(name, params):
+    wanted = _param_names(name)
+    return tuple((k, v) for k, v in params if k in wanted)
+
+
+def _dependency(path, version, plan, month, dep, params):
+    if dep == SOURCE:
+        rows = plan_rows(path, plan, month) if plan is not None or month is not None else None
+        return path, rows
+    if dep in FEATURES:
+        return _column(path, version, plan, month, dep, _params_for(dep, params))
+    return filtered_frame(path, plan, month)[dep]
+
+
+@lru_cache(maxsize=64)
+def _column(path, version, plan, month, name, params):
+    deps, own, fn = FEATURES[name]
+    args = [_dependency(path, version, plan, month, dep, params) for dep in deps]
+    # params에는 의존 컬럼이 받는 파라미터도 들어 있으므로 이 함수가 받는 것만 넘긴다
+    values = fn(*args, **{k: v for k, v in params if k in own})
+    index = filtered_frame(path, plan, month).index
+    return read_only(pd.Series(values, index=index, name=name))
+
+
+def derived(name, path=CHURN_CSV, plan=None, month=None, **params):
+    # 파생 컬럼 하나 (Series, 읽기 전용으로 공유)
+    if name not in FEATURES:
+        raise KeyError(f"등록되지 않은 파생 컬럼: {name}")
+    path = os.path.abspath(path)
+    params = _params_for(name, tuple(sorted(params.items())))
+    return _column(path, dataset_version(path), plan, month, name, params)
+
+
+@lru_cache(maxsize=16)
+def _feature_frame(path, version, plan, month, names, params):
+    df = filtered_frame(path, plan, month).copy(deep=False)
+    for name in names:
+        df[name] = _column(path, version, plan, month, name, _params_for(name, params))
+    return read_only(df)
+
+
+def feature_frame(path=CHURN_CSV, names=(), plan=None, month=None, **params):
+    # 원본 컬럼 + names 파생 컬럼. plan / month: 사이드바 필터 (plan_index 참고)
+    unknown = [name for name in names if name not in FEATURES]
+    if unknown:
+        raise KeyError(f"등록되지 않은 파생 컬럼: {unknown}")
+    wanted = frozenset().union(*(_param_names(name) for name in names))
+    params = tuple((k, v) for k, v in sorted(params.items()) if k in wanted)
+    path = os.path.abspath(path)
+    return _feature_frame(path, dataset_version(path), plan, month, tuple(names), params)
@@ -0,0 +1,128 @@
+# ======================================================== 차트 이미지 캐시 =============================================================
+# 데이터가 그대로인데도 rerun마다 matplotlib 차트를 다시 그리고 래스터화하지 않도록,
+# (그리기 함수 + 입력값 + 스타일)을 해시한 키로 렌더링된 PNG/SVG 바이트를 보관한다.
+# 캐시는 프로세스 전체(모든 세션)가 공유하며, 용량을 넘으면 가장 오래 안 쓴 항목부터 지운다.
+#
+# 사용법: 차트를 그리는 함수(fig 반환)와 입력값을 넘긴다.
+#   def draw_bar(series):
+#       fig, ax = plt.subplots()
+#       series.plot(kind='bar', ax=ax)
+#       return fig
+#   show_figure(draw_bar, churn_rate)
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from lazy_import import lazy
+
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FIGURE_CACHE_MAX_ENTRIES = 512
+
+# st.pyplot 기본 저장 옵션과 같게 맞춘다
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight', 'dpi': 200}
+
+# 키에 포함할 전역 스타일 설정
+STYLE_KEYS = ['font.family', 'axes.unicode_minus', 'figure.dpi']
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+stats = {'hits': 0, 'misses': 0}
+
+
+def _update(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(repr(type(value)).encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+        else:
+            h.update(repr(value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b'{')
+        for k in sorted(value, key=repr):
+            _update(h, k)
+            _update(h, value[k])
+        h.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[')
+        for v in value:
+            _update(h, v)
+        h.update(b']')
+    else:
+        h.update(repr(value).encode())
+    h.update(b'|')
+
+
+def figure_key(draw, args, kwargs, fmt, key=None):
+    plt = lazy('matplotlib.pyplot')
+    h = hashlib.sha1()
+    _update(h, f"{draw.__module__}.{draw.__qualname__}:{fmt}")
+    _update(h, {k: plt.rcParams[k] for k in STYLE_KEYS})
+    # key가 주어지면 (예: 데이터 버전) 큰 입력을 해시하는 대신 그 값을 쓴다
+    _update(h, (args, kwargs) if key is None else key)
+    return h.hexdigest()
+
+
+def _put(key, data):
+    global _cache_bytes
+    with _lock:
+        if key in _cache:
+            return
+        _cache[key] = data
+        _cache_bytes += len(data)
+        while _cache and (_cache_bytes > FIGURE_CACHE_MAX_BYTES or len(_cache) > FIGURE_CACHE_MAX_ENTRIES):
+            _, old = _cache.popitem(last=False)
+            _cache_bytes -= len(old)
+
+
+def _get(key):
+    with _lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+            stats['hits'] += 1
+        else:
+            stats['misses'] += 1
+        return data
+
+
+def render_figure(draw, *args, key=None, fmt='png', **kwargs):
+    cache_key = figure_key(draw, args, kwargs, fmt, key)
+    data = _get(cache_key)
+    if data is not None:
+        return data
+
+    plt = lazy('matplotlib.pyplot')
+    fig = draw(*args, **kwargs)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **SAVEFIG_OPTIONS)
+    plt.close(fig)
+
+    data = buf.getvalue()
+    _put(cache_key, data)
+    return data
+
+
+def show_figure(draw, *args, key=None, fmt='png', **kwargs):
+    data = render_figure(draw, *args, key=key, fmt=fmt, **kwargs)
+    if fmt == 'svg':
+        st.image(data.decode('utf-8'), use_container_width=True)
+    else:
+        st.image(data, use_container_width=True)
+
+
+def clear_figures():
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
@@ -0,0 +1,254 @@
+# ======================================================== 섹션별 성능 계측 =============================================================
+# 페이지 rerun 한 번을 섹션(번호 붙은 차트 묶음) 단위로 나눠서
+# wall 시간 / CPU 시간 / 처리 행 수 / 캐시 hit·miss / tracemalloc 최대 메모리를 기록한다.
+#   - trace.mark('1. 시간 구조', rows=len(df)): 이전 섹션을 닫고 새 섹션 시작 (코드 들여쓰기를 바꾸지 않아도 됨)
+#   - trace.wrap(tasks): section_pool에 넘기는 계산 함수를 감싸서 워커 스레드의 계산 시간도 따로 기록
+#   - trace.finish(): 마지막 섹션을 닫고 기록 반환 + 파일에 남김 (중간에 멈춘 rerun은 기록하지 않음)
+#       INSTRUMENT_DIR/sections.jsonl  : 섹션 한 줄씩 (크기가 넘으면 돌려 씀)
+#       INSTRUMENT_DIR/sections.prom   : 프로세스 누적값 (Prometheus textfile collector 형식)
+# 캐시 hit·miss는 module/ 의 lru_cache 함수들 + 차트 이미지 캐시(figure_cache) 통계의 증가분이다.
+# tracemalloc 최대 메모리는 프로세스 전체에서 하나라서 세션이 여럿이면 서로의 peak를 덮어쓴다.
+# 그래서 INSTRUMENT_MEMORY=1로 띄운 단일 세션(로컬 확인 / 벤치마크)에서 memory=True(사이드바 디버그 패널)일 때만
+# 켜고, 한 번 켜면 프로세스가 끝날 때까지 둔다. 그 외에는 peak_kb가 비어 있다.
+# 섹션 시간이 겹치는 병렬 계산에서는 캐시 / 메모리 값이 다른 스레드 것과 섞일 수 있다.
+#
+# 환경변수 INSTRUMENT_DIR: 기록 폴더 (기본 logs, 빈 문자열이면 파일에 남기지 않음)
+#          INSTRUMENT_MEMORY: 1이면 섹션별 tracemalloc peak 기록 (세션 하나로만 띄울 때)
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from logging.handlers import RotatingFileHandler
+
+import pandas as pd
+
+INSTRUMENT_DIR = os.environ.get('INSTRUMENT_DIR', 'logs')
+INSTRUMENT_MEMORY = os.environ.get('INSTRUMENT_MEMORY') == '1'
+JSONL_NAME = "sections.jsonl"
+PROM_NAME = "sections.prom"
+JSONL_MAX_BYTES = 5 * 1024 * 1024
+JSONL_BACKUPS = 3
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_logger = None
+# (페이지, 섹션)별 프로세스 누적값
+_totals = {}
+
+
+# ======================================================== 캐시 통계 =================================================================
+def _cached_functions():
+    # module/ 폴더 모듈의 lru_cache 함수들 (다른 모듈에서 import한 것은 한 번만)
+    funcs = {}
+    for mod in list(sys.modules.values()):
+        path = getattr(mod, '__file__', None) or ''
+        if os.path.dirname(os.path.abspath(path)) != _MODULE_DIR:
+            continue
+        for f in list(vars(mod).values()):
+            if isinstance(f, functools._lru_cache_wrapper):
+                funcs[id(f)] = f
+    return funcs.values()
+
+
+def cache_counts():
+    hits = misses = 0
+    for func in _cached_functions():
+        info = func.cache_info()
+        hits += info.hits
+        misses += info.misses
+    figures = sys.modules.get('figure_cache')
+    if figures is not None:
+        hits += figures.stats['hits']
+        misses += figures.stats['misses']
+    return hits, misses
+
+
+# ======================================================== 계측 =================================================================
+class _Section:
+    def __init__(self, name, rows, memory):
+        self.name = name
+        self.rows = rows
+        self.memory = memory
+        self.thread = threading.current_thread().name
+        self.hits, self.misses = cache_counts()
+        if memory:
+            tracemalloc.reset_peak()
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+
+    def close(self):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        hits, misses = cache_counts()
+        return {
+            'section': self.name,
+            'wall_ms': round(wall * 1000, 2),
+            'cpu_ms': round(cpu * 1000, 2),
+            'rows': self.rows,
+            'cache_hits': hits - self.hits,
+            'cache_misses': misses - self.misses,
+            'peak_kb': round(tracemalloc.get_traced_memory()[1] / 1024, 1) if self.memory else None,
+            'thread': self.thread,
+        }
+
+
+class PageTrace:
+    def __init__(self, page, memory=False):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:12]
+        self.memory = memory and INSTRUMENT_MEMORY and _start_memory()
+        self.records = []
+        self._current = None
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.total_ms = None
+
+    def mark(self, name, rows=None):
+        # 이전 섹션을 닫고 name 섹션 시작
+        self._close_current()
+        self._current = _Section(name, rows, self.memory)
+
+    def _close_current(self):
+        if self._current is not None:
+            self._add(self._current.close())
+            self._current = None
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def section(self, name, rows=None):
+        return _SectionContext(self, name, rows)
+
+    def wrap(self, tasks, prefix='계산: '):
+        # run_sections에 넘기는 {이름: 함수}의 각 함수를 계측해서 같은 모양으로 반환
+        def timed(name, fn):
+            def run():
+                with self.section(prefix + name):
+                    return fn()
+            return run
+        return {name: timed(name, fn) for name, fn in tasks.items()}
+
+    def finish(self):
+        self._close_current()
+        total = time.perf_counter() - self._started
+        self.total_ms = round(total * 1000, 2)
+        _record(self.page, self.run_id, self.records, total)
+        return self.records
+
+
+class _SectionContext:
+    def __init__(self, trace, name, rows):
+        self.trace = trace
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.section = _Section(self.name, self.rows, self.trace.memory)
+        return self.section
+
+    def __exit__(self, *exc):
+        self.trace._add(self.section.close())
+        return False
+
+
+def _start_memory():
+    # 처음 켤 때 한 번만 start (끄지 않으므로 중간에 멈춘 rerun이 있어도 켜고 끄는 횟수가 어긋나지 않는다)
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    return True
+
+
+def start_trace(page, memory=False):
+    return PageTrace(page, memory)
+
+
+def trace_frame(records):
+    # 디버그 패널용 표
+    df = pd.DataFrame(records, columns=['section', 'wall_ms', 'cpu_ms', 'rows', 'cache_hits',
+                                        'cache_misses', 'peak_kb', 'thread'])
+    return df.set_index('section')
+
+
+# ======================================================== 파일 기록 =================================================================
+def _get_logger():
+    global _logger
+    if _logger is None:
+        os.makedirs(INSTRUMENT_DIR, exist_ok=True)
+        logger = logging.getLogger('dashboard.instrument')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(os.path.join(INSTRUMENT_DIR, JSONL_NAME),
+                                      maxBytes=JSONL_MAX_BYTES, backupCount=JSONL_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def prometheus_text():
+    metrics = [
+        ('dashboard_section_runs_total', 'counter', 'Section executions', 'count'),
+        ('dashboard_section_seconds_total', 'counter', 'Wall time per section', 'seconds'),
+        ('dashboard_section_cpu_seconds_total', 'counter', 'Thread CPU time per section', 'cpu_seconds'),
+        ('dashboard_section_rows_total', 'counter', 'Rows processed per section', 'rows'),
+        ('dashboard_section_cache_hits_total', 'counter', 'Cache hits during the section', 'cache_hits'),
+        ('dashboard_section_cache_misses_total', 'counter', 'Cache misses during the section', 'cache_misses'),
+        ('dashboard_section_peak_bytes', 'gauge', 'Last tracemalloc peak of the section', 'peak_bytes'),
+    ]
+    lines = []
+    for name, kind, help_text, field in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (page, section), values in sorted(_totals.items()):
+            if values.get(field) is None:
+                continue
+            lines.append(f'{name}{{page="{_label(page)}",section="{_label(section)}"}} {values[field]:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def _record(page, run_id, records, total):
+    with _lock:
+        for r in records:
+            values = _totals.setdefault((page, r['section']), {
+                'count': 0, 'seconds': 0.0, 'cpu_seconds': 0.0, 'rows': 0,
+                'cache_hits': 0, 'cache_misses': 0, 'peak_bytes': None,
+            })
+            values['count'] += 1
+            values['seconds'] += r['wall_ms'] / 1000
+            values['cpu_seconds'] += r['cpu_ms'] / 1000
+            values['rows'] += r['rows'] or 0
+            values['cache_hits'] += r['cache_hits']
+            values['cache_misses'] += r['cache_misses']
+            if r['peak_kb'] is not None:
+                values['peak_bytes'] = r['peak_kb'] * 1024
+        prom = prometheus_text()
+
+    if not INSTRUMENT_DIR:
+        return
+    try:
+        logger = _get_logger()
+        ts = time.strftime('%Y-%m-%dT%H:%M:%S')
+        for r in records:
+            logger.info(json.dumps(dict(r, ts=ts, run_id=run_id, page=page, run_ms=round(total * 1000, 2)),
+                                   ensure_ascii=False))
+        path = os.path.join(INSTRUMENT_DIR, PROM_NAME)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(prom)
+        os.replace(tmp, path)
+    except OSError:
+        # 기록 실패로 페이지가 멈추지 않도록 무시
+        pass
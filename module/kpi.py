@@ -0,0 +1,191 @@
+# ======================================================== 월별 KPI 시계열 =============================================================
+# 사이드바 '분석 월 선택'과 분석 결과 지표(가입자 수 / 유지 기간 / 이탈률)를 고객 데이터에서 계산한다.
+#   - 고객마다 가입 월 / 이탈 월을 정수(연*12 + 월)로 바꾸고, 월별 가입 수 / 이탈 수를 bincount로 센 뒤
+#     누적합 한 번으로 월말 가입자 수, 평균 유지 기간, 이탈률을 구한다 (정렬된 월 순서로 한 번만 훑음)
+#   - 결과(월별 행 + 마지막 달까지의 누적값)는 data/.cache/<파일명>.kpi.json 에 저장하고,
+#     데이터에 새 달이 추가되면 마지막 달 이후의 가입 / 이탈만 누적값에 이어 붙인다
+#
+# 날짜 컬럼(SignupMonth / ChurnMonth)이 없는 데이터(현재 CSV)는 KPI_AS_OF 시점의 스냅샷으로 보고 추정한다:
+#   - 가입 월 = KPI_AS_OF - AccountAge 개월
+#   - 이탈 고객(Churn == 1)은 KPI_AS_OF 달에 이탈한 것으로 본다
+#     (그 전에 이탈한 고객은 데이터에 없으므로 이전 달 이탈률은 0으로 나온다)
+#   이 경우에는 스냅샷이 바뀔 때마다 전체를 다시 계산한다 (bincount 한 번이라 가볍다)
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import ARTIFACT_DIR, CHURN_CSV, dataset_version, load_churn
+
+SIGNUP_COLUMN = 'SignupMonth'
+CHURN_MONTH_COLUMN = 'ChurnMonth'
+
+# 날짜 컬럼이 없을 때 스냅샷 기준 월
+KPI_AS_OF = '2025-12'
+# 사이드바에 보여줄 최근 개월 수
+KPI_MONTHS = 12
+KPI_NAME = "kpi.json"
+# 추정 KPI를 보여줄 때 함께 띄우는 안내
+INFERRED_NOTE = ("※ 데이터에 가입/이탈 월이 없어 가입 월은 계정 기간(AccountAge)으로, 이탈 고객은 마지막 달에 이탈한 것으로 "
+                 "추정했습니다. 월별 이탈률 / 증감은 표시하지 않고 이탈률은 스냅샷 기준입니다.")
+
+_TOTAL_KEYS = ('signups', 'churns', 'signup_sum', 'churned_signup_sum')
+
+
+def month_number(values):
+    # 날짜 / 'YYYY-MM' → 연*12 + (월-1). 결측은 -1
+    months = pd.to_datetime(pd.Series(values), errors='coerce')
+    number = months.dt.year * 12 + months.dt.month - 1
+    return number.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _month_label(number):
+    return f"{number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def customer_months(df, as_of=KPI_AS_OF):
+    # 반환: (가입 월(-1은 결측), 이탈 월(-1은 유지 중), 추정 여부). 행 순서는 df와 같다
+    if SIGNUP_COLUMN in df.columns:
+        signup = month_number(df[SIGNUP_COLUMN])
+        if CHURN_MONTH_COLUMN in df.columns:
+            churn = month_number(df[CHURN_MONTH_COLUMN])
+        else:
+            churn = np.full(len(df), -1, dtype=np.int64)
+        return signup, churn, False
+
+    end = month_number([as_of])[0]
+    signup = end - df['AccountAge'].to_numpy(dtype=np.int64)
+    churn = np.where(df['Churn'].to_numpy() == 1, end, -1)
+    return signup, churn, True
+
+
+# ======================================================== 누적 계산 =================================================================
+def empty_state(mode):
+    return {'mode': mode, 'last_month': None, 'totals': dict.fromkeys(_TOTAL_KEYS, 0), 'rows': []}
+
+
+def update_kpi(state, signup, churn):
+    # state의 마지막 달 이후 가입 / 이탈만 세어서 월별 행을 이어 붙인다 (state를 새로 만들어 반환)
+    signup = np.asarray(signup, dtype=np.int64)
+    churn = np.asarray(churn, dtype=np.int64)
+    last = state['last_month']
+    start = int(signup.min()) if last is None else last + 1
+    end = int(max(signup.max(), churn.max()))
+    if end < start:
+        return state
+
+    size = end - start + 1
+    new_signup = signup >= start
+    new_churn = churn >= start
+    signup_pos = signup[new_signup] - start
+    churn_pos = churn[new_churn] - start
+
+    # 월별 증가분 → 이전 누적값에 이어서 누적합
+    totals = state['totals']
+    cum = {
+        'signups': totals['signups'] + np.cumsum(np.bincount(signup_pos, minlength=size)),
+        'churns': totals['churns'] + np.cumsum(np.bincount(churn_pos, minlength=size)),
+        'signup_sum': totals['signup_sum'] + np.cumsum(
+            np.bincount(signup_pos, weights=signup[new_signup], minlength=size)),
+        'churned_signup_sum': totals['churned_signup_sum'] + np.cumsum(
+            np.bincount(churn_pos, weights=signup[new_churn], minlength=size)),
+    }
+
+    months = np.arange(start, end + 1)
+    subscribers = cum['signups'] - cum['churns']
+    prev_subscribers = np.concatenate([[totals['signups'] - totals['churns']], subscribers[:-1]])
+    churned = np.diff(np.concatenate([[totals['churns']], cum['churns']]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 월말 가입자의 평균 유지 기간 = 이번 달 - 평균 가입 월
+        retention = np.where(subscribers > 0,
+                             months - (cum['signup_sum'] - cum['churned_signup_sum']) / subscribers, 0.0)
+        churn_rate = np.where(prev_subscribers > 0, churned / prev_subscribers * 100, 0.0)
+
+    rows = [
+        {
+            'Month': _month_label(int(m)),
+            'Subscribers': int(s),
+            'Retention': round(float(r), 2),
+            'Churn_Rate': round(float(c), 2),
+        }
+        for m, s, r, c in zip(months, subscribers, retention, churn_rate)
+    ]
+    return {
+        'mode': state['mode'],
+        'last_month': end,
+        'totals': {k: float(cum[k][-1]) for k in _TOTAL_KEYS},
+        'rows': state['rows'] + rows,
+    }
+
+
+def kpi_frame(state, months=KPI_MONTHS):
+    # 기존 load_data()와 같은 컬럼 (성장률은 전체 시계열 기준으로 계산한 뒤 최근 months개월만)
+    df = pd.DataFrame(state['rows'], columns=['Month', 'Subscribers', 'Retention', 'Churn_Rate'])
+    df['Month'] = pd.to_datetime(df['Month'], format='%Y-%m')
+    df['Prev_Subscribers'] = df['Subscribers'].shift(1)
+    df['Growth_Rate'] = ((df['Subscribers'] - df['Prev_Subscribers']) / df['Prev_Subscribers']) * 100
+    return df.tail(months).reset_index(drop=True)
+
+
+# ======================================================== 저장 / 로드 =================================================================
+def kpi_path(path, plan=None):
+    # 증분 갱신을 위해 데이터 버전이 아닌 파일 이름(+ 요금제) 기준으로 하나만 둔다
+    path = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    folder = os.path.join(os.path.dirname(path), ARTIFACT_DIR)
+    os.makedirs(folder, exist_ok=True)
+    name = KPI_NAME if plan is None else f"{plan}.{KPI_NAME}"
+    return os.path.join(folder, f"{stem}.{name}")
+
+
+def _read_state(state_path):
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state_path, state):
+    tmp = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, state_path)
+
+
+@lru_cache(maxsize=8)
+def _load_kpi(path, version, plan):
+    state_path = kpi_path(path, plan)
+    state = _read_state(state_path)
+    if state is not None and state.get('version') == version:
+        return state
+
+    if plan is None:
+        df = load_churn(path)
+    else:
+        # plan_index가 이 모듈의 월 계산을 쓰므로 여기서 불러온다
+        from plan_index import filtered_frame
+        df = filtered_frame(path, plan)
+    signup, churn, inferred = customer_months(df)
+    keep = signup >= 0
+    mode = 'inferred' if inferred else 'dates'
+    # 날짜가 있는 데이터는 저장된 마지막 달 이후만 이어 붙이고(추가만 되는 데이터로 가정),
+    # 스냅샷 추정은 기준이 달라지므로 처음부터 다시 계산
+    if state is None or state.get('mode') != mode or inferred:
+        state = empty_state(mode)
+    state = update_kpi(state, signup[keep], churn[keep])
+    state['version'] = version
+    _write_state(state_path, state)
+    return state
+
+
+def load_kpi(path=CHURN_CSV, months=KPI_MONTHS, plan=None):
+    # 반환: (월별 KPI 데이터프레임, 추정 여부). plan: SubscriptionType 값 (None이면 전체)
+    path = os.path.abspath(path)
+    state = _load_kpi(path, dataset_version(path), plan)
+    return kpi_frame(state, months), state['mode'] == 'inferred'
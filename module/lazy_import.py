@@ -0,0 +1,62 @@
+# ======================================================== 지연 import =============================================================
+# seaborn / sklearn / scipy / matplotlib 처럼 import 비용이 큰 라이브러리는
+# 실제로 그 페이지가 필요할 때 처음 한 번만 불러온다.
+# 각 모듈을 처음 불러오는 데 걸린 시간은 IMPORT_TIMES에 기록된다.
+#
+# 시작 시간 리포트 (모듈별 import 비용, 각각 새 인터프리터에서 측정):
+#   python module/lazy_import.py
+
+import importlib
+import subprocess
+import sys
+import time
+
+IMPORT_TIMES = {}
+
+# 대시보드가 쓰는 무거운 의존성
+HEAVY_MODULES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'pyarrow',
+    'joblib',
+    'matplotlib.pyplot',
+    'seaborn',
+    'scipy.ndimage',
+    'sklearn.linear_model',
+    'sklearn.cluster',
+]
+
+
+def lazy(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+def measure_import(name):
+    # 다른 모듈과 공유되는 의존성까지 포함한 단독 import 비용 (초)
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {name}; print(time.perf_counter() - t)"
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def startup_report(modules=HEAVY_MODULES):
+    return [(name, measure_import(name)) for name in modules]
+
+
+if __name__ == '__main__':
+    print(f"{'module':<24}{'import (s)':>12}")
+    for name, seconds in startup_report():
+        value = 'not installed' if seconds is None else f"{seconds:.3f}"
+        print(f"{name:<24}{value:>12}")
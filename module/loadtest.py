@@ -0,0 +1,197 @@
+# ======================================================== 동시 세션 부하 테스트 =============================================================
+# project.py를 브라우저 없이(Streamlit AppTest) N개 세션으로 동시에 돌려서
+# 한 프로세스(pod)가 몇 명까지 버티는지, 차트를 추가했을 때 느려지지 않았는지 본다.
+#   - 세션마다 home → subscription_analysis → reason → retention 순서로 페이지를 옮기고
+#     사이드바 '🚀 데이터 분석 실행' 버튼을 누른다 (한 동작 = rerun 한 번)
+#   - 세션 수(N)를 늘려 가며 rerun 지연 p50 / p95 / p99, 처리량(rerun/초), 프로세스 RSS를 잰다
+#   - 세션들은 같은 프로세스의 스레드라 계산 캐시(lru_cache, data/.cache, 차트 캐시)를 실제 pod처럼 공유한다
+#     (처음 한 세션을 먼저 돌려 캐시를 채운 뒤 측정, --cold면 생략)
+#
+#   python module/loadtest.py --sessions 1 2 4 8
+#   python module/loadtest.py --sessions 4 --rounds 3 --max-p95 5000     # p95가 5초를 넘으면 exit 1
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench import environment, max_rss_mb, write_report
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'project.py')
+LOADTEST_OUT = "data/bench/loadtest.json"
+REPORT_VERSION = 1
+SESSIONS = [1, 2, 4, 8]
+ROUNDS = 1
+TIMEOUT = 300
+
+# 세션 한 명이 누르는 순서: (단계 이름, 이동할 페이지 또는 None = 분석 버튼)
+STEPS = [
+    ('home', 'home'),
+    ('subscription_analysis', 'subscription_analysis'),
+    ('reason', 'reason'),
+    ('retention', 'retention'),
+    ('analysis', None),
+]
+ANALYSIS_LABEL = "🚀 데이터 분석 실행"
+
+
+# ======================================================== 세션 =================================================================
+def current_rss_mb():
+    # 현재 RSS (/proc가 없으면 최대 RSS로 대신)
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return max_rss_mb()
+
+
+def _new_session(app_path, timeout):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(app_path, default_timeout=timeout)
+
+
+def _step(at, page):
+    if page is None:
+        button = next(b for b in at.sidebar.button if b.label == ANALYSIS_LABEL)
+        button.click()
+    else:
+        # 페이지 버튼의 on_click과 같은 효과: page를 바꾸고 rerun 한 번
+        at.session_state['page'] = page
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    errors = [e.message for e in at.exception]
+    return elapsed, errors
+
+
+def run_session(app_path=APP_PATH, rounds=ROUNDS, timeout=TIMEOUT):
+    # 한 세션의 기록: [(단계 이름, 초, 에러 메시지 목록)]
+    at = _new_session(app_path, timeout)
+    at.run()
+    records = []
+    for _ in range(rounds):
+        for name, page in STEPS:
+            elapsed, errors = _step(at, page)
+            records.append((name, elapsed, errors))
+    return records
+
+
+# ======================================================== 측정 =================================================================
+def _percentiles(values):
+    values = np.asarray(values, dtype=np.float64) * 1000
+    if not len(values):
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50_ms': round(float(p50), 1),
+        'p95_ms': round(float(p95), 1),
+        'p99_ms': round(float(p99), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+def _sample_rss(stop, samples, interval=0.2):
+    while not stop.wait(interval):
+        samples.append(current_rss_mb())
+
+
+def run_level(n, app_path=APP_PATH, rounds=ROUNDS, timeout=TIMEOUT):
+    rss_before = current_rss_mb()
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, samples), daemon=True)
+    sampler.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        sessions = list(pool.map(lambda _: run_session(app_path, rounds, timeout), range(n)))
+    wall = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    records = [r for session in sessions for r in session]
+    errors = sorted({msg for _, _, errs in records for msg in errs})
+    level = {
+        'sessions': n,
+        'reruns': len(records),
+        'seconds': round(wall, 3),
+        'throughput_rps': round(len(records) / wall, 3) if wall else None,
+        'latency': _percentiles([t for _, t, _ in records]),
+        'steps': {name: _percentiles([t for s, t, _ in records if s == name]) for name, _ in STEPS},
+        'rss_mb_before': _round(rss_before),
+        'rss_mb_peak': _round(max([r for r in samples + [current_rss_mb()] if r is not None], default=None)),
+        'errors': errors,
+    }
+    return level
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def run(sessions=SESSIONS, app_path=APP_PATH, rounds=ROUNDS, timeout=TIMEOUT, warm=True):
+    report = {
+        'version': REPORT_VERSION,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': environment(),
+        'app': os.path.relpath(app_path),
+        'rounds': rounds,
+        'steps': [name for name, _ in STEPS],
+        'levels': [],
+    }
+    if warm:
+        run_session(app_path, 1, timeout)
+    for n in sessions:
+        report['levels'].append(run_level(n, app_path, rounds, timeout))
+    rss = max_rss_mb()
+    report['max_rss_mb'] = _round(rss)
+    return report
+
+
+# ======================================================== 출력 =================================================================
+def format_report(report):
+    lines = [f"{'N':>4}{'reruns':>8}{'rerun/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'RSS peak':>12}"]
+    for level in report['levels']:
+        lat = level['latency']
+        rss = f"{level['rss_mb_peak']:.0f} MB" if level['rss_mb_peak'] is not None else '-'
+        lines.append(f"{level['sessions']:>4}{level['reruns']:>8}{level['throughput_rps']:>9.2f}"
+                     f"{lat['p50_ms']:>8.0f}ms{lat['p95_ms']:>8.0f}ms{lat['p99_ms']:>8.0f}ms{rss:>12}")
+        for name, s in level['steps'].items():
+            lines.append(f"{'':>4}  {name:<22}p50 {s['p50_ms']:>8.0f}ms  p95 {s['p95_ms']:>8.0f}ms")
+        for msg in level['errors']:
+            lines.append(f"{'':>4}  ! {msg[:200]}")
+    return '\n'.join(lines)
+
+
+def check(report, max_p95=None):
+    # 에러가 났거나 p95가 기준(ms)을 넘은 세션 수 목록
+    failed = []
+    for level in report['levels']:
+        if level['errors'] or (max_p95 is not None and level['latency']['p95_ms'] > max_p95):
+            failed.append(level['sessions'])
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='대시보드 동시 세션 부하 테스트 (Streamlit AppTest)')
+    parser.add_argument('--sessions', nargs='+', type=int, default=SESSIONS, help='동시 세션 수 (1 2 4 8 ...)')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='세션마다 페이지 순서를 반복할 횟수')
+    parser.add_argument('--app', default=APP_PATH)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='rerun 한 번의 제한 시간(초)')
+    parser.add_argument('--cold', action='store_true', help='캐시를 미리 채우지 않고 측정')
+    parser.add_argument('--max-p95', type=float, default=None, help='p95 기준(ms). 넘으면 exit 1')
+    parser.add_argument('--out', default=LOADTEST_OUT)
+    args = parser.parse_args()
+
+    report = run(args.sessions, os.path.abspath(args.app), args.rounds, args.timeout, warm=not args.cold)
+    print(format_report(report))
+    print(f"→ {write_report(report, args.out)}")
+    failed = check(report, args.max_p95)
+    if failed:
+        print(f"실패한 세션 수: {failed}")
+        sys.exit(1)
@@ -0,0 +1,176 @@
+# ======================================================== 유지 전략 효과 예측 (LTV) =============================================================
+# '고객 유지 전략 > 종합 예상 효과'의 지표를 이탈 데이터에서 계산한다.
+#   1. 코호트(구독 유형)별 월 단위 이탈 위험률(hazard) = 그 달 이탈 수 / 그 달 생존 고객 수
+#      (고객이 적은 코호트 / 월은 전체 위험률 쪽으로 당겨서 안정화, 관측 기간 이후는 마지막 12개월 평균)
+#   2. 현재 구독 중인 고객을 (코호트, 가입 개월 수)별 고객 수 / 월 요금 합계로 미리 집계
+#   3. 전략마다 위험률을 몇 % 낮추는지(슬라이더)를 곱해서 생존 곡선을 다시 계산하고
+#      앞으로 PROJECTION_MONTHS개월 동안의 예상 유지 기간 / 이탈률 / 매출(LTV)을 기존과 비교
+# 1, 2는 데이터 버전별로 캐시하고, 3은 (코호트 × 개월) 크기 배열 계산이라 슬라이더를 움직여도 바로 나온다.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import CHURN_CSV, dataset_version
+from plan_index import filtered_frame
+
+PROJECTION_MONTHS = 24
+CHURN_WINDOW_MONTHS = 12
+# 코호트 위험률을 전체 위험률 쪽으로 당기는 강도 (가상의 생존 고객 수)
+HAZARD_PRIOR = 20
+TAIL_MONTHS = 12
+# 위험률 상한: 마지막 개월 고객이 이탈했으면 위험률이 1 → 생존 0 → 0/0이 되므로 1보다 조금 작게 자른다
+MAX_HAZARD = 1 - 1e-6
+
+COHORT_COLUMN = 'SubscriptionType'
+UNKNOWN_COHORT = '미상'
+
+# 전략: (설명, 적용 시작 개월, 기본 위험률 감소 %)
+STRATEGIES = {
+    '3개월 이상 유지 혜택': ('가입 4개월 차부터 해지 시 1개월 무료권', 4, 15),
+    '라이브 스트리밍': ('스포츠 중계로 전 기간 락인', 1, 10),
+    '번들링 / 결합 상품': ('제휴 혜택으로 전 기간 해지 장벽 상승', 1, 10),
+}
+
+
+def _monthly_charges(df):
+    # 월 요금 결측은 총 요금 / 가입 개월 수, 그래도 없으면 평균 요금
+    charges = df['MonthlyCharges'].to_numpy(dtype=np.float64)
+    if 'TotalCharges' in df.columns:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            derived = df['TotalCharges'].to_numpy(dtype=np.float64) / df['AccountAge'].to_numpy(dtype=np.float64)
+        charges = np.where(np.isnan(charges), derived, charges)
+    return np.where(np.isfinite(charges), charges, np.nanmean(charges))
+
+
+def build_cohort_table(df):
+    if df.empty:
+        # 필터 결과 고객이 없으면 빈 표 (project는 None)
+        return {
+            'cohorts': [],
+            'hazard': np.zeros((0, PROJECTION_MONTHS + 1)),
+            'active_counts': np.zeros((0, 1), dtype=np.int64),
+            'active_revenue': np.zeros((0, 1)),
+            'churned': 0,
+            'mean_charge': 0.0,
+        }
+
+    age = df['AccountAge'].to_numpy(dtype=np.int64)
+    churn = df['Churn'].to_numpy(dtype=np.int64)
+    codes, labels = pd.factorize(df[COHORT_COLUMN].astype(object).fillna(UNKNOWN_COHORT), sort=True)
+    labels = [str(c) for c in labels]
+    n_cohorts = len(labels)
+    max_age = int(age.max())
+    size = max_age + PROJECTION_MONTHS + 1
+
+    # (코호트, 개월)별 이탈 수 / 관측 종료 수 → 뒤에서부터 누적하면 생존 고객 수
+    flat = codes * size + age
+    ended = np.bincount(flat, minlength=n_cohorts * size).reshape(n_cohorts, size)
+    deaths = np.bincount(flat, weights=churn, minlength=n_cohorts * size).reshape(n_cohorts, size)
+    at_risk = ended[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+    pooled_d, pooled_n = deaths.sum(axis=0), at_risk.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled = np.where(pooled_n > 0, pooled_d / pooled_n, np.nan)
+    tail = np.nanmean(pooled[max(1, max_age - TAIL_MONTHS + 1):max_age + 1])
+    pooled[max_age + 1:] = tail
+    pooled[0] = 0.0
+    pooled = np.nan_to_num(pooled, nan=tail)
+
+    hazard = (deaths + HAZARD_PRIOR * pooled) / (at_risk + HAZARD_PRIOR)
+    hazard[:, max_age + 1:] = pooled[max_age + 1:]
+    hazard[:, 0] = 0.0
+    hazard = np.minimum(hazard, MAX_HAZARD)
+
+    # 현재 구독 중인 고객: (코호트, 가입 개월 수)별 고객 수 / 월 요금 합계
+    active = churn == 0
+    charges = _monthly_charges(df)
+    grid = n_cohorts * (max_age + 1)
+    active_flat = codes[active] * (max_age + 1) + age[active]
+    counts = np.bincount(active_flat, minlength=grid).reshape(n_cohorts, max_age + 1)
+    revenue = np.bincount(active_flat, weights=charges[active], minlength=grid).reshape(n_cohorts, max_age + 1)
+
+    return {
+        'cohorts': labels,
+        'hazard': hazard,
+        'active_counts': counts,
+        'active_revenue': revenue,
+        'churned': int((churn == 1).sum()),
+        'mean_charge': float(charges.mean()),
+    }
+
+
+@lru_cache(maxsize=16)
+def _cohort_table(path, version, plan, month):
+    return build_cohort_table(filtered_frame(path, plan, month))
+
+
+def load_cohort_table(path=CHURN_CSV, plan=None, month=None):
+    # plan / month: 사이드바 필터 (plan_index 참고)
+    path = os.path.abspath(path)
+    return _cohort_table(path, dataset_version(path), plan, month)
+
+
+# ======================================================== 예측 =================================================================
+def hazard_multiplier(size, reductions):
+    # reductions: {전략 이름: 위험률 감소 비율(0~1)} → 개월별 위험률 배수
+    months = np.arange(size)
+    multiplier = np.ones(size)
+    for name, reduction in reductions.items():
+        start = STRATEGIES[name][1]
+        multiplier *= np.where(months >= start, 1 - reduction, 1.0)
+    return multiplier
+
+
+def _outlook(hazard, counts, revenue, horizon):
+    # 개월 a인 고객의 앞으로 horizon개월: 예상 유지 개월 수 / window 안 이탈 확률
+    # 구독 중인 고객이 없으면(필터 결과가 모두 이탈 고객 등) 평균을 낼 수 없으므로 None
+    total = counts.sum()
+    if not total:
+        return None
+
+    survival = np.cumprod(1 - hazard, axis=1)
+    cum = np.cumsum(survival, axis=1)
+    ages = np.arange(counts.shape[1])
+    base = survival[:, ages]
+    months = (cum[:, ages + horizon] - cum[:, ages]) / base
+    churn = 1 - survival[:, ages + CHURN_WINDOW_MONTHS] / base
+
+    return {
+        'months': float((months * counts).sum() / total),
+        'churn': float((churn * counts).sum() / total),
+        'ltv': float((months * revenue).sum()),
+        'new_months': float(np.average(survival[:, 1:horizon + 1].sum(axis=1), weights=counts.sum(axis=1))),
+    }
+
+
+def project(table, reductions, winback=0.0, horizon=PROJECTION_MONTHS):
+    # 기존 / 전략 적용 후 비교. winback: 이탈 고객 중 재가입 비율 (신규 고객처럼 0개월부터 다시 시작)
+    # 생존 곡선은 마지막 관측 개월 + PROJECTION_MONTHS까지만 있다
+    # 구독 중인 고객이 없으면 None
+    if not 0 < horizon <= PROJECTION_MONTHS:
+        raise ValueError(f"horizon은 1~{PROJECTION_MONTHS}개월이어야 합니다: {horizon}")
+    hazard = table['hazard']
+    adjusted = np.clip(hazard * hazard_multiplier(hazard.shape[1], reductions), 0.0, MAX_HAZARD)
+    counts, revenue = table['active_counts'], table['active_revenue']
+
+    before = _outlook(hazard, counts, revenue, horizon)
+    if before is None:
+        return None
+    after = _outlook(adjusted, counts, revenue, horizon)
+
+    winback_customers = table['churned'] * winback
+    winback_ltv = winback_customers * table['mean_charge'] * after['new_months']
+    after['ltv'] += winback_ltv
+    return {
+        'before': before,
+        'after': after,
+        'churn_reduction': 1 - after['churn'] / before['churn'] if before['churn'] else 0.0,
+        'months_gain': after['months'] - before['months'],
+        'ltv_gain': after['ltv'] / before['ltv'] - 1 if before['ltv'] else 0.0,
+        'winback_customers': winback_customers,
+        # 재가입 고객이 기존 LTV에 더하는 비율
+        'winback_share': winback_ltv / before['ltv'] if before['ltv'] else 0.0,
+    }
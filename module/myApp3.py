@@ -1,16 +1,18 @@
 ##project screen2 화면2 최종 final 
 
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import numpy as np
 import pandas as pd
-import seaborn as sns
 import streamlit as st
-import os
-from lifelines import KaplanMeierFitter
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from scipy.ndimage import gaussian_filter
+from churn_data import SUBSCRIPTION_CSV, dataset_version
+from density import density_layers, plot_density, use_density
+from features import feature_frame
+from lazy_import import lazy
+from policy_sim import simulate_policy
+from precompute import load_corr, require_precomputed
+from segmentation import N_SEGMENTS, best_k, load_sweep
+from survival import km_by, plot_km
+from instrument import start_trace, trace_frame
+from vega_charts import backend_selector, show_chart
+import vega_charts as vc
 
 
 # ======================
@@ -18,56 +20,78 @@ from scipy.ndimage import gaussian_filter
 # ======================
 st.set_page_config(layout="wide")
 st.title("OTT Churn Analytics Dashboard\n(현황 → 원인 → 전략)")
+# 차트를 서버에서 그릴지(matplotlib) 브라우저에서 그릴지(Vega-Lite) 선택
+backend_selector()
+# 섹션별 시간 / 캐시 / 메모리 기록 (INSTRUMENT_MEMORY=1로 띄운 경우 디버그 패널을 켜면 tracemalloc까지)
+debug_panel = st.sidebar.checkbox("🛠 성능 디버그 패널", key='debug_panel')
+trace = start_trace('myApp3', memory=debug_panel)
+trace.mark('데이터 로드')
 
 # -----------------------------
 # 데이터 로드
 # -----------------------------
-df = pd.read_csv("data/Subscription_Service_Churn_Dataset.csv")
-df['tenure'] = df['AccountAge']
-df['churn'] = df['Churn']
-df['long_term'] = df['tenure'] >= 6
+# 분석 결과물은 별도 워커가 데이터 버전별로 미리 계산한다 (페이지는 읽기만)
+# (워커가 계산 중이면 잠깐만 기다리고, 그래도 안 끝났으면 안내를 띄운 채 준비될 때까지 멈춘다)
+require_precomputed(SUBSCRIPTION_CSV)
+
+# 파생 컬럼은 features.py에서 데이터 버전별로 한 번만 계산해 캐시된 것을 공유한다
+FEATURE_NAMES = ('tenure', 'churn', 'long_term', 'engagement_score')
+df = feature_frame(SUBSCRIPTION_CSV, FEATURE_NAMES)
+
+# matplotlib / seaborn은 제목과 사이드바를 먼저 그린 뒤 불러온다 (lazy_import.py)
+plt = lazy('matplotlib.pyplot')
+sns = lazy('seaborn')
 
 
 # =====================
 # 생존여부
 # =====================
+trace.mark('3개월 이탈 구조', rows=len(df))
 st.header("3개월 이탈 구조")
 
-kmf = KaplanMeierFitter()
-kmf.fit(df['tenure'], event_observed=df['churn'])
+def draw_survival(curves):
+    fig1, ax1 = plt.subplots(figsize=(7,5))
+    for label, curve in curves.items():
+        plot_km(ax1, curve, label=label, linewidth=3)
+    ax1.axvline(3, color='red', linestyle='--')
+    ax1.grid(alpha=0.3)
+    return fig1
 
-fig1, ax1 = plt.subplots(figsize=(7,5))
-kmf.plot_survival_function(ax=ax1, linewidth=3)
-ax1.axvline(3, color='red', linestyle='--')
-ax1.grid(alpha=0.3)
-st.pyplot(fig1)
+curves = km_by(SUBSCRIPTION_CSV)
+show_chart(draw_survival, curves, spec=lambda: vc.km_spec(curves))
 ''
 
 # =========================
 #  사용자 시청 패턴
 # =========================
+trace.mark('사용자 시청 패턴', rows=len(df))
 st.header("사용자 시청 패턴")
 
-fig2, ax2 = plt.subplots(figsize=(7,5))
-sns.scatterplot(
-    data=df,
-    x='ViewingHoursPerWeek',
-    y='tenure',
-    hue='long_term',
-    alpha=0.6,
-    ax=ax2
-)
-ax2.axvline(10, linestyle='--')
-ax2.axhline(6, linestyle='--')
-ax2.set_title("Magic Moment: Viewing vs Survival")
-st.pyplot(fig2)
-
-df['engagement_score'] = (
-    df['ViewingHoursPerWeek'] * 0.4 +
-    df['ContentDownloadsPerMonth'] * 0.3 +
-    df['WatchlistSize'] * 0.2 +
-    df['UserRating'] * 0.1
-)
+def draw_magic_moment(df):
+    fig2, ax2 = plt.subplots(figsize=(7,5))
+    # 고객이 많으면 점 대신 밀도(장기/단기 고객별 등고선)
+    if use_density(len(df)):
+        plot_density(ax2, *density_layers(df['ViewingHoursPerWeek'], df['tenure'], df['long_term']),
+                     legend_title='long_term')
+    else:
+        sns.scatterplot(
+            data=df,
+            x='ViewingHoursPerWeek',
+            y='tenure',
+            hue='long_term',
+            alpha=0.6,
+            ax=ax2
+        )
+    ax2.axvline(10, linestyle='--')
+    ax2.axhline(6, linestyle='--')
+    ax2.set_title("Magic Moment: Viewing vs Survival")
+    return fig2
+
+show_chart(draw_magic_moment, df[['ViewingHoursPerWeek', 'tenure', 'long_term']],
+           key=('magic_moment', dataset_version(SUBSCRIPTION_CSV)),
+           spec=lambda: vc.scatter_spec(df, 'ViewingHoursPerWeek', 'tenure', color='long_term',
+                                        title="Magic Moment: Viewing vs Survival",
+                                        rules={'x': [10], 'y': [6]}))
 
 threshold = 30
 magic_users = df[df['ViewingHoursPerWeek'] >= threshold]
@@ -82,6 +106,7 @@ st.metric("주 10시간 이상 유지율", f"{magic_prob*100:.1f}%")
 # =========================
 #  핵심 행동 변수들
 # =========================
+trace.mark('핵심 행동 변수들', rows=len(df))
 st.header("핵심 행동 변수들")
 
 features = [
@@ -92,54 +117,96 @@ features = [
     'WatchlistSize'
 ]
 
-corr = df[features + ['Churn']].corr()
+corr = load_corr(SUBSCRIPTION_CSV, features + ['Churn'])
+
+def draw_corr(corr):
+    fig3, ax3 = plt.subplots(figsize=(7,5))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax3)
+    ax3.set_title("Correlation with Churn")
+    return fig3
 
-fig3, ax3 = plt.subplots(figsize=(7,5))
-sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax3)
-ax3.set_title("Correlation with Churn")
-st.pyplot(fig3)
+show_chart(draw_corr, corr, spec=lambda: vc.heatmap_spec(corr, title="Correlation with Churn"))
 
 # =========================
 #  유저 분화
 # =========================
+trace.mark('유저 분화', rows=len(df))
 st.header("유저 분화")
 
 palette = {
     0: "#1f77b4",
     1: "#ff7f0e",
     2: "#2ca02c",
-    3: "#d62728"
+    3: "#d62728",
+    4: "#9467bd",
+    5: "#8c564b",
+    6: "#e377c2",
+    7: "#7f7f7f",
 }
 
-seg_features = df[
-    ['ViewingHoursPerWeek','WatchlistSize',
-     'ContentDownloadsPerMonth','SupportTicketsPerMonth']
-]
-
-X = StandardScaler().fit_transform(seg_features)
-kmeans = KMeans(n_clusters=4, random_state=42)
-df['segment'] = kmeans.fit_predict(X)
-
-fig4, ax4 = plt.subplots(figsize=(7,5))
-sns.scatterplot(
-    data=df,
-    x='ViewingHoursPerWeek',
-    y='WatchlistSize',
-    hue='segment',
-    palette=palette,   
-    alpha=0.7,
-    ax=ax4
-)
-ax4.set_title("User Segments by Behavior")
-ax4.set_xlabel("Viewing Hours per Week")
-ax4.set_ylabel("Watchlist Size")
-st.pyplot(fig4)
+# 세그먼트 수(k) 후보 비교는 백그라운드 프로세스에서 계산 (끝나기 전에는 기본값 사용)
+def draw_sweep(sweep_df):
+    fig, ax = plt.subplots(figsize=(7,3))
+    ax.plot(sweep_df['k'], sweep_df['inertia'], marker='o', color='black', label='inertia')
+    ax.set_xlabel('k')
+    ax.set_ylabel('inertia')
+    ax_s = ax.twinx()
+    ax_s.plot(sweep_df['k'], sweep_df['silhouette'], marker='o', color='#E50914')
+    ax_s.set_ylabel('silhouette', color='#E50914')
+    ax.set_title("Elbow / Silhouette")
+    return fig
+
+n_segments = N_SEGMENTS
+with st.expander("세그먼트 수(k) 선택"):
+    sweep = load_sweep(SUBSCRIPTION_CSV)
+    if sweep is None:
+        st.info(f"k 후보 비교를 백그라운드에서 계산 중입니다. 지금은 k={N_SEGMENTS}로 표시합니다.")
+    else:
+        sweep_df = pd.DataFrame(sweep)
+        show_chart(draw_sweep, sweep_df,
+                   spec=lambda: vc.bar_line_spec(sweep_df['k'], sweep_df['inertia'], sweep_df['silhouette'],
+                                                 title="Elbow / Silhouette", bar_title='inertia',
+                                                 line_title='silhouette'))
+        ks = sweep_df['k'].tolist()
+        n_segments = st.selectbox("세그먼트 수", ks, index=ks.index(N_SEGMENTS) if N_SEGMENTS in ks else 0,
+                                  help=f"silhouette 기준 추천: k={best_k(sweep)}")
+
+# 세그먼트 배정은 (데이터 버전, k)별로 한 번만 계산해서 저장된 컬럼을 읽는다
+df = feature_frame(SUBSCRIPTION_CSV, FEATURE_NAMES + ('segment',), k=n_segments)
+
+def draw_segments(df):
+    fig4, ax4 = plt.subplots(figsize=(7,5))
+    # 고객이 많으면 점 대신 밀도(세그먼트별 등고선)
+    if use_density(len(df)):
+        plot_density(ax4, *density_layers(df['ViewingHoursPerWeek'], df['WatchlistSize'], df['segment']),
+                     colors=palette, legend_title='segment')
+    else:
+        sns.scatterplot(
+            data=df,
+            x='ViewingHoursPerWeek',
+            y='WatchlistSize',
+            hue='segment',
+            palette=palette,   
+            alpha=0.7,
+            ax=ax4
+        )
+    ax4.set_title("User Segments by Behavior")
+    ax4.set_xlabel("Viewing Hours per Week")
+    ax4.set_ylabel("Watchlist Size")
+    return fig4
+
+segmented = df.loc[df['segment'] >= 0, ['ViewingHoursPerWeek', 'WatchlistSize', 'segment']]
+show_chart(draw_segments, segmented,
+           key=('segments', dataset_version(SUBSCRIPTION_CSV), n_segments),
+           spec=lambda: vc.scatter_spec(segmented, 'ViewingHoursPerWeek', 'WatchlistSize', color='segment',
+                                        title="User Segments by Behavior", opacity=0.7))
 ''
 
 
 # =========================
 # 외부 원인 
 # =========================
+trace.mark('외부 원인', rows=len(df))
 st.header(" 외부 원인 ")
 
 market_df = pd.DataFrame({
@@ -147,49 +214,46 @@ market_df = pd.DataFrame({
     'Percent': [44, 64, 53]
 })
 
-fig5, ax5 = plt.subplots(figsize=(7,5))
-ax5.plot(market_df['Reason'], market_df['Percent'], marker='o')
-ax5.set_ylim(0,100)
-ax5.set_title("Market Churn Reasons")
-ax5.set_ylabel("%")
-st.pyplot(fig5)
+def draw_market(market_df):
+    fig5, ax5 = plt.subplots(figsize=(7,5))
+    ax5.plot(market_df['Reason'], market_df['Percent'], marker='o')
+    ax5.set_ylim(0,100)
+    ax5.set_title("Market Churn Reasons")
+    ax5.set_ylabel("%")
+    return fig5
+
+show_chart(draw_market, market_df,
+           spec=lambda: vc.line_spec(market_df['Reason'], market_df['Percent'], title="Market Churn Reasons",
+                                     y_title="%", y_domain=(0, 100)))
 ''
 
 # =========================
 # 3개월 무료권 효과
 # =========================
+trace.mark('3개월차 무료권 효과', rows=len(df))
 st.header(" 3개월차 무료권 효과")
-baseline = df['long_term'].mean() 
-
-risk_group = df[
-    (df['tenure'] <= 3) &
-    (df['ViewingHoursPerWeek'] < 10)
-].copy()
-
-
-baseline = (risk_group['tenure'] >= 6).mean()
-
-converted_idx = risk_group.sample(frac=0.4, random_state=42).index
-
-df_sim = df.copy()
-df_sim.loc[converted_idx, 'tenure'] = 6   
-
-risk_group_sim = df_sim.loc[risk_group.index]
-improved = (risk_group_sim['tenure'] >= 6).mean()
+# 위험군(3개월 이하, 주 10시간 미만) 40%가 무료권으로 6개월 유지 (데이터 복사 없이 mask로 계산)
+baseline, improved = simulate_policy(df['tenure'], df['ViewingHoursPerWeek'], frac=0.4,
+                                     max_tenure=3, viewing_cutoff=10, seed=42)
 
 x = [0, 1]
 y = [baseline, improved]
 
-fig6, ax6 = plt.subplots(figsize=(5,4))
-ax6.plot(x, y, marker='o', linewidth=3)
-ax6.set_xticks([0,1])
-ax6.set_xticklabels(['기존','3개월 무료권'])
-ax6.set_xlim(-0.2, 1.2)
-ax6.set_ylim(-0.1, 1)   
-ax6.set_ylabel("6개월 유지 확률")
-ax6.set_title("3개월 무료권 정책 효과 (High-risk Users)")
-ax6.grid(alpha=0.3)
-st.pyplot(fig6)
+def draw_policy_effect(x, y):
+    fig6, ax6 = plt.subplots(figsize=(5,4))
+    ax6.plot(x, y, marker='o', linewidth=3)
+    ax6.set_xticks([0,1])
+    ax6.set_xticklabels(['기존','3개월 무료권'])
+    ax6.set_xlim(-0.2, 1.2)
+    ax6.set_ylim(-0.1, 1)   
+    ax6.set_ylabel("6개월 유지 확률")
+    ax6.set_title("3개월 무료권 정책 효과 (High-risk Users)")
+    ax6.grid(alpha=0.3)
+    return fig6
+
+show_chart(draw_policy_effect, x, y,
+           spec=lambda: vc.line_spec(['기존', '3개월 무료권'], y, title="3개월 무료권 정책 효과 (High-risk Users)",
+                                     y_title="6개월 유지 확률", y_domain=(-0.1, 1)))
 ''
 
 # =========================
@@ -200,10 +264,14 @@ sports_df = pd.DataFrame({
     'Live': [0,1,1]
 })
 
-fig7, ax7 = plt.subplots()
-ax7.plot(sports_df['Service'], sports_df['Live'], marker='o')
-ax7.set_title("Live Sports Availability")
-st.pyplot(fig7)
+def draw_sports(sports_df):
+    fig7, ax7 = plt.subplots()
+    ax7.plot(sports_df['Service'], sports_df['Live'], marker='o')
+    ax7.set_title("Live Sports Availability")
+    return fig7
+
+show_chart(draw_sports, sports_df,
+           spec=lambda: vc.line_spec(sports_df['Service'], sports_df['Live'], title="Live Sports Availability"))
 ''
 
 # =========================
@@ -219,13 +287,23 @@ bundle_brand_df = pd.DataFrame({
     'Ratio':[86,52,39,23,16]
 })
 
-fig8, ax8 = plt.subplots(1,2, figsize=(10,4))
-ax8[0].pie(bundle_count_df['Ratio'], labels=bundle_count_df['Count'], autopct='%1.0f%%')
-ax8[0].set_title("구독 개수 분포")
-
-ax8[1].pie(bundle_brand_df['Ratio'], labels=bundle_brand_df['OTT'], autopct='%1.0f%%')
-ax8[1].set_title("결합상품 브랜드 구성")
-st.pyplot(fig8)
+def draw_bundles(bundle_count_df, bundle_brand_df):
+    fig8, ax8 = plt.subplots(1,2, figsize=(10,4))
+    ax8[0].pie(bundle_count_df['Ratio'], labels=bundle_count_df['Count'], autopct='%1.0f%%')
+    ax8[0].set_title("구독 개수 분포")
+
+    ax8[1].pie(bundle_brand_df['Ratio'], labels=bundle_brand_df['OTT'], autopct='%1.0f%%')
+    ax8[1].set_title("결합상품 브랜드 구성")
+    return fig8
+
+if vc.current_backend() == 'vega':
+    bundle_col1, bundle_col2 = st.columns(2)
+    with bundle_col1:
+        st.vega_lite_chart(spec=vc.pie_spec(bundle_count_df['Count'], bundle_count_df['Ratio'], title="구독 개수 분포"))
+    with bundle_col2:
+        st.vega_lite_chart(spec=vc.pie_spec(bundle_brand_df['OTT'], bundle_brand_df['Ratio'], title="결합상품 브랜드 구성"))
+else:
+    show_chart(draw_bundles, bundle_count_df, bundle_brand_df)
 ''
 combo_df = pd.DataFrame({
     'Combo': [
@@ -238,17 +316,22 @@ combo_df = pd.DataFrame({
     'Ratio': [28, 22, 15, 12, 23]
 })
 
-fig9, ax9 = plt.subplots()
-ax9.pie(combo_df['Ratio'], 
-       labels=combo_df['Combo'], 
-       autopct='%1.0f%%')
-ax9.set_title("주요 OTT 결합 조합")
-st.pyplot(fig9)
+def draw_combo(combo_df):
+    fig9, ax9 = plt.subplots()
+    ax9.pie(combo_df['Ratio'], 
+           labels=combo_df['Combo'], 
+           autopct='%1.0f%%')
+    ax9.set_title("주요 OTT 결합 조합")
+    return fig9
+
+show_chart(draw_combo, combo_df,
+           spec=lambda: vc.pie_spec(combo_df['Combo'], combo_df['Ratio'], title="주요 OTT 결합 조합"))
 ''
 
 # =========================
 # 최종 요약
 # =========================
+trace.mark('최종 결론', rows=len(df))
 st.header("최종 결론")
 
 st.markdown(f"""
@@ -306,3 +389,14 @@ OTT churn은 개인 만족도의 문제가 아니라
 **초기 행동 유도 → 콘텐츠 구조 개선 → 가격 개입을 포함한  
 통합적 생존 설계 전략**이어야 한다.
 """)
+
+
+# =========================
+# 성능 디버그
+# =========================
+records = trace.finish()
+if debug_panel:
+    with st.sidebar:
+        st.markdown("#### 🛠 섹션별 성능 (이번 실행)")
+        st.dataframe(trace_frame(records), use_container_width=True)
+        st.caption(f"rerun 전체 {trace.total_ms:,.0f} ms")
@@ -1,10 +1,10 @@
 import streamlit as st
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import numpy as np
 import os
 import platform
+from density import density_layers, plot_density, use_density
+from recency_risk import RED_LINE_DAYS, recency_frame, red_line_colors
 
 # 1. 한글 폰트 설정 (필수)
 # def set_korean_font():
@@ -84,20 +84,9 @@ st.markdown("---")
 st.header("2. 위험군 식별: \"14일의 법칙 (Red-line)\"")
 st.info("💡 마지막 접속일(Recency) 경과에 따른 이탈 확률 상관관계")
 
-# 산점도 데이터 생성 (트렌드를 보여주기 위한 가상 데이터 생성)
-np.random.seed(42)
-recency_days = np.random.randint(1, 31, 200) # 1~30일 경과한 유저 200명
-# 이탈 확률 함수 (S커브 형태: 7일에 45%, 14일에 82%가 되도록 조정)
-def churn_prob(day):
-    # 로지스틱 함수 변형
-    base_prob = 1 / (1 + np.exp(-(day - 8) * 0.4)) 
-    # 약간의 노이즈 추가 (산점도처럼 보이게)
-    noise = np.random.normal(0, 0.05)
-    prob = base_prob + noise
-    return np.clip(prob * 100, 0, 100)
-
-churn_probs = [churn_prob(d) for d in recency_days]
-df_scatter = pd.DataFrame({'Recency': recency_days, 'ChurnProb': churn_probs})
+# 산점도 데이터 (경과일 컬럼이 없으면 트렌드를 보여주기 위한 가상 데이터)
+# 이탈 확률 곡선 (S커브 형태: 7일에 45%, 14일에 82% 근처) 은 recency_risk에서 배열 단위로 계산
+df_scatter, _ = recency_frame()
 
 col3, col4 = st.columns([2, 1])
 
@@ -106,8 +95,14 @@ with col3:
 
     # 산점도 그리기
     # 14일 기준 색상 구분 (Red Line 넘으면 빨강)
-    colors = ['red' if x >= 14 else 'blue' for x in df_scatter['Recency']]
-    ax3.scatter(df_scatter['Recency'], df_scatter['ChurnProb'], c=colors, alpha=0.6, edgecolors='w', s=80)
+    # 점이 많으면 레드라인 전/후 밀도로 그린다
+    if use_density(len(df_scatter)):
+        plot_density(ax3, *density_layers(df_scatter['Recency'], df_scatter['ChurnProb'],
+                                          df_scatter['Recency'] >= RED_LINE_DAYS),
+                     colors={False: 'blue', True: 'red'})
+    else:
+        colors = red_line_colors(df_scatter['Recency'])
+        ax3.scatter(df_scatter['Recency'], df_scatter['ChurnProb'], c=colors, alpha=0.6, edgecolors='w', s=80)
 
     # 레드라인 (x=14)
     ax3.axvline(x=14, color='red', linestyle='--', linewidth=2)
@@ -0,0 +1,133 @@
+# ======================================================== 요금제 / 월 필터 인덱스 =============================================================
+# 사이드바의 '요금제 필터'와 '분석 월 선택'을 모든 페이지에 적용하기 위한 행 인덱스.
+#   - 행 번호를 (요금제(SubscriptionType), 가입 월) 순서로 한 번 정렬해 data/.cache 에 저장해 둔다
+#   - 요금제 하나 = 정렬된 행 번호의 연속 구간, 그 안에서 '선택한 달까지 가입한 고객' = 구간의 앞부분
+#     → 필터는 boolean mask로 전체를 훑지 않고 searchsorted 몇 번으로 행 번호 배열을 잘라낸다
+#   - 잘라낸 행만 take 해서 만든 데이터프레임을 (데이터 버전, 요금제, 월)별로 캐시한다
+# 가입 / 이탈 월은 kpi.customer_months와 같은 기준 (날짜 컬럼이 없으면 AccountAge로 추정).
+# 선택한 달 이전에 이탈한 고객(날짜가 있는 데이터만 해당)은 잘라낸 구간 안에서만 걸러낸다.
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from churn_data import CHURN_CSV, artifact_path, dataset_version, load_churn, read_only
+from kpi import customer_months
+
+INDEX_NAME = "plan_index.npz"
+PLAN_COLUMN = 'SubscriptionType'
+
+# 사이드바 요금제 이름 → SubscriptionType 값
+PLAN_OPTIONS = {
+    '전체': None,
+    '광고형': 'Basic',
+    '스탠다드': 'Standard',
+    '프리미엄': 'Premium',
+}
+
+
+def build_index(df):
+    plan = df[PLAN_COLUMN].astype('category')
+    labels = [str(c) for c in plan.cat.categories]
+    # 결측 요금제(-1)는 마지막 구간으로
+    codes = plan.cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(labels)
+    signup, churn, _ = customer_months(df)
+
+    order = np.lexsort((signup, codes))
+    starts = np.searchsorted(codes[order], np.arange(len(labels) + 2))
+    return {
+        'labels': labels,
+        'order': order,
+        'starts': starts,
+        'signup': signup[order],
+        'churn': churn[order],
+    }
+
+
+def _save_index(index, index_path):
+    tmp = f"{index_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, order=index['order'], starts=index['starts'], signup=index['signup'],
+             churn=index['churn'], labels=np.array(json.dumps(index['labels'], ensure_ascii=False)))
+    os.replace(tmp, index_path)
+
+
+@lru_cache(maxsize=4)
+def _load_index(path, index_path):
+    if os.path.exists(index_path):
+        with np.load(index_path) as data:
+            index = {name: data[name] for name in ('order', 'starts', 'signup', 'churn')}
+            index['labels'] = json.loads(str(data['labels']))
+        return index
+
+    index = build_index(load_churn(path))
+    _save_index(index, index_path)
+    return index
+
+
+def load_plan_index(path=CHURN_CSV):
+    path = os.path.abspath(path)
+    return _load_index(path, artifact_path(path, INDEX_NAME))
+
+
+@lru_cache(maxsize=32)
+def _plan_rows(path, version, plan, month):
+    index = load_plan_index(path)
+    starts = index['starts']
+    if plan is None:
+        bounds = [(starts[i], starts[i + 1]) for i in range(len(starts) - 1)]
+    elif plan in index['labels']:
+        pos = index['labels'].index(plan)
+        bounds = [(starts[pos], starts[pos + 1])]
+    else:
+        bounds = []
+
+    parts = []
+    for lo, hi in bounds:
+        if month is not None:
+            hi = lo + np.searchsorted(index['signup'][lo:hi], month, side='right')
+        parts.append(slice(lo, hi))
+    selected = sum(s.stop - s.start for s in parts)
+
+    order = index['order']
+    rows = np.concatenate([order[s] for s in parts]) if parts else np.empty(0, dtype=order.dtype)
+    if month is not None and parts:
+        churn = np.concatenate([index['churn'][s] for s in parts])
+        keep = (churn < 0) | (churn >= month)
+        if not keep.all():
+            rows = rows[keep]
+            selected = len(rows)
+    if selected == len(order):
+        return None
+    return np.sort(rows)
+
+
+def plan_rows(path=CHURN_CSV, plan=None, month=None):
+    # 조건에 맞는 행 번호 (원래 행 순서, 읽기 전용으로 공유). 전체 행이면 None
+    # plan: SubscriptionType 값, month: kpi.month_number 기준 정수 (그 달까지 가입한 고객)
+    path = os.path.abspath(path)
+    return _plan_rows(path, dataset_version(path), plan, month)
+
+
+@lru_cache(maxsize=16)
+def _filtered_frame(path, version, plan, month):
+    df = load_churn(path)
+    rows = plan_rows(path, plan, month) if plan is not None or month is not None else None
+    if rows is None:
+        return df
+    return read_only(df.take(rows).reset_index(drop=True))
+
+
+def filtered_frame(path=CHURN_CSV, plan=None, month=None):
+    # 필터를 적용한 데이터프레임 (캐시와 공유되므로 수정하려면 복사해서 쓴다)
+    path = os.path.abspath(path)
+    return _filtered_frame(path, dataset_version(path), plan, month)
+
+
+def is_filtered(path=CHURN_CSV, plan=None, month=None):
+    # 필터가 실제로 행을 줄이는지 (아니면 페이지는 전체 데이터용 결과물을 그대로 읽는다)
+    if plan is None and month is None:
+        return False
+    return plan_rows(path, plan, month) is not None
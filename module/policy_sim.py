@@ -0,0 +1,150 @@
+# ======================================================== 정책 시뮬레이션 =============================================================
+# '초기 무료 제공' 정책 효과를 데이터프레임 복사(df.copy()) 없이 계산한다.
+#   - 대상(위험군): 가입기간 <= max_tenure 이고 주간 시청 시간 < viewing_cutoff 인 고객의 위치(index)
+#   - 전환 고객: 위험군 안에서의 boolean mask (가입기간을 target으로 덮어쓴 것과 같은 효과)
+#   - 유지율: (원래 6개월 이상 유지 | 전환) 의 위험군 평균
+# 전환 비율(frac) 여러 개는 한 번의 무작위 순열로 같이 계산한다.
+# seed가 같으면 risk.sample(frac=frac, random_state=seed)로 뽑은 것과 같은 고객이 전환된다.
+# monte_carlo_policy는 같은 시나리오를 수천 번 반복한 평균과 신뢰구간을 낸다.
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+LONG_TERM_MONTHS = 6
+
+POLICY_FRAC = 0.4
+POLICY_MAX_TENURE = 3
+POLICY_VIEWING_CUTOFF = 10
+
+
+def eligible_index(tenure, viewing, max_tenure=POLICY_MAX_TENURE, viewing_cutoff=POLICY_VIEWING_CUTOFF):
+    tenure = np.asarray(tenure)
+    viewing = np.asarray(viewing, dtype=np.float64)
+    return np.flatnonzero((tenure <= max_tenure) & (viewing < viewing_cutoff))
+
+
+def _conversion_rank(n, seed):
+    # rank[i] < k 이면 i번째 대상 고객이 k명 표본에 포함 (pandas sample과 같은 순열)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.random.RandomState(seed).permutation(n)] = np.arange(n)
+    return rank
+
+
+def _sample_size(n, frac):
+    return np.round(np.asarray(frac, dtype=np.float64) * n).astype(np.int64)
+
+
+def converted_mask(n, frac=POLICY_FRAC, seed=42):
+    # 대상 n명 중 전환된 고객 (boolean)
+    return _conversion_rank(n, seed) < _sample_size(n, frac)
+
+
+def simulate_policy(tenure, viewing, frac=POLICY_FRAC, max_tenure=POLICY_MAX_TENURE,
+                    viewing_cutoff=POLICY_VIEWING_CUTOFF, target=LONG_TERM_MONTHS, seed=42):
+    # 반환: (기존 유지율, 정책 적용 후 유지율)
+    result = sweep_policy(tenure, viewing, fracs=[frac], max_tenures=[max_tenure],
+                          viewing_cutoffs=[viewing_cutoff], target=target, seed=seed)
+    return result['baseline'].iloc[0], result['improved'].iloc[0]
+
+
+def sweep_policy(tenure, viewing, fracs=(POLICY_FRAC,), max_tenures=(POLICY_MAX_TENURE,),
+                 viewing_cutoffs=(POLICY_VIEWING_CUTOFF,), target=LONG_TERM_MONTHS, seed=42):
+    # (max_tenure, viewing_cutoff, frac) 조합별 결과 한 행씩
+    tenure = np.asarray(tenure)
+    viewing = np.asarray(viewing, dtype=np.float64)
+    fracs = np.asarray(fracs, dtype=np.float64)
+
+    rows = []
+    for max_tenure, cutoff in product(max_tenures, viewing_cutoffs):
+        idx = eligible_index(tenure, viewing, max_tenure, cutoff)
+        n = len(idx)
+        retained = tenure[idx] >= LONG_TERM_MONTHS
+        if n == 0:
+            baseline = improved = np.full(len(fracs), np.nan)
+        else:
+            # (frac 개수 × 대상 고객) 전환 mask를 한 번에
+            converted = _conversion_rank(n, seed)[None, :] < _sample_size(n, fracs)[:, None]
+            kept = retained | (converted & (target >= LONG_TERM_MONTHS))
+            baseline = np.full(len(fracs), retained.mean())
+            improved = kept.mean(axis=1)
+        rows.append(pd.DataFrame({
+            'max_tenure': max_tenure,
+            'viewing_cutoff': cutoff,
+            'frac': fracs,
+            'eligible': n,
+            'baseline': baseline,
+            'improved': improved,
+        }))
+
+    result = pd.concat(rows, ignore_index=True)
+    result['lift'] = result['improved'] - result['baseline']
+    return result
+
+
+# ======================================================== 몬테카를로 =================================================================
+# 한 번의 seed로 뽑은 점추정 대신, 반복 실험 분포에서 평균과 신뢰구간을 낸다.
+# 반복마다 데이터프레임을 다루지 않고 (대상 수 n, 원래 유지 고객 수 r)만으로 NumPy 배치 추출:
+#   - 위험군 자체의 표본 불확실성: r* ~ Binomial(n, r / n)   (부트스트랩)
+#   - 전환 불확실성: 각 대상이 frac 확률로 전환 → 새로 유지되는 고객 ~ Binomial(n - r*, frac)
+MC_REPLICATIONS = 10_000
+MC_CONFIDENCE = 0.95
+
+
+def _mc_rule(n, r, fracs, n_reps, confidence, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    fracs = np.asarray(fracs, dtype=np.float64)
+    if n == 0:
+        empty = np.full(len(fracs), np.nan)
+        return {k: empty for k in ('baseline', 'baseline_lower', 'baseline_upper', 'improved',
+                                   'improved_lower', 'improved_upper', 'lift', 'lift_lower', 'lift_upper')}
+
+    kept = rng.binomial(n, r / n, size=(n_reps, 1))
+    newly = rng.binomial(n - kept, fracs[None, :], size=(n_reps, len(fracs)))
+    baseline = np.broadcast_to(kept / n, newly.shape)
+    improved = (kept + newly) / n
+    lift = improved - baseline
+
+    q = [(1 - confidence) / 2, (1 + confidence) / 2]
+    out = {}
+    for name, draws in (('baseline', baseline), ('improved', improved), ('lift', lift)):
+        lower, upper = np.quantile(draws, q, axis=0)
+        out[name] = draws.mean(axis=0)
+        out[f"{name}_lower"] = lower
+        out[f"{name}_upper"] = upper
+    return out
+
+
+def monte_carlo_policy(tenure, viewing, fracs=(POLICY_FRAC,), max_tenures=(POLICY_MAX_TENURE,),
+                       viewing_cutoffs=(POLICY_VIEWING_CUTOFF,), n_reps=MC_REPLICATIONS,
+                       confidence=MC_CONFIDENCE, seed=42, workers=1):
+    # (max_tenure, viewing_cutoff, frac) 조합별 평균 / 신뢰구간. workers > 1 이면 규칙별로 프로세스 풀 사용
+    tenure = np.asarray(tenure)
+    viewing = np.asarray(viewing, dtype=np.float64)
+    rules = list(product(max_tenures, viewing_cutoffs))
+
+    counts = []
+    for max_tenure, cutoff in rules:
+        idx = eligible_index(tenure, viewing, max_tenure, cutoff)
+        counts.append((len(idx), int((tenure[idx] >= LONG_TERM_MONTHS).sum())))
+
+    # 규칙마다 독립된 난수열 → 풀 크기와 상관없이 같은 결과
+    seeds = np.random.SeedSequence(seed).spawn(len(rules))
+    args = [(n, r, fracs, n_reps, confidence, s) for (n, r), s in zip(counts, seeds)]
+    if workers > 1 and len(rules) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_mc_rule, *zip(*args)))
+    else:
+        results = [_mc_rule(*a) for a in args]
+
+    rows = []
+    for (max_tenure, cutoff), (n, _), stats in zip(rules, counts, results):
+        rows.append(pd.DataFrame(dict({
+            'max_tenure': max_tenure,
+            'viewing_cutoff': cutoff,
+            'frac': np.asarray(fracs, dtype=np.float64),
+            'eligible': n,
+        }, **stats)))
+    return pd.concat(rows, ignore_index=True)
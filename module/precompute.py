@@ -0,0 +1,349 @@
+# ======================================================== 분석 결과 사전 계산 =============================================================
+# 페이지 스크립트가 무거운 분석을 직접 하지 않도록, 데이터가 바뀌면(=데이터 버전이 바뀌면)
+# 별도 워커 프로세스가 페이지에 필요한 결과물을 프로세스 풀로 한꺼번에 계산해서
+# data/.cache 에 버전별로 저장한다. 페이지는 저장된 결과물을 읽기만 한다.
+#   - 이탈 집계 큐브, KM 생존 곡선, 상관계수 행렬, 중요도 모델 계수 / 위험 점수, 고객 세그먼트, 월별 KPI, 요금제 / 월 필터 인덱스
+#   - 모두 끝나면 <파일명>.<버전>.manifest.json 에 결과물별 계산 시간을 기록
+#   - 워커가 도는 동안 다른 요청은 같은 계산을 하지 않는다.
+#     페이지는 require_precomputed로 PAGE_WAIT_SECONDS만 기다리고, 그래도 안 끝났으면 안내를 띄운 채
+#     rerun을 멈췄다가 준비되면 자동으로 다시 실행한다 (결과물이 필요한 페이지에서만 부른다)
+#   - 잠금 파일에는 워커의 pid / 호스트를 적어 두고, 그 프로세스가 죽었으면 바로 오래된 잠금으로 본다
+#   - 워커가 실패하면 <파일명>.<버전>.precompute.failed 에 traceback을 남기고, 그 데이터 버전에서는
+#     워커를 다시 띄우지 않는다 (페이지가 직접 계산). 한 프로세스는 데이터 버전마다 워커를 한 번만 띄운다
+#
+# 배포 / 데이터 갱신 직후 직접 돌릴 수도 있다:
+#   python module/precompute.py [CSV 경로 ...]
+
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+from churn_data import (CHURN_CSV, SUBSCRIPTION_CSV, _pyarrow, artifact_path, dataset_version, ensure_snapshot,
+                        load_churn)
+from plan_index import filtered_frame, is_filtered
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "precompute.lock"
+FAILED_NAME = "precompute.failed"
+
+PRECOMPUTE_WORKERS = min(os.cpu_count() or 1, 4)
+# 이 시간(초)이 지나도 manifest가 없으면 워커가 죽은 것으로 보고 페이지에서 직접 계산
+# (잠금 파일의 pid로 생존을 확인할 수 없을 때만 쓰는 기준: 다른 호스트 / Windows)
+PRECOMPUTE_TIMEOUT = 300
+POLL_SECONDS = 0.2
+# 페이지 rerun 안에서 기다리는 시간 / 기다리는 동안 준비됐는지 확인하는 간격 (초)
+PAGE_WAIT_SECONDS = 2
+PAGE_POLL_SECONDS = 2
+
+# myApp3 상관계수 변수
+SUBSCRIPTION_CORR = (
+    'ViewingHoursPerWeek',
+    'SupportTicketsPerMonth',
+    'MonthlyCharges',
+    'ContentDownloadsPerMonth',
+    'WatchlistSize',
+    'Churn',
+)
+
+# 이 프로세스가 띄운 워커 ((CSV 경로, 데이터 버전): Popen)
+_workers = {}
+
+
+# ======================================================== 상관계수 =================================================================
+def _corr_name(columns):
+    digest = hashlib.sha1('|'.join(columns).encode()).hexdigest()[:10]
+    return f"corr.{digest}.json"
+
+
+@lru_cache(maxsize=8)
+def _load_corr(path, corr_path, columns):
+    if os.path.exists(corr_path):
+        return pd.read_json(corr_path, orient='split')
+
+    corr = load_churn(path)[list(columns)].corr()
+    tmp = f"{corr_path}.{os.getpid()}.tmp"
+    corr.to_json(tmp, orient='split')
+    os.replace(tmp, corr_path)
+    return corr
+
+
+@lru_cache(maxsize=16)
+def _filtered_corr(path, version, columns, plan, month):
+    return filtered_frame(path, plan, month)[list(columns)].corr()
+
+
+def load_corr(path=CHURN_CSV, columns=(), plan=None, month=None):
+    # 반환값은 캐시와 공유되므로 수정하려면 복사해서 쓴다. plan / month: 사이드바 필터
+    path = os.path.abspath(path)
+    columns = tuple(columns)
+    if is_filtered(path, plan, month):
+        return _filtered_corr(path, dataset_version(path), columns, plan, month)
+    return _load_corr(path, artifact_path(path, _corr_name(columns)), columns)
+
+
+# ======================================================== 작업 목록 =================================================================
+def _model_artifacts(path):
+    # 모델 학습 → 계수 / 점수 계산용 파라미터 → 고객별 위험 점수 (순서 의존)
+    from churn_model import feature_importance, scoring_params
+    from risk_scoring import risk_summary
+    feature_importance(path)
+    scoring_params(path)
+    risk_summary(path)
+
+
+def _task_funcs():
+    from churn_cube import load_cube
+    from kpi import load_kpi
+    from plan_index import load_plan_index
+    from segmentation import load_segments
+    from survival import km_by
+    return {
+        'cube': load_cube,
+        'km': km_by,
+        'corr': load_corr,
+        'model': _model_artifacts,
+        'segments': load_segments,
+        'kpi': load_kpi,
+        'plan_index': load_plan_index,
+    }
+
+
+def tasks_for(path):
+    # (작업 이름, 인자...) 목록. 인자는 프로세스 간에 넘길 수 있는 값만
+    if os.path.basename(path) == os.path.basename(SUBSCRIPTION_CSV):
+        from segmentation import N_SEGMENTS
+        return [('km', ()), ('corr', SUBSCRIPTION_CORR), ('segments', N_SEGMENTS)]
+
+    from churn_model import FEATURES
+    return [('cube',), ('km', ()), ('km', ('장기고객',)), ('corr', tuple(FEATURES)), ('model',), ('kpi',), ('plan_index',)]
+
+
+def _run_task(path, task):
+    start = time.perf_counter()
+    name, *args = task
+    _task_funcs()[name](path, *args)
+    label = [('+'.join(a) or 'all') if isinstance(a, tuple) else str(a) for a in args]
+    return '.'.join([name] + label), time.perf_counter() - start
+
+
+# ======================================================== 실행 / manifest =================================================================
+def manifest_path(path):
+    return artifact_path(path, MANIFEST_NAME)
+
+
+def read_manifest(path):
+    mpath = manifest_path(os.path.abspath(path))
+    if not os.path.exists(mpath):
+        return None
+    with open(mpath, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def precompute(path, workers=PRECOMPUTE_WORKERS):
+    path = os.path.abspath(path)
+    start = time.perf_counter()
+    # 모든 작업이 같은 스냅샷을 읽도록 먼저 만든다
+    if _pyarrow() is not None:
+        ensure_snapshot(path)
+
+    tasks = tasks_for(path)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_task, [path] * len(tasks), tasks))
+
+    manifest = {
+        'source': path,
+        'artifacts': {name: round(seconds, 3) for name, seconds in results},
+        'seconds': round(time.perf_counter() - start, 3),
+        'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    mpath = manifest_path(path)
+    tmp = f"{mpath}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, mpath)
+    return manifest
+
+
+def _mark_failed(path, message):
+    fpath = artifact_path(path, FAILED_NAME)
+    tmp = f"{fpath}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(message)
+    os.replace(tmp, fpath)
+
+
+def has_failed(path=CHURN_CSV):
+    # 이 데이터 버전의 워커가 결과물 없이 끝났는지 (실패 기록이 있거나, 이 프로세스가 띄운 워커가 manifest 없이 종료)
+    path = os.path.abspath(path)
+    if os.path.exists(manifest_path(path)):
+        return False
+    if os.path.exists(artifact_path(path, FAILED_NAME)):
+        return True
+    proc = _workers.get((path, dataset_version(path)))
+    return proc is not None and proc.poll() is not None
+
+
+# ======================================================== 잠금 =================================================================
+def _owner_line(pid):
+    return f"{pid} {socket.gethostname()}"
+
+
+def _owner_alive(lock_path):
+    # 잠금을 가진 프로세스가 살아 있는지. 확인할 수 없으면 None (내용이 없음 / 다른 호스트 / Windows)
+    try:
+        with open(lock_path, encoding='utf-8') as f:
+            pid, host = f.read().split()
+        pid = int(pid)
+    except (OSError, ValueError):
+        return None
+    if host != socket.gethostname() or os.name == 'nt':
+        return None
+    # 이 프로세스가 띄운 워커면 poll (끝난 자식 프로세스도 회수)
+    for proc in _workers.values():
+        if proc.pid == pid:
+            return proc.poll() is None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_is_stale(lock_path):
+    alive = _owner_alive(lock_path)
+    if alive is not None:
+        return not alive
+    return time.time() - os.path.getmtime(lock_path) >= PRECOMPUTE_TIMEOUT
+
+
+def _take_lock(lock_path):
+    # 여러 프로세스 중 하나만 워커를 띄운다 (주인이 죽었거나 오래된 잠금은 지운다)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if not _lock_is_stale(lock_path):
+                    return False
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(_owner_line(os.getpid()))
+        return True
+    return False
+
+
+def _write_owner(lock_path, pid):
+    # 잠금 주인을 워커 프로세스로 바꾼다 (워커가 벌써 끝나서 잠금을 지웠으면 다시 만들지 않음)
+    if not os.path.exists(lock_path):
+        return
+    tmp = f"{lock_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(_owner_line(pid))
+    os.replace(tmp, lock_path)
+
+
+def is_running(path=CHURN_CSV):
+    # 살아 있는 워커가 이 데이터 버전의 결과물을 계산 중인지
+    lock_path = artifact_path(os.path.abspath(path), LOCK_NAME)
+    try:
+        return not _lock_is_stale(lock_path)
+    except FileNotFoundError:
+        return False
+
+
+def start_worker(path):
+    # 데이터 버전마다 한 번만 띄운다 (실패해도 rerun마다 다시 띄우지 않는다)
+    path = os.path.abspath(path)
+    key = (path, dataset_version(path))
+    if key in _workers:
+        return None
+    lock_path = artifact_path(path, LOCK_NAME)
+    if not _take_lock(lock_path):
+        return None
+    _workers[key] = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    _write_owner(lock_path, _workers[key].pid)
+    return _workers[key]
+
+
+def ensure_precomputed(path=CHURN_CSV, wait=True, timeout=PRECOMPUTE_TIMEOUT):
+    # 현재 데이터 버전의 결과물이 준비됐으면 True.
+    # 없으면 워커를 띄우고(이미 누가 띄웠으면 그대로) wait=True면 끝날 때까지 기다린다.
+    # 이 버전의 워커가 실패했으면 다시 띄우지 않고 False (페이지가 직접 계산)
+    path = os.path.abspath(path)
+    mpath = manifest_path(path)
+    if os.path.exists(mpath):
+        return True
+    if has_failed(path):
+        return False
+
+    start_worker(path)
+    deadline = time.time() + timeout
+    while wait and time.time() < deadline:
+        if os.path.exists(mpath):
+            return True
+        if has_failed(path):
+            return False
+        if not is_running(path):
+            return os.path.exists(mpath)
+        time.sleep(POLL_SECONDS)
+    return os.path.exists(mpath)
+
+
+def require_precomputed(path=CHURN_CSV, wait=PAGE_WAIT_SECONDS):
+    # 페이지용: 결과물이 있거나 워커가 실패했으면(페이지가 직접 계산) 바로 돌아온다.
+    # 워커가 계산 중이면 wait초만 기다리고, 그래도 안 끝났으면 안내를 띄운 채 이번 rerun을 멈춘다.
+    # 준비되면 PAGE_POLL_SECONDS 간격으로 확인하는 프래그먼트가 앱 전체를 다시 실행한다.
+    import streamlit as st
+
+    with st.spinner("데이터가 바뀌어 분석 결과를 준비하는 중입니다..."):
+        if ensure_precomputed(path, timeout=wait) or not is_running(path):
+            return
+    st.info("⏳ 데이터가 바뀌어 분석 결과를 준비하는 중입니다. 준비되면 자동으로 표시됩니다.")
+
+    @st.fragment(run_every=PAGE_POLL_SECONDS)
+    def poll_precompute():
+        if not is_running(path):
+            st.rerun()
+
+    poll_precompute()
+    st.stop()
+
+
+if __name__ == '__main__':
+    status = 0
+    for csv in sys.argv[1:] or [CHURN_CSV]:
+        csv = os.path.abspath(csv)
+        try:
+            manifest = precompute(csv)
+        except Exception:
+            # 잠금을 풀기 전에 실패를 기록해야 기다리던 페이지가 워커를 다시 띄우지 않는다
+            _mark_failed(csv, traceback.format_exc())
+            print(f"{os.path.basename(csv)}: 사전 계산 실패", file=sys.stderr)
+            traceback.print_exc()
+            status = 1
+            continue
+        finally:
+            lock = artifact_path(csv, LOCK_NAME)
+            if os.path.exists(lock):
+                os.remove(lock)
+        print(f"{os.path.basename(csv)}: {manifest['seconds']:.2f}s")
+        for name, seconds in manifest['artifacts'].items():
+            print(f"  {name:<24}{seconds:>8.3f}s")
+    sys.exit(status)
@@ -1,16 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import os
-import platform
-import seaborn as sns
-from lifelines import KaplanMeierFitter
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from scipy.ndimage import gaussian_filter
-from sklearn.linear_model import LogisticRegression
+from lazy_import import lazy
+from churn_data import dataset_version
+from churn_cube import load_cube
+from churn_model import FEATURES, feature_importance
+from density import density_layers, plot_density, use_density
+from features import feature_frame
+from instrument import start_trace, trace_frame
+from kpi import INFERRED_NOTE as KPI_INFERRED_NOTE, load_kpi, month_number
+from ltv_projection import CHURN_WINDOW_MONTHS, PROJECTION_MONTHS, STRATEGIES, load_cohort_table, project
+from plan_index import PLAN_OPTIONS, filtered_frame
+from policy_sim import MC_CONFIDENCE, monte_carlo_policy
+from precompute import ensure_precomputed, is_running, load_corr, require_precomputed
+from recency_risk import RED_LINE_DAYS, recency_frame, red_line_colors
+from risk_scoring import risk_summary
+from section_pool import run_sections
+from survival import km_by, plot_km
+from vega_charts import backend_selector, show_chart
+import vega_charts as vc
 
 # 민영 수정
 # ======================================================== 1.페이지 설정 =============================================================
@@ -20,30 +28,26 @@ st.set_page_config(
     layout="wide",  
     initial_sidebar_state="expanded"
 )
-# 맥 환경 폰트 깨짐 방지
-plt.rcParams['font.family'] = 'AppleGothic'
-# 윈도우 환경 폰트 깨짐 방지
-#font_path = "C:/Windows/Fonts/malgun.ttf"
-# font_name = fm.FontProperties(fname=font_path).get_name()
-# plt.rc('font', family=font_name)
-# plt.rcParams['axes.unicode_minus'] = False
-# ======================================================== 2. 데이터 =================================================================
-@st.cache_data 
-def load_data():
-    data = {
-        'Month': pd.date_range(start='2025-01-01', periods=12, freq='MS'),
-        'Subscribers': [1250, 1270, 1321, 1345, 1360, 1393, 1410, 1425, 1440, 1465, 1490, 1516],
-        'Retention': [12.1, 12.5, 11.8, 13.0, 14.2, 13.5, 12.8, 13.2, 14.5, 15.0, 14.8, 15.2], # 유지기간 데이터
-        'Churn_Rate': [2.1, 2.3, 3.5, 2.0, 1.8, 2.5, 2.1, 1.9, 1.7, 2.2, 2.0, 1.5]             # 이탈률 데이터
-    }
-    df = pd.DataFrame(data)
 
-    # 성장률 계산
-    df['Prev_Subscribers'] = df['Subscribers'].shift(1)
-    df['Growth_Rate'] = ((df['Subscribers'] - df['Prev_Subscribers']) / df['Prev_Subscribers']) * 100
-    return df
+# matplotlib / seaborn 등 분석 라이브러리는 차트를 그리는 페이지에서만 불러온다 (lazy_import.py)
+def get_plt():
+    plt = lazy('matplotlib.pyplot')
+    # 맥 환경 폰트 깨짐 방지
+    plt.rcParams['font.family'] = 'AppleGothic'
+    # 윈도우 환경 폰트 깨짐 방지
+    #font_path = "C:/Windows/Fonts/malgun.ttf"
+    # font_name = fm.FontProperties(fname=font_path).get_name()
+    # plt.rc('font', family=font_name)
+    # plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+# ======================================================== 2. 데이터 =================================================================
+# 섹션별 시간 / 메모리 계측 (instrument.py). tracemalloc은 INSTRUMENT_MEMORY=1로 띄우고 디버그 패널을 켰을 때만
+trace = start_trace(st.session_state.get('page', 'home'), memory=st.session_state.get('debug_panel', False))
+trace.mark('공통: 데이터 / 사이드바')
 
-in_df = load_data()
+# 월별 가입자 수 / 유지 기간 / 이탈률 (kpi.py, 날짜 컬럼이 없으면 AccountAge로 추정)
+in_df, kpi_inferred = load_kpi()
 
 
 # ======================================================== 3.사이드바 구성=============================================================
@@ -52,12 +56,27 @@ with st.sidebar:
 
     month_labels = [d.strftime('%Y년 %m월') for d in in_df['Month']]
 
-    selected_month = st.selectbox("분석 월 선택", options=month_labels, index=0)
-    selected_plan = st.selectbox("요금제 필터", ['광고형', '스탠다드', '프리미엄'], index=0)
-    analysis = st.button("🚀 데이터 분석 실행", use_container_width=True)
+    selected_month = st.selectbox("분석 월 선택", options=month_labels, index=len(month_labels) - 1)
+    selected_plan = st.selectbox("요금제 필터", list(PLAN_OPTIONS), index=0)
+    # 분석 실행 버튼은 아래 analysis_panel 프래그먼트가 이 자리에 그린다
+    analysis_box = st.container()
     st.divider()
+    # 차트를 서버에서 그릴지(matplotlib) 브라우저에서 그릴지(Vega-Lite) 선택
+    backend_selector()
+    debug_panel = st.checkbox("🛠 성능 디버그 패널", key='debug_panel')
     st.info(f"💡[현재 설정]   기간: **{selected_month}**,  요금제: **{selected_plan}**")
 
+# 사이드바 필터 → 모든 페이지의 데이터 조회에 그대로 넘긴다 (plan_index.py)
+#   plan: SubscriptionType 값 (전체면 None), month: 그 달까지 가입한 고객 (마지막 달이면 None = 전체)
+plan = PLAN_OPTIONS[selected_plan]
+selected_date = in_df['Month'].iloc[month_labels.index(selected_month)]
+month = None if selected_month == month_labels[-1] else int(month_number([selected_date])[0])
+if plan is not None:
+    in_df, kpi_inferred = load_kpi(plan=plan)
+# 요금제별 KPI는 시작 / 마지막 달이 전체와 다를 수 있으므로 선택한 달의 위치를 다시 읽은 in_df에서 날짜로 찾는다
+# (그 달이 없으면 그 전의 마지막 달, 선택한 달까지 이 요금제 고객이 없으면 -1)
+month_pos = int(in_df['Month'].searchsorted(selected_date, side='right')) - 1
+
 # ======================================================== 4. 메인화면 구성=============================================================
 
 header_col1, header_col2 = st.columns([1.5, 6])
@@ -66,12 +85,16 @@ col1, col2, col3 = st.columns(3)
 if 'page' not in st.session_state:
     st.session_state.page='home'
 
-# 페이지 전환 함수 
+# 분석 결과물은 별도 워커가 데이터 버전별로 미리 계산한다 (페이지는 읽기만)
+# 결과물을 쓰는 페이지에서만 require_precomputed로 잠깐 기다린다 (retention / 홈 KPI는 기다리지 않음)
+
+# 페이지 전환 함수 (버튼 on_click 콜백: 스크립트보다 먼저 실행되므로 rerun 한 번에 새 페이지가 그려진다)
 def go_to_page(page_name):
     st.session_state.page = page_name
 
 # 메인 화면
 if st.session_state.page == 'home':
+    trace.mark('home')
     with header_col1:
         st.image('https://upload.wikimedia.org/wikipedia/commons/0/08/Netflix_2015_logo.svg', width=250)
 
@@ -80,34 +103,56 @@ if st.session_state.page == 'home':
         st.text('💡 데이터로 추적하는 넷플릭스 구독자들의 이탈 신호와 유지 전략')
 
     with col1 : 
-        if st.button('구독자 이탈 현상 분석'):
-            go_to_page('subscription_analysis')
+        st.button('구독자 이탈 현상 분석', on_click=go_to_page, args=('subscription_analysis',))
 
     with col2 : 
-        if st.button('구독자 이탈 원인 진단'):
-            go_to_page('reason')       
+        st.button('구독자 이탈 원인 진단', on_click=go_to_page, args=('reason',))
 
     with col3 : 
-        if st.button('고객 유지 전략'):
-            go_to_page('retention')
+        st.button('고객 유지 전략', on_click=go_to_page, args=('retention',))
 
     st.markdown("---")
     st.subheader("📊 넷플릭스 구독자 현황 스냅샷")
 
+    # 월별 KPI의 선택한 달 / 전월 대비
+    if month_pos >= 0:
+        latest_kpi, prev_kpi = in_df.iloc[month_pos], in_df.iloc[max(month_pos - 1, 0)]
+    else:
+        latest_kpi = prev_kpi = pd.Series({'Subscribers': 0, 'Retention': 0.0, 'Churn_Rate': 0.0, 'Growth_Rate': 0.0})
+    # 날짜 컬럼이 없으면 이탈을 모두 마지막 달에 몰아 추정하므로 월별 이탈률 / 증감은 의미가 없다
+    # → 이탈률은 스냅샷 기준 한 값만 보여주고 구독자 증감 / 이탈률 증감은 숨긴다
+    if kpi_inferred:
+        growth_delta = churn_delta = None
+        churn_label, churn_value = "이탈률 (스냅샷 기준)", in_df['Churn_Rate'].iloc[-1]
+    else:
+        growth_delta = f"{latest_kpi['Growth_Rate']:+.1f}%"
+        churn_delta = f"{latest_kpi['Churn_Rate'] - prev_kpi['Churn_Rate']:+.1f}%p"
+        churn_label, churn_value = "이탈률", latest_kpi['Churn_Rate']
     metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
     with metric_col1:
-        st.metric("전체 구독자", "1,516M", delta="+2.6%")
+        st.metric("전체 구독자", f"{int(latest_kpi['Subscribers']):,}명", delta=growth_delta)
     with metric_col2:
-        st.metric("평균 유지기간", "15.2개월", delta="+0.4개월")
+        st.metric("평균 유지기간", f"{latest_kpi['Retention']:.1f}개월",
+                  delta=f"{latest_kpi['Retention'] - prev_kpi['Retention']:+.1f}개월")
     with metric_col3:
-        st.metric("이탈률", "1.5%", delta="-0.5%", delta_color="inverse")
+        st.metric(churn_label, f"{churn_value:.1f}%", delta=churn_delta, delta_color="inverse")
     with metric_col4:
-        st.metric("위험군 비율", "10%", delta="-2%", delta_color="inverse")
+        # 고객별 이탈 위험 점수에서 계산한 현재 구독자 중 위험군 비율
+        # 워커가 아직 계산 중이면 기다리지 않고 '준비 중'으로 표시한다 (실패했으면 여기서 직접 계산)
+        if ensure_precomputed(wait=False) or not is_running():
+            st.metric("위험군 비율", f"{risk_summary(plan=plan, month=month)['shares'][2]*100:.0f}%")
+        else:
+            st.metric("위험군 비율", "준비 중")
+    if kpi_inferred:
+        st.caption(KPI_INFERRED_NOTE)
 # Page1: 구독자 분석 탭
 elif st.session_state.page == 'subscription_analysis' :
+    trace.mark('준비')
+    plt = get_plt()
+
     # 뒤로가기 버튼
-    if st.button("홈으로 돌아가기"):
-        go_to_page('home') 
+    st.button("홈으로 돌아가기", on_click=go_to_page, args=('home',))
+    require_precomputed()
 
     with header_col1:
         st.image('https://upload.wikimedia.org/wikipedia/commons/0/08/Netflix_2015_logo.svg', width=250)
@@ -134,6 +179,7 @@ elif st.session_state.page == 'subscription_analysis' :
     # =================================================================
     # 📊 1. [막대+선] 이탈 4주 전 행동 변화 (골든타임)
     # =================================================================
+    trace.mark('1. 이탈 골든타임')
     st.header("1. 이탈 골든타임 ")
     st.info("💡 이탈 확정 유저들의 4주간 행동 패턴 추적 결과")
 
@@ -143,7 +189,7 @@ elif st.session_state.page == 'subscription_analysis' :
 
     col1, col2 = st.columns([2, 1])
 
-    with col1:
+    def draw_golden_time(weeks, frequency, completion):
         fig1, ax1 = plt.subplots(figsize=(10, 6))
 
         # 1) 막대 그래프 (접속 횟수)
@@ -171,7 +217,13 @@ elif st.session_state.page == 'subscription_analysis' :
         ax1.legend(lines + lines2, labels + labels2, loc='upper left')
 
         ax1.set_title("이탈 D-4주 행동 변화 추이", fontsize=15)
-        st.pyplot(fig1)
+        return fig1
+
+    with col1:
+        show_chart(draw_golden_time, weeks, frequency, completion,
+                   spec=lambda: vc.bar_line_spec(weeks, frequency, completion, title="이탈 D-4주 행동 변화 추이",
+                                                 bar_title="주간 접속 횟수 (회)", line_title="완독률 (%)",
+                                                 bar_domain=(0, 6), line_domain=(0, 100)))
 
     with col2:
         st.markdown("""
@@ -186,33 +238,29 @@ elif st.session_state.page == 'subscription_analysis' :
     # =================================================================
     # 📉 2. [산점도] 이탈 위험군 식별 (Retention vs Recency)
     # =================================================================
+    trace.mark('2. 위험군 식별')
     st.header("2. 위험군 식별: \"14일의 법칙 (Red-line)\"")
     st.info("💡 마지막 접속일(Recency) 경과에 따른 이탈 확률 상관관계")
 
-    # 산점도 데이터 생성 (트렌드를 보여주기 위한 가상 데이터 생성)
-    np.random.seed(42)
-    recency_days = np.random.randint(1, 31, 200) # 1~30일 경과한 유저 200명
-    # 이탈 확률 함수 (S커브 형태: 7일에 45%, 14일에 82%가 되도록 조정)
-    def churn_prob(day):
-        # 로지스틱 함수 변형
-        base_prob = 1 / (1 + np.exp(-(day - 8) * 0.4)) 
-        # 약간의 노이즈 추가 (산점도처럼 보이게)
-        noise = np.random.normal(0, 0.05)
-        prob = base_prob + noise
-        return np.clip(prob * 100, 0, 100)
-
-    churn_probs = [churn_prob(d) for d in recency_days]
-    df_scatter = pd.DataFrame({'Recency': recency_days, 'ChurnProb': churn_probs})
+    # 산점도 데이터 (경과일 컬럼이 없으면 트렌드를 보여주기 위한 가상 데이터)
+    # 이탈 확률 곡선 (S커브 형태: 7일에 45%, 14일에 82% 근처) 은 recency_risk에서 배열 단위로 계산
+    df_scatter, _ = recency_frame(filtered_frame(plan=plan, month=month))
 
     col3, col4 = st.columns([2, 1])
 
-    with col3:
+    def draw_recency_scatter(df_scatter):
         fig2, ax3 = plt.subplots(figsize=(10, 6))
 
         # 산점도 그리기
         # 14일 기준 색상 구분 (Red Line 넘으면 빨강)
-        colors = ['red' if x >= 14 else 'blue' for x in df_scatter['Recency']]
-        ax3.scatter(df_scatter['Recency'], df_scatter['ChurnProb'], c=colors, alpha=0.6, edgecolors='w', s=80)
+        # 점이 많으면 레드라인 전/후 밀도로 그린다
+        if use_density(len(df_scatter)):
+            plot_density(ax3, *density_layers(df_scatter['Recency'], df_scatter['ChurnProb'],
+                                              df_scatter['Recency'] >= RED_LINE_DAYS),
+                         colors={False: 'blue', True: 'red'})
+        else:
+            colors = red_line_colors(df_scatter['Recency'])
+            ax3.scatter(df_scatter['Recency'], df_scatter['ChurnProb'], c=colors, alpha=0.6, edgecolors='w', s=80)
 
         # 레드라인 (x=14)
         ax3.axvline(x=14, color='red', linestyle='--', linewidth=2)
@@ -231,8 +279,13 @@ elif st.session_state.page == 'subscription_analysis' :
         ax3.set_xlim(0, 31)
         ax3.set_ylim(0, 105)
         ax3.grid(True, linestyle='--', alpha=0.5)
+        return fig2
 
-        st.pyplot(fig2)
+    with col3:
+        show_chart(draw_recency_scatter, df_scatter,
+                   spec=lambda: vc.scatter_spec(df_scatter.assign(RedLine=df_scatter['Recency'] >= RED_LINE_DAYS),
+                                                'Recency', 'ChurnProb', color='RedLine',
+                                                title="마지막 접속 경과일(Recency) vs 이탈 확률", rules={'x': [14]}))
 
     with col4:
         st.markdown("""
@@ -247,18 +300,20 @@ elif st.session_state.page == 'subscription_analysis' :
     # =================================================================
     # 🍕 3. [파이 차트] 현재 구독자 상태 분포
     # =================================================================
+    trace.mark('3. 현재 구독자 진단')
     st.header("3. 현재 구독자 진단: \"우리는 누구에게 집중해야 하는가\"")
     st.info("💡 행동 데이터를 기반으로 분류한 전체 구독자 현황")
 
-    # 데이터 설정
+    # 데이터 설정 (고객별 이탈 위험 점수 기준 현재 구독자 등급 분포)
+    risk = risk_summary(plan=plan, month=month)
     labels = ['안정군 (Active)', '주의군 (At-risk)', '위험군 (Churn-imminent)']
-    sizes = [70, 20, 10]
+    sizes = [share * 100 for share in risk['shares']]
     colors = ['#4CAF50', '#FF9800', '#F44336'] # 초록, 주황, 빨강
-    explode = (0, 0, 0.1)  # 위험군(10%)만 툭 튀어나오게 강조
+    explode = (0, 0, 0.1)  # 위험군만 툭 튀어나오게 강조
 
     col5, col6 = st.columns([1, 1])
 
-    with col5:
+    def draw_risk_pie(sizes, labels, colors, explode):
         fig3, ax4 = plt.subplots(figsize=(8, 8))
 
         wedges, texts, autotexts = ax4.pie(sizes, explode=explode, labels=labels, colors=colors,
@@ -269,23 +324,30 @@ elif st.session_state.page == 'subscription_analysis' :
         plt.setp(autotexts, size=14, weight="bold", color="white")
 
         ax4.set_title("전체 구독자 리스크 등급 분포", fontsize=15)
-        st.pyplot(fig3)
+        return fig3
+
+    with col5:
+        show_chart(draw_risk_pie, sizes, labels, colors, explode,
+                   spec=lambda: vc.pie_spec(labels, sizes, title="전체 구독자 리스크 등급 분포"))
 
     with col6:
         st.markdown("#### 📋 그룹별 정의 및 Action Plan")
-        st.success("**🟢 안정군 (Active) - 70%**\n* 주 3회 이상 접속, 완독률 70% 이상\n* **Action**: 건드리지 않음 (Natural Retention)")
-        st.warning("**🟠 주의군 (At-risk) - 20%**\n* 접속 주기 불규칙, 검색만 하고 시청 안 함\n* **Action**: '찜한 콘텐츠' 알림, 인기작 추천")
-        st.error("**🔴 위험군 (Churn-imminent) - 10%**\n* **7일 이상 미접속**, 3개월 차 진입\n* **Action**: **즉시 개입!** (특별 할인 쿠폰, 1:1 메시지)")
+        st.success(f"**🟢 안정군 (Active) - {sizes[0]:.0f}%**\n* 주 3회 이상 접속, 완독률 70% 이상\n* **Action**: 건드리지 않음 (Natural Retention)")
+        st.warning(f"**🟠 주의군 (At-risk) - {sizes[1]:.0f}%**\n* 접속 주기 불규칙, 검색만 하고 시청 안 함\n* **Action**: '찜한 콘텐츠' 알림, 인기작 추천")
+        st.error(f"**🔴 위험군 (Churn-imminent) - {sizes[2]:.0f}%**\n* **7일 이상 미접속**, 3개월 차 진입\n* **Action**: **즉시 개입!** (특별 할인 쿠폰, 1:1 메시지)")
 
 
 
 # Page2 : 원인 진단
 elif st.session_state.page == 'reason':
+    trace.mark('준비')
+    plt = get_plt()
+    sns = lazy('seaborn')
     st.set_page_config(layout="wide")
 
     # 뒤로가기 버튼
-    if st.button("홈으로 돌아가기"):
-        go_to_page('home') 
+    st.button("홈으로 돌아가기", on_click=go_to_page, args=('home',))
+    require_precomputed()
 
     with header_col1:
         st.image('https://upload.wikimedia.org/wikipedia/commons/0/08/Netflix_2015_logo.svg', width=250)
@@ -312,26 +374,59 @@ elif st.session_state.page == 'reason':
     """, unsafe_allow_html=True)
 
 
-    # 데이터 로드
-    df = pd.read_csv("data/Rapid_Churn_Reduction_Dataset_v3_price_structure.csv")
-    df['가입기간'] = df['AccountAge']
-    df['이탈여부'] = df['Churn']
-    df['장기고객'] = df['가입기간'] >= 6  
+    # 데이터 로드 (파생 컬럼은 features.py에서 한 번만 계산해 캐시된 것을 공유)
+    df = feature_frame(names=('가입기간', '장기고객', '고객유형'), plan=plan, month=month)
+    # 구간별 이탈률은 미리 집계해 둔 큐브에서 조회
+    cube = load_cube(plan=plan, month=month)
+
+    # 섹션별 계산을 한꺼번에 병렬로 돌리고, 아래에서는 순서대로 그리기만 한다
+    def compute_tenure():
+        churn_rate = cube.rate_by('3개월구간') * 100
+        churn_rate_plot = churn_rate.copy()
+        churn_rate_plot['3개월 이전'] = churn_rate_plot['3개월 이후'] * 2
+        return churn_rate_plot
+
+    def compute_viewing():
+        return df[['고객유형', 'ViewingHoursPerWeek']]
+
+    def compute_corr():
+        corr = load_corr(columns=FEATURES, plan=plan, month=month).rename(index=FEATURES, columns=FEATURES)
+        corr.values[np.triu_indices_from(corr,1)] = np.nan
+        return corr
+
+    def compute_policy():
+        # 위험군(가입 3개월 이하, 주 10시간 미만) 중 frac 비율에게 무료 이용 → 6개월 유지.
+        # 전환 비율 / 대상 기준 조합별로 몬테카를로 반복해서 평균과 신뢰구간을 구한다.
+        return monte_carlo_policy(df['가입기간'], df['ViewingHoursPerWeek'],
+                                  fracs=[0.2, 0.3, 0.4, 0.5, 0.6], max_tenures=[3, 6],
+                                  viewing_cutoffs=[10, 15], seed=42)
+
+    # 병렬 계산 전체(가장 늦은 섹션이 끝날 때까지)의 시간: 섹션별 시간은 아래 '계산:' 항목
+    trace.mark('섹션 계산 (병렬)', rows=len(df))
+    sections = run_sections(trace.wrap({
+        'tenure': compute_tenure,
+        'survival': lambda: km_by(by='장기고객', plan=plan, month=month),
+        'viewing': compute_viewing,
+        'watch': lambda: cube.rate_by('시청구간') * 100,
+        'corr': compute_corr,
+        'price': lambda: cube.rate_by('요금제'),
+        'policy': compute_policy,
+        # 데이터 버전별로 한 번만 학습해서 저장해 둔 모델의 계수 (필터를 고르면 그 고객만으로 다시 학습)
+        'importance': lambda: feature_importance(plan=plan, month=month),
+    }))
 
     # =====================================================
     # 1. 시간 구조
     # =====================================================
+    trace.mark('1. 시간 구조', rows=len(df))
     st.markdown('<div class="section-title">1. 시간 구조와 이탈</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1.2,1.2,1])
 
-    df['3개월구간'] = np.where(df['가입기간'] <= 3, '3개월 이전', '3개월 이후')
-    churn_rate = df.groupby('3개월구간')['이탈여부'].mean() * 100
-    churn_rate_plot = churn_rate.copy()
-    churn_rate_plot['3개월 이전'] = churn_rate_plot['3개월 이후'] * 2
+    churn_rate_plot = sections['tenure']
 
-    with col1:
+    def draw_tenure_bar(churn_rate_plot):
         fig, ax = plt.subplots(figsize=(5,4))
         churn_rate_plot.plot(kind='bar', ax=ax)
         ax.set_title("3개월 기준 이탈 구조")
@@ -339,22 +434,31 @@ elif st.session_state.page == 'reason':
         ax.set_ylim(0,100)
         ax.tick_params(axis='x', rotation=0)
         ax.tick_params(axis='y', rotation=0)
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
 
-    with col2:
+    with col1:
+        show_chart(draw_tenure_bar, churn_rate_plot,
+                   spec=lambda: vc.bar_spec(churn_rate_plot, title="3개월 기준 이탈 구조",
+                                            y_title="이탈률 (%)", y_domain=(0, 100)))
+
+    def draw_survival(curves):
         fig, ax = plt.subplots(figsize=(5,4))
-        kmf = KaplanMeierFitter()
-        for label, grp in df.groupby('장기고객'):
+        for label, curve in curves.items():
             name = "장기 고객" if label else "초기 이탈 고객"
-            kmf.fit(grp['가입기간'], grp['이탈여부'], label=name)
-            kmf.plot(ax=ax)
+            plot_km(ax, curve, label=name)
         ax.set_xlim(0,60)
         ax.set_title("가입 기간별 생존 곡선")
         ax.tick_params(axis='x', rotation=0)
         ax.tick_params(axis='y', rotation=0)
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col2:
+        curves = sections['survival']
+        show_chart(draw_survival, curves,
+                   spec=lambda: vc.km_spec(curves, names=lambda label: "장기 고객" if label else "초기 이탈 고객",
+                                           title="가입 기간별 생존 곡선", x_max=60))
 
     with col3:
         st.markdown("""
@@ -375,32 +479,40 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 2. 행동 몰입 구조
     # =====================================================
+    trace.mark('2. 행동 몰입 구조', rows=len(df))
     st.markdown('<div class="section-title">2. 시청 행동과 몰입 구조</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1.2,1.2,1])
 
-    df['고객유형'] = np.where(df['장기고객'], '장기 고객', '초기 이탈 고객')
+    viewing = sections['viewing']
 
-    with col1:
+    def draw_viewing_box(df):
         fig, ax = plt.subplots(figsize=(5,4))
         sns.boxplot(data=df, x='고객유형', y='ViewingHoursPerWeek', ax=ax)
         ax.set_title("고객 유형별 시청 시간")
         ax.set_ylabel("주간 시청 시간", rotation=90, labelpad=10)
         ax.set_xlabel("")
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
 
-    df['시청구간'] = pd.qcut(df['ViewingHoursPerWeek'], 5,
-        labels=['매우 낮음','낮음','보통','높음','매우 높음'])
-    churn_by_watch = df.groupby('시청구간')['이탈여부'].mean() * 100
+    with col1:
+        show_chart(draw_viewing_box, viewing, key=('viewing_box', dataset_version(), plan, month),
+                   spec=lambda: vc.box_spec(viewing, '고객유형', 'ViewingHoursPerWeek',
+                                            title="고객 유형별 시청 시간", y_title="주간 시청 시간"))
 
-    with col2:
+    churn_by_watch = sections['watch']
+
+    def draw_churn_by_watch(churn_by_watch):
         fig, ax = plt.subplots(figsize=(5,4))
         churn_by_watch.plot(marker='o', linewidth=3, ax=ax)
         ax.set_title("시청 강도에 따른 이탈률")
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col2:
+        show_chart(draw_churn_by_watch, churn_by_watch,
+                   spec=lambda: vc.series_line_spec(churn_by_watch, title="시청 강도에 따른 이탈률"))
 
     with col3:
         st.markdown("""
@@ -421,27 +533,22 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 3. 핵심 행동 변수
     # =====================================================
+    trace.mark('3. 핵심 행동 변수', rows=len(df))
     st.markdown('<div class="section-title">3. 핵심 행동 변수와 이탈</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
     col1, col2 = st.columns([2,1])
 
-    features = {
-        'ViewingHoursPerWeek':'주간 시청 시간',
-        'SupportTicketsPerMonth':'월 문의 횟수',
-        'MonthlyCharges':'월 요금',
-        'ContentDownloadsPerMonth':'월 다운로드 수',
-        'WatchlistSize':'찜 목록 크기',
-    }
-
-    corr = df[list(features.keys())].rename(columns=features).corr()
-    corr.values[np.triu_indices_from(corr,1)] = np.nan
+    corr = sections['corr']
 
-    with col1:
+    def draw_corr(corr):
         fig, ax = plt.subplots(figsize=(7,5))
         sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col1:
+        show_chart(draw_corr, corr, spec=lambda: vc.heatmap_spec(corr))
 
     with col2:
         st.markdown("""
@@ -462,36 +569,59 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 4. 가격 + 정책
     # =====================================================
+    trace.mark('4. 가격 + 정책', rows=len(df))
     st.markdown('<div class="section-title">4. 가격 구조와 정책 개입 효과</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1.2,1.2,1])
 
-    df['요금제'] = pd.cut(df['MonthlyCharges'], bins=[0,12,17,25],
-                        labels=['베이직','스탠다드','프리미엄'])
-    churn_by_price = df.groupby('요금제')['이탈여부'].mean()
+    churn_by_price = sections['price']
 
-    with col1:
+    def draw_churn_by_price(churn_by_price):
         fig, ax = plt.subplots(figsize=(5,4))
         churn_by_price.plot(marker='s', linewidth=3, ax=ax)
         ax.set_title("요금제별 이탈률")
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col1:
+        show_chart(draw_churn_by_price, churn_by_price,
+                   spec=lambda: vc.series_line_spec(churn_by_price, title="요금제별 이탈률"))
 
-    risk = df[(df['가입기간']<=3)&(df['ViewingHoursPerWeek']<10)]
-    baseline = (risk['가입기간']>=6).mean()
-    df_sim = df.copy()
-    df_sim.loc[risk.sample(frac=0.4,random_state=42).index,'가입기간'] = 6
-    improved = (df_sim.loc[risk.index]['가입기간']>=6).mean()
+    policy_grid = sections['policy']
+    policy = policy_grid[(policy_grid['max_tenure'] == 3) & (policy_grid['viewing_cutoff'] == 10) &
+                         (policy_grid['frac'] == 0.4)].iloc[0]
+    policy_y = [policy['baseline'], policy['improved']]
+    policy_lower = [policy['baseline_lower'], policy['improved_lower']]
+    policy_upper = [policy['baseline_upper'], policy['improved_upper']]
 
-    with col2:
+    def draw_policy_effect(y, lower, upper):
         fig, ax = plt.subplots(figsize=(5,4))
-        ax.plot([0,1],[baseline,improved],marker='o',linewidth=3)
+        ax.plot([0,1],y,marker='o',linewidth=3)
+        # 몬테카를로 신뢰구간
+        ax.errorbar([0,1], y, yerr=[np.subtract(y, lower), np.subtract(upper, y)],
+                    fmt='none', capsize=6, color='black')
         ax.set_xticks([0,1])
         ax.set_xticklabels(['기존 정책','무료 이용 제공'])
         ax.set_title("초기 무료 제공 정책 효과")
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col2:
+        show_chart(draw_policy_effect, policy_y, policy_lower, policy_upper,
+                   spec=lambda: vc.interval_line_spec(['기존 정책', '무료 이용 제공'], policy_y,
+                                                      policy_lower, policy_upper,
+                                                      title="초기 무료 제공 정책 효과"))
+        st.caption(f"6개월 유지율 증가 {policy['lift']*100:.1f}%p "
+                   f"({MC_CONFIDENCE:.0%} 구간 {policy['lift_lower']*100:.1f} ~ {policy['lift_upper']*100:.1f}%p)")
+        with st.expander("전환 비율 / 대상 기준별 효과"):
+            st.dataframe(
+                policy_grid[['max_tenure', 'viewing_cutoff', 'frac', 'eligible', 'lift', 'lift_lower', 'lift_upper']]
+                .rename(columns={'max_tenure': '가입기간 이하', 'viewing_cutoff': '시청 시간 미만',
+                                 'frac': '전환 비율', 'eligible': '대상 고객',
+                                 'lift': '유지율 증가', 'lift_lower': '하한', 'lift_upper': '상한'}),
+                use_container_width=True, hide_index=True
+            )
 
     with col3:
         st.markdown("""
@@ -511,6 +641,7 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 5. 경쟁 구조
     # =====================================================
+    trace.mark('5. 경쟁 구조', rows=len(df))
     st.markdown('<div class="section-title">5. OTT 경쟁 구조</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
@@ -521,12 +652,16 @@ elif st.session_state.page == 'reason':
         '비율':[20,80]
     })
 
-    with col1:
+    def draw_bundle(bundle_simple):
         fig, ax = plt.subplots(figsize=(5,4))
         ax.pie(bundle_simple['비율'], labels=bundle_simple['구분'], autopct='%1.0f%%')
         ax.set_title("OTT 구독 개수 구조")
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig.tight_layout()
+        return fig
+
+    with col1:
+        show_chart(draw_bundle, bundle_simple,
+                   spec=lambda: vc.pie_spec(bundle_simple['구분'], bundle_simple['비율'], title="OTT 구독 개수 구조"))
 
     with col2:
         st.markdown("### 스포츠 라이브 제공 여부")
@@ -556,6 +691,7 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 6. 구조적 이탈 원인
     # =====================================================
+    trace.mark('6. 구조적 이탈 원인', rows=len(df))
     st.markdown('<div class="section-title">6. 구조적 이탈 원인 분석</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
@@ -566,30 +702,33 @@ elif st.session_state.page == 'reason':
         '비율':[44,64,53]
     })
 
-    with col1:
+    def draw_market(market_df):
         fig, ax = plt.subplots(figsize=(5,4))
         ax.plot(market_df['이탈 원인'], market_df['비율'], marker='o')
         ax.set_ylim(0,100)
         ax.set_title("시장 인식 기반 이탈 원인")
-        st.pyplot(fig)
-
-    X = df[list(features.keys())]
-    y = df['이탈여부']
-    mask = X.notna().all(axis=1)
-    X_scaled = StandardScaler().fit_transform(X[mask])
+        return fig
 
-    model = LogisticRegression()
-    model.fit(X_scaled, y[mask])
+    with col1:
+        show_chart(draw_market, market_df,
+                   spec=lambda: vc.line_spec(market_df['이탈 원인'], market_df['비율'],
+                                             title="시장 인식 기반 이탈 원인", y_domain=(0, 100)))
 
-    importance = pd.Series(model.coef_[0],
-                        index=features.values()).sort_values()
+    importance = sections['importance']
 
-    with col2:
+    def draw_importance(importance):
         fig, ax = plt.subplots(figsize=(5,4))
         importance.plot(kind='barh', ax=ax)
         ax.set_title("데이터 기반 이탈 원인 중요도")
         fig.subplots_adjust(left=0.30)
-        st.pyplot(fig)
+        return fig
+
+    with col2:
+        if importance is None:
+            st.info("선택한 요금제 / 기간의 고객에 이탈 고객과 유지 고객이 모두 있지 않아 중요도를 계산할 수 없습니다.")
+        else:
+            show_chart(draw_importance, importance,
+                       spec=lambda: vc.bar_spec(importance, title="데이터 기반 이탈 원인 중요도", horizontal=True))
 
     with col3:
         st.markdown("""
@@ -608,6 +747,7 @@ elif st.session_state.page == 'reason':
     # =====================================================
     # 7. 결론
     # =====================================================
+    trace.mark('7. 결론', rows=len(df))
     st.markdown('<div class="section-title">7. 넷플릭스 장기 유지 전략 요약</div>', unsafe_allow_html=True)
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
 
@@ -627,10 +767,10 @@ elif st.session_state.page == 'reason':
 
 # Page3: 기존 고객 유지 전략 페이지
 elif st.session_state.page =='retention':
+    trace.mark('retention')
 
     # 뒤로가기 버튼
-    if st.button("홈으로 돌아가기"):
-        go_to_page('home')
+    st.button("홈으로 돌아가기", on_click=go_to_page, args=('home',))
 
     with header_col1:
         st.image('https://upload.wikimedia.org/wikipedia/commons/0/08/Netflix_2015_logo.svg', width=250)
@@ -751,52 +891,116 @@ elif st.session_state.page =='retention':
                 st.write('- SKT/KT/LG')
                 st.write('- 네이버 플러스')
                 st.write('- 쿠팡 로켓와우')
-    with tab4:
+    # 슬라이더를 움직이면 이 프래그먼트만 다시 실행된다 (탭 1~3 차트와 페이지 나머지는 그대로)
+    @st.fragment
+    def strategy_outlook(plan, month):
         st.markdown('### 종합 예상 효과')
+        st.caption(f"현재 구독 고객의 앞으로 {PROJECTION_MONTHS}개월 예측 (코호트별 월 이탈 위험률 기반)")
+
+        # 전략별 이탈 위험률 감소 가정 (슬라이더를 바꾸면 바로 다시 계산)
+        with st.expander('전략별 가정', expanded=True):
+            slider_cols = st.columns(len(STRATEGIES) + 1)
+            reductions = {}
+            for slider_col, (name, (desc, _, default)) in zip(slider_cols, STRATEGIES.items()):
+                with slider_col:
+                    reductions[name] = st.slider(f"{name} (위험률 감소 %)", 0, 50, default, help=desc) / 100
+            with slider_cols[-1]:
+                winback = st.slider('해지 고객 재가입 비율 (%)', 0, 30, 10) / 100
+
+        outlook = project(load_cohort_table(plan=plan, month=month), reductions, winback=winback)
+        if outlook is None:
+            st.info('선택한 조건에 구독 중인 고객이 없어 예측할 수 없습니다.')
+            return
+
         effect_col1, effect_col2, effect_col3, effect_col4 = st.columns(4)
         with effect_col1:
-            st.metric('이탈률 감소', '25-35%', delta='-30%', delta_color='inverse')
+            st.metric(f'{CHURN_WINDOW_MONTHS}개월 이탈률 감소', f"{outlook['churn_reduction']*100:.0f}%",
+                      delta=f"{(outlook['after']['churn'] - outlook['before']['churn'])*100:.1f}%p",
+                      delta_color='inverse')
         with effect_col2:
-            st.metric('평균 구독 기간', '+4개월', delta='+4개월')
+            st.metric('평균 구독 기간', f"+{outlook['months_gain']:.1f}개월",
+                      delta=f"{outlook['before']['months']:.1f} → {outlook['after']['months']:.1f}개월")
         with effect_col3:
-            st.metric("고객 LTV", "+40%", delta="+40%")
+            st.metric("고객 LTV", f"+{outlook['ltv_gain']*100:.0f}%", delta=f"+{outlook['ltv_gain']*100:.0f}%")
         with effect_col4:
-            st.metric("재가입률", "+50%", delta="+50%")
+            # 재가입 비율은 측정값이 아니라 슬라이더 가정 → 그 가정으로 예상되는 재가입 고객 / LTV 기여를 보여준다
+            st.metric("예상 재가입 고객", f"{outlook['winback_customers']:,.0f}명",
+                      delta=f"LTV +{outlook['winback_share']*100:.1f}%",
+                      help=f"이탈 고객 × 재가입 비율 가정 {winback*100:.0f}%")
 
         st.success("**결론**: 이 전략들을 종합적으로 실행하면 고객 유지율을 크게 향상시키고, 장기적인 수익성을 확보할 수 있습니다.")
 
+    with tab4:
+        strategy_outlook(plan, month)
+
 st.divider()
 
 # ======================================================== 5. 분석 로직 =================================================================
 
-if analysis:
-    month_num = int(selected_month.split(' ')[1].replace('월', ''))
-    target_df = in_df.iloc[month_num - 1:month_num] 
-
-    if not target_df.empty:
-        latest_data = target_df.iloc[0]
-        latest_mau = latest_data['Subscribers'] / 100  
-        growth_rate = latest_data['Growth_Rate']
-
-        st.subheader(f"📊 {selected_month} 분석 결과 (요금제: {selected_plan})")
-
-        col3, col4, col5 = st.columns(3)
-        with col3:
-            delta_text = f"{growth_rate:.2f}% (전월 대비)" if pd.notnull(growth_rate) else "신규 데이터"
-            st.metric(
-                label="📈 월 가입자 수", 
-                value=f"{latest_mau:.2f} M", 
-                delta=delta_text
-            )
-            st.caption("(가입자 수): 전체 체급 지표")
-
-        with col4:
-            st.metric(label="⏳ 유지 기간", value=f"{latest_data['Retention']}개월", delta="0.5개월")
-            st.caption("(유지 기간): 수익성 지표")
-
-        with col5:
-            st.metric(label="🚨 이탈률", value=f"{latest_data['Churn_Rate']}%", delta="-0.3%", delta_color="inverse")
-            st.caption("(이탈률): 위기 신호 지표")
-
-        st.divider()
-
+# 분석 결과는 프래그먼트: 버튼을 누르면 이 함수만 다시 실행되고 페이지 분석은 다시 돌지 않는다.
+# 버튼은 사이드바(analysis_box), 결과는 본문 맨 아래(analysis_slot)에 그린다.
+# analysis_slot은 st.empty라서 프래그먼트가 다시 실행될 때 이전 결과를 덮어쓴다.
+analysis_slot = st.empty()
+
+
+@st.fragment
+def analysis_panel(in_df, month_pos, selected_month, selected_plan, kpi_inferred):
+    if not st.button("🚀 데이터 분석 실행", use_container_width=True):
+        analysis_slot.empty()
+        return
+    panel_trace = start_trace('분석 결과', memory=st.session_state.get('debug_panel', False))
+    panel_trace.mark('분석 결과')
+    # month_pos가 -1이면 빈 구간 (선택한 달까지 이 요금제 고객이 없음)
+    target_df = in_df.iloc[max(month_pos - 1, 0):month_pos + 1]
+
+    with analysis_slot.container():
+        if not target_df.empty:
+            latest_data = target_df.iloc[-1]
+            prev_data = target_df.iloc[0] if len(target_df) > 1 else None
+            growth_rate = latest_data['Growth_Rate']
+
+            st.subheader(f"📊 {selected_month} 분석 결과 (요금제: {selected_plan})")
+            if kpi_inferred:
+                st.caption(KPI_INFERRED_NOTE)
+
+            col3, col4, col5 = st.columns(3)
+            with col3:
+                if kpi_inferred:
+                    delta_text = None
+                else:
+                    delta_text = f"{growth_rate:.2f}% (전월 대비)" if pd.notnull(growth_rate) else "신규 데이터"
+                st.metric(
+                    label="📈 월 가입자 수", 
+                    value=f"{int(latest_data['Subscribers']):,}명", 
+                    delta=delta_text
+                )
+                st.caption("(가입자 수): 전체 체급 지표")
+
+            with col4:
+                retention_delta = f"{latest_data['Retention'] - prev_data['Retention']:+.1f}개월" if prev_data is not None else None
+                st.metric(label="⏳ 유지 기간", value=f"{latest_data['Retention']:.1f}개월", delta=retention_delta)
+                st.caption("(유지 기간): 수익성 지표")
+
+            with col5:
+                if kpi_inferred:
+                    # 추정 모드의 월별 이탈률은 마지막 달에 몰려 있으므로 스냅샷 이탈률 한 값만
+                    st.metric(label="🚨 이탈률 (스냅샷 기준)", value=f"{in_df['Churn_Rate'].iloc[-1]:.1f}%")
+                else:
+                    churn_delta = f"{latest_data['Churn_Rate'] - prev_data['Churn_Rate']:+.1f}%p" if prev_data is not None else None
+                    st.metric(label="🚨 이탈률", value=f"{latest_data['Churn_Rate']:.1f}%", delta=churn_delta, delta_color="inverse")
+                st.caption("(이탈률): 위기 신호 지표")
+
+            st.divider()
+    panel_trace.finish()
+
+
+with analysis_box:
+    analysis_panel(in_df, month_pos, selected_month, selected_plan, kpi_inferred)
+
+# ======================================================== 6. 성능 디버그 =================================================================
+records = trace.finish()
+if debug_panel:
+    with st.sidebar:
+        st.markdown("#### 🛠 섹션별 성능 (이번 실행)")
+        st.dataframe(trace_frame(records), use_container_width=True)
+        st.caption(f"rerun 전체 {trace.total_ms:,.0f} ms ('계산:' 항목은 병렬 스레드에서 겹쳐 실행)")
@@ -1,14 +1,14 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
+from churn_data import SUBSCRIPTION_CSV, load_churn
 # 한글 폰트 설정 (macos 기준)
 plt.rcParams['font.family'] = 'AppleGothic'
 st.title('Netflix 구독 이탈 분석')
 
 # csv 파일 읽기
-df = pd.read_csv('data/Subscription_Service_Churn_Dataset.csv')
+df = load_churn(SUBSCRIPTION_CSV)
 
 # 마지막 로그인별 이탈률 계산
 churn_by_age = df.groupby('AccountAge').agg(
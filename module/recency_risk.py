@@ -0,0 +1,83 @@
+# ======================================================== 마지막 접속 경과일(Recency) → 이탈 확률 =============================================================
+# '14일의 법칙' 산점도의 S커브(로지스틱)를 배열 단위로 계산한다.
+#   - churn_curve: 경과일 배열 → 이탈 확률 배열
+#   - simulate: 가상 경과일 + 노이즈 (기존 페이지와 같은 seed면 같은 점이 나온다)
+#   - fit_curve: 실제 (경과일, 이탈 여부) 데이터로 곡선의 중심/기울기를 추정
+#     (경과일별 고객 수 / 이탈 수로 먼저 집계하므로 수백만 행도 빠르다)
+#   - recency_frame: 데이터에 경과일 컬럼이 있으면 실제 데이터로 맞춘 곡선, 없으면 가상 데이터
+
+import numpy as np
+import pandas as pd
+
+# 7일에 45%, 14일에 82% 정도가 되는 기본 곡선
+RECENCY_MIDPOINT = 8
+RECENCY_SLOPE = 0.4
+RECENCY_NOISE = 0.05
+RED_LINE_DAYS = 14
+
+RECENCY_SAMPLE = 200
+RECENCY_COLUMN = 'DaysSinceLastLogin'
+
+
+def churn_curve(days, midpoint=RECENCY_MIDPOINT, slope=RECENCY_SLOPE):
+    days = np.asarray(days, dtype=np.float64)
+    return 1 / (1 + np.exp(-(days - midpoint) * slope))
+
+
+def churn_percent(days, midpoint=RECENCY_MIDPOINT, slope=RECENCY_SLOPE, noise=None):
+    # 이탈 확률(%) = 곡선 + 노이즈, 0~100으로 자름
+    prob = churn_curve(days, midpoint, slope)
+    if noise is not None:
+        prob = prob + noise
+    return np.clip(prob * 100, 0, 100)
+
+
+def simulate(n=RECENCY_SAMPLE, seed=42, max_days=30, midpoint=RECENCY_MIDPOINT,
+             slope=RECENCY_SLOPE, noise_sd=RECENCY_NOISE):
+    rng = np.random.RandomState(seed)
+    days = rng.randint(1, max_days + 1, n)
+    noise = rng.normal(0, noise_sd, n)
+    return pd.DataFrame({'Recency': days, 'ChurnProb': churn_percent(days, midpoint, slope, noise)})
+
+
+def fit_curve(days, churned, iterations=25):
+    # 1차원 로지스틱 회귀 (Newton-Raphson). 반환: (midpoint, slope)
+    days = np.asarray(days, dtype=np.float64)
+    churned = np.asarray(churned, dtype=np.float64)
+    keep = ~(np.isnan(days) | np.isnan(churned))
+
+    # 경과일별로 집계한 뒤 가중치로 학습
+    values, inv = np.unique(days[keep], return_inverse=True)
+    n = np.bincount(inv).astype(np.float64)
+    k = np.bincount(inv, weights=churned[keep])
+    X = np.column_stack([np.ones_like(values), values])
+
+    beta = np.array([-RECENCY_MIDPOINT * RECENCY_SLOPE, RECENCY_SLOPE])
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(X @ beta)))
+        w = n * p * (1 - p)
+        grad = X.T @ (k - n * p)
+        hess = X.T @ (X * w[:, None])
+        step = np.linalg.lstsq(hess, grad, rcond=None)[0]
+        beta = beta + step
+        if np.abs(step).max() < 1e-8:
+            break
+
+    intercept, slope = beta
+    return -intercept / slope, slope
+
+
+def recency_frame(df=None, n=RECENCY_SAMPLE, seed=42):
+    # Recency / ChurnProb 데이터프레임과 곡선 파라미터 (midpoint, slope)
+    if df is None or RECENCY_COLUMN not in df.columns:
+        return simulate(n, seed), (RECENCY_MIDPOINT, RECENCY_SLOPE)
+
+    midpoint, slope = fit_curve(df[RECENCY_COLUMN], df['Churn'])
+    days = df[RECENCY_COLUMN].dropna().to_numpy()
+    noise = np.random.default_rng(seed).normal(0, RECENCY_NOISE, len(days))
+    frame = pd.DataFrame({'Recency': days, 'ChurnProb': churn_percent(days, midpoint, slope, noise)})
+    return frame, (midpoint, slope)
+
+
+def red_line_colors(days, red_line=RED_LINE_DAYS):
+    return np.where(np.asarray(days) >= red_line, 'red', 'blue')
@@ -0,0 +1,178 @@
+# ======================================================== 고객별 이탈 위험 점수 =============================================================
+# 이탈 모델(churn_model)의 스케일러 + 로지스틱 계수를 모든 고객에게 적용해서
+# 이탈 확률을 계산하고 안정군 / 주의군 / 위험군으로 나눈다.
+#   - 계산은 NumPy로 SCORE_CHUNK행씩, 스레드 풀로 모든 코어에서 병렬 처리
+#   - 모델 확률은 실제 이탈 여부 기준 구간(분위)별 이탈률로 보정(histogram binning)한 뒤 기준값으로 등급을 나눈다
+#   - 결과는 (데이터 버전)별로 data/.cache 에 컬럼 파일(Arrow, 없으면 npz) + 요약 JSON으로 저장
+# 화면(파이 차트 / 지표)은 작은 요약 JSON만 읽는다.
+#
+# 결측 변수는 학습 평균으로 채운다 (표준화 후 0).
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from churn_data import CHURN_CSV, _pyarrow, artifact_path, dataset_version, load_churn
+from churn_model import scoring_params
+from plan_index import is_filtered, plan_rows
+
+RISK_TIERS = ['안정군', '주의군', '위험군']
+# 보정된 이탈 확률 기준: 0.3 미만 안정군, 0.3 ~ 0.6 주의군, 0.6 이상 위험군
+RISK_THRESHOLDS = [0.3, 0.6]
+
+SCORE_CHUNK = 1_000_000
+SCORE_WORKERS = os.cpu_count() or 1
+
+CALIBRATION_BINS = 20
+CALIBRATION_SAMPLE = 1_000_000
+
+SUMMARY_NAME = "risk_summary.json"
+
+
+def _scores_name():
+    return "risk_scores.arrow" if _pyarrow() is not None else "risk_scores.npz"
+
+
+def _raw_chunk(X, mean, scale, coef, intercept):
+    Z = (X - mean) / scale
+    Z[np.isnan(Z)] = 0.0
+    return 1.0 / (1.0 + np.exp(-(Z @ coef + intercept)))
+
+
+def raw_probability(X, params, chunk=SCORE_CHUNK, workers=SCORE_WORKERS):
+    # 모델 그대로의 이탈 확률 (float32)
+    X = np.asarray(X)
+    args = [np.asarray(params[k], dtype=np.float64) for k in ('mean', 'scale', 'coef')]
+    out = np.empty(len(X), dtype=np.float32)
+
+    def score(start):
+        block = X[start:start + chunk].astype(np.float64)
+        out[start:start + chunk] = _raw_chunk(block, *args, params['intercept'])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(score, range(0, len(X), chunk)))
+    return out
+
+
+def fit_calibration(prob, churn, bins=CALIBRATION_BINS, sample=CALIBRATION_SAMPLE, seed=42):
+    # 확률 분위 구간별 (평균 예측 확률 → 실제 이탈률) 대응표
+    prob = np.asarray(prob, dtype=np.float64)
+    churn = np.asarray(churn, dtype=np.float64)
+    keep = np.flatnonzero(~np.isnan(churn))
+    if len(keep) > sample:
+        keep = np.random.default_rng(seed).choice(keep, sample, replace=False)
+    prob, churn = prob[keep], churn[keep]
+
+    edges = np.unique(np.quantile(prob, np.linspace(0, 1, bins + 1)))
+    codes = np.clip(np.searchsorted(edges, prob, side='right') - 1, 0, max(len(edges) - 2, 0))
+    counts = np.bincount(codes)
+    used = counts > 0
+    predicted = np.bincount(codes, weights=prob)[used] / counts[used]
+    observed = np.bincount(codes, weights=churn)[used] / counts[used]
+    return {'predicted': predicted.tolist(), 'observed': observed.tolist()}
+
+
+def calibrate(prob, calibration):
+    return np.interp(prob, calibration['predicted'], calibration['observed']).astype(np.float32)
+
+
+def risk_tier(prob, thresholds=RISK_THRESHOLDS):
+    # 0: 안정군, 1: 주의군, 2: 위험군
+    return np.searchsorted(thresholds, prob, side='right').astype(np.int8)
+
+
+def score_frame(df, path=CHURN_CSV):
+    params = scoring_params(path)
+    X = df[params['features']].to_numpy(dtype=np.float32)
+    raw = raw_probability(X, params)
+    calibration = fit_calibration(raw, df['Churn'].to_numpy(dtype=np.float64))
+    prob = calibrate(raw, calibration)
+    return prob, risk_tier(prob), calibration
+
+
+# ======================================================== 저장 / 요약 =================================================================
+def _write_scores(scores_path, prob, tier):
+    tmp = f"{scores_path}.{os.getpid()}.tmp"
+    pa = _pyarrow()
+    if pa is None:
+        with open(tmp, 'wb') as f:
+            np.savez(f, probability=prob, tier=tier)
+    else:
+        table = pa.table({'probability': prob, 'tier': tier})
+        with pa.OSFile(tmp, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp, scores_path)
+
+
+def _summarize(tier, churn, calibration):
+    # '현재 구독자'(아직 이탈하지 않은 고객) 기준 등급 분포
+    active = churn == 0
+    counts = np.bincount(tier[active], minlength=len(RISK_TIERS))
+    total = int(counts.sum())
+    return {
+        'tiers': RISK_TIERS,
+        'counts': counts.tolist(),
+        'shares': (counts / total if total else counts.astype(float)).tolist(),
+        'active': total,
+        'scored': int(len(tier)),
+        'thresholds': RISK_THRESHOLDS,
+        'calibration': calibration,
+    }
+
+
+def build_scores(path=CHURN_CSV):
+    path = os.path.abspath(path)
+    df = load_churn(path)
+    prob, tier, calibration = score_frame(df, path)
+    _write_scores(artifact_path(path, _scores_name()), prob, tier)
+
+    summary = _summarize(tier, df['Churn'].to_numpy(), calibration)
+    summary_path = artifact_path(path, SUMMARY_NAME)
+    tmp = f"{summary_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False)
+    os.replace(tmp, summary_path)
+    return summary
+
+
+@lru_cache(maxsize=4)
+def _load_summary(path, summary_path):
+    if os.path.exists(summary_path):
+        with open(summary_path, encoding='utf-8') as f:
+            return json.load(f)
+    return build_scores(path)
+
+
+@lru_cache(maxsize=16)
+def _filtered_summary(path, version, plan, month):
+    # 저장된 고객별 등급에서 필터한 행만 다시 집계
+    rows = plan_rows(path, plan, month)
+    tier = load_scores(path)['tier'][rows]
+    churn = load_churn(path)['Churn'].to_numpy()[rows]
+    return _summarize(tier, churn, risk_summary(path)['calibration'])
+
+
+def risk_summary(path=CHURN_CSV, plan=None, month=None):
+    # {'tiers', 'counts', 'shares', 'active', ...} (없으면 점수를 계산해서 저장)
+    # plan / month: 사이드바 필터 (plan_index 참고)
+    path = os.path.abspath(path)
+    if is_filtered(path, plan, month):
+        return _filtered_summary(path, dataset_version(path), plan, month)
+    return _load_summary(path, artifact_path(path, SUMMARY_NAME))
+
+
+def load_scores(path=CHURN_CSV):
+    # load_churn(path) 행 순서와 같은 {'probability', 'tier'} 배열
+    path = os.path.abspath(path)
+    risk_summary(path)
+    scores_path = artifact_path(path, _scores_name())
+    pa = _pyarrow()
+    if pa is None:
+        with np.load(scores_path) as data:
+            return {'probability': data['probability'], 'tier': data['tier']}
+    table = pa.ipc.open_file(pa.memory_map(scores_path)).read_all()
+    return {name: table.column(name).to_numpy() for name in ('probability', 'tier')}
@@ -0,0 +1,41 @@
+# ======================================================== 섹션 병렬 계산 =============================================================
+# 한 페이지의 여러 섹션 계산(집계 조회, 시뮬레이션 등)을 순서대로 하나씩 하지 않고
+# 스레드 풀에 한꺼번에 넣은 뒤, 결과를 모아서 화면에는 원래 순서대로 그린다.
+#   - 계산 함수 안에서는 st.* 를 호출하지 않는다 (화면 출력은 메인 스레드에서만)
+#   - 큰 데이터프레임을 복사 / 직렬화하지 않도록 프로세스가 아닌 스레드를 쓴다
+#     (NumPy / pandas 연산은 대부분 GIL을 풀고 돈다)
+#   - 풀은 프로세스 전체가 공유하므로 동시 접속자가 늘어도 스레드 수는 SECTION_WORKERS로 고정
+#
+# 풀 크기: 환경변수 SECTION_WORKERS (1이면 순서대로 실행)
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SECTION_WORKERS = int(os.environ.get('SECTION_WORKERS', 0)) or min(8, os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix='section')
+        return _pool
+
+
+def run_sections(tasks, workers=None):
+    # tasks: {이름: 인자 없는 함수} → {이름: 결과} (입력 순서 유지, 예외는 그대로 전달)
+    workers = SECTION_WORKERS if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1:
+        return {name: fn() for name, fn in tasks.items()}
+
+    pool = _get_pool() if workers == SECTION_WORKERS else ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {name: pool.submit(fn) for name, fn in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        if pool is not _pool:
+            pool.shutdown(wait=False)
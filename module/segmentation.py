@@ -0,0 +1,188 @@
+# ======================================================== 고객 세그먼트 =============================================================
+# myApp3 '유저 분화'의 StandardScaler + KMeans를 페이지를 열 때마다 전체 데이터로 다시 돌리지 않도록,
+#   - 표본(SEGMENT_SAMPLE행)으로 MiniBatchKMeans를 학습하고
+#   - 스케일러 평균/표준편차 + 중심점만 저장한 뒤
+#   - 전체 고객은 NumPy로 ASSIGN_BATCH행씩 가장 가까운 중심점에 배정해서
+# (데이터 버전, k)별로 data/.cache 에 세그먼트 컬럼과 함께 저장한다. 이후 조회는 파일만 읽는다.
+#
+# k 후보(elbow / silhouette) 비교는 오래 걸리므로 요청 처리 중에 돌리지 않고
+# 별도 프로세스에서 계산해서 JSON으로 저장한다:
+#   python module/segmentation.py sweep data/Subscription_Service_Churn_Dataset.csv
+
+import json
+import os
+import subprocess
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from churn_data import SUBSCRIPTION_CSV, artifact_path, load_churn
+from lazy_import import lazy
+
+SEG_FEATURES = [
+    'ViewingHoursPerWeek',
+    'WatchlistSize',
+    'ContentDownloadsPerMonth',
+    'SupportTicketsPerMonth',
+]
+N_SEGMENTS = 4
+
+SEGMENT_SAMPLE = 50_000
+ASSIGN_BATCH = 100_000
+MINIBATCH_SIZE = 4096
+
+SWEEP_KS = list(range(2, 9))
+SWEEP_SAMPLE = 20_000
+SILHOUETTE_SAMPLE = 5_000
+SWEEP_NAME = "segment_sweep.json"
+
+# 백그라운드 sweep 프로세스 (CSV 경로: Popen)
+_sweeps = {}
+
+
+def _segment_name(k):
+    return f"segments.k{k}.npz"
+
+
+def _matrix(df):
+    return df[SEG_FEATURES].to_numpy(dtype=np.float64)
+
+
+def _sample(X, size, seed=42):
+    rows = np.flatnonzero(np.isfinite(X).all(axis=1))
+    if len(rows) > size:
+        rows = np.sort(np.random.default_rng(seed).choice(rows, size, replace=False))
+    return X[rows]
+
+
+def _standardize(X):
+    # StandardScaler와 같은 평균 / 모표준편차 (분산 0이면 1)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    return mean, scale
+
+
+def _kmeans(Z, k, seed=42):
+    MiniBatchKMeans = lazy('sklearn.cluster').MiniBatchKMeans
+    return MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=MINIBATCH_SIZE,
+                           n_init=3).fit(Z)
+
+
+def fit_segments(df, k=N_SEGMENTS, sample=SEGMENT_SAMPLE):
+    X = _sample(_matrix(df), sample)
+    mean, scale = _standardize(X)
+    centroids = _kmeans((X - mean) / scale, k).cluster_centers_
+    # 세그먼트 번호가 학습마다 바뀌지 않도록 주간 시청 시간 순으로 정렬
+    centroids = centroids[np.argsort(centroids[:, 0], kind='stable')]
+    return {'mean': mean, 'scale': scale, 'centroids': centroids}
+
+
+def assign_segments(X, model, batch=ASSIGN_BATCH):
+    # 가장 가까운 중심점 번호 (int8), 결측이 있는 행은 -1
+    X = np.asarray(X, dtype=np.float64)
+    C = model['centroids']
+    c_norm = (C ** 2).sum(axis=1)
+    out = np.full(len(X), -1, dtype=np.int8)
+
+    for start in range(0, len(X), batch):
+        Z = (X[start:start + batch] - model['mean']) / model['scale']
+        dist = c_norm - 2 * Z @ C.T
+        labels = dist.argmin(axis=1).astype(np.int8)
+        labels[~np.isfinite(Z).all(axis=1)] = -1
+        out[start:start + batch] = labels
+    return out
+
+
+def _save_segments(seg_path, model, segment):
+    tmp = f"{seg_path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, segment=segment, **model)
+    os.replace(tmp, seg_path)
+
+
+@lru_cache(maxsize=8)
+def _load_segments(path, seg_path, k):
+    if os.path.exists(seg_path):
+        with np.load(seg_path) as data:
+            return {name: data[name] for name in data.files}
+
+    df = load_churn(path)
+    model = fit_segments(df, k)
+    result = dict(model, segment=assign_segments(_matrix(df), model))
+    _save_segments(seg_path, model, result['segment'])
+    return result
+
+
+def load_segment_model(path=SUBSCRIPTION_CSV, k=N_SEGMENTS):
+    # {'mean', 'scale', 'centroids', 'segment'} (신규 고객은 assign_segments로 배정)
+    path = os.path.abspath(path)
+    return _load_segments(path, artifact_path(path, _segment_name(k)), k)
+
+
+def load_segments(path=SUBSCRIPTION_CSV, k=N_SEGMENTS):
+    # load_churn(path) 행 순서와 같은 세그먼트 컬럼
+    return load_segment_model(path, k)['segment']
+
+
+# ======================================================== k 선택 (elbow / silhouette) =================================================================
+def sweep_k(path, ks=SWEEP_KS):
+    silhouette_score = lazy('sklearn.metrics').silhouette_score
+
+    X = _sample(_matrix(load_churn(path)), SWEEP_SAMPLE)
+    mean, scale = _standardize(X)
+    Z = (X - mean) / scale
+
+    rows = []
+    for k in ks:
+        km = _kmeans(Z, k)
+        rows.append({
+            'k': k,
+            'inertia': float(km.inertia_ / len(Z)),
+            'silhouette': float(silhouette_score(Z, km.labels_, sample_size=min(SILHOUETTE_SAMPLE, len(Z)),
+                                                 random_state=42)),
+        })
+    return rows
+
+
+def run_sweep(path):
+    path = os.path.abspath(path)
+    sweep_path = artifact_path(path, SWEEP_NAME)
+    rows = sweep_k(path)
+    tmp = f"{sweep_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(rows, f)
+    os.replace(tmp, sweep_path)
+    return rows
+
+
+def load_sweep(path=SUBSCRIPTION_CSV, start=True):
+    # 저장된 sweep 결과 (없으면 None, start=True면 백그라운드 계산을 시작)
+    path = os.path.abspath(path)
+    sweep_path = artifact_path(path, SWEEP_NAME)
+    if os.path.exists(sweep_path):
+        with open(sweep_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    # 프로세스당 한 번만 시작 (실패해도 rerun마다 다시 띄우지 않는다)
+    if start and path not in _sweeps:
+        _sweeps[path] = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), 'sweep', path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    return None
+
+
+def sweep_running(path=SUBSCRIPTION_CSV):
+    proc = _sweeps.get(os.path.abspath(path))
+    return proc is not None and proc.poll() is None
+
+
+def best_k(sweep):
+    return max(sweep, key=lambda row: row['silhouette'])['k']
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == 'sweep':
+        for row in run_sweep(sys.argv[2] if len(sys.argv) > 2 else SUBSCRIPTION_CSV):
+            print(f"k={row['k']:<3} inertia={row['inertia']:.4f} silhouette={row['silhouette']:.4f}")
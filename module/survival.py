@@ -0,0 +1,142 @@
+# ======================================================== Kaplan-Meier 생존 곡선 =============================================================
+# lifelines의 KaplanMeierFitter를 그룹마다 따로 fit하는 대신,
+# 모든 그룹(strata)의 생존 곡선을 NumPy로 한 번에 계산한다.
+#   - (그룹, 시점)별 관측 수 / 이탈 수를 np.unique + bincount로 한 번에 집계
+#   - 그룹 내 누적합으로 위험 집합(at risk)과 생존 확률 계산
+#   - 신뢰구간은 lifelines 기본값과 같은 Greenwood 분산 + log(-log) 변환
+# 결과는 (데이터 버전, 그룹 기준)별로 data/.cache 에 저장해 두고 읽는다.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import CHURN_CSV, artifact_path, dataset_version, load_churn
+from plan_index import filtered_frame, is_filtered
+
+Z_95 = 1.959963984540054
+LONG_TERM_MONTHS = 6
+
+# 원본에 없는 그룹 기준 컬럼
+STRATA = {
+    '장기고객': lambda df: df['AccountAge'] >= LONG_TERM_MONTHS,
+}
+
+
+def km_curves(durations, events, strata=None, alpha_z=Z_95):
+    durations = np.asarray(durations, dtype=np.float64)
+    events = np.asarray(events, dtype=np.float64)
+
+    if strata is None:
+        s_labels, s_codes = np.array(['KM_estimate']), np.zeros(len(durations), dtype=np.int64)
+    else:
+        if not isinstance(strata, pd.MultiIndex):
+            strata = pd.Series(strata)
+        s_codes, s_labels = pd.factorize(strata, sort=True)
+        s_labels = np.asarray(s_labels)
+    keep = (s_codes >= 0) & ~np.isnan(durations)
+    durations, events, s_codes = durations[keep], events[keep], s_codes[keep]
+
+    # (그룹, 시점) 키로 정렬된 한 번의 집계
+    times, t_idx = np.unique(durations, return_inverse=True)
+    keys, inv = np.unique(s_codes * len(times) + t_idx, return_inverse=True)
+    removed = np.bincount(inv)
+    deaths = np.bincount(inv, weights=events)
+    key_strata = keys // len(times)
+    key_times = times[keys % len(times)]
+
+    # 그룹별 시작 위치 기준으로 누적합을 다시 0부터 시작하게 만든다
+    n_strata = len(s_labels)
+    starts = np.searchsorted(key_strata, np.arange(n_strata))
+    totals = np.bincount(key_strata, weights=removed, minlength=n_strata)
+
+    def grouped_cumsum(values):
+        cum = np.cumsum(values)
+        before = np.concatenate([[0.0], cum])[starts]
+        return cum - before[key_strata]
+
+    at_risk = totals[key_strata] - (grouped_cumsum(removed) - removed)
+
+    # d == n 이면 생존 확률이 0이 되므로 log 대신 별도 표시
+    wipeout = deaths >= at_risk
+    safe_n = np.where(wipeout, 1.0, at_risk)
+    safe_d = np.where(wipeout, 0.0, deaths)
+    log_s = grouped_cumsum(np.log1p(-safe_d / safe_n))
+    zeroed = grouped_cumsum(wipeout.astype(np.float64)) > 0
+    survival = np.where(zeroed, 0.0, np.exp(log_s))
+
+    greenwood = grouped_cumsum(safe_d / (safe_n * (safe_n - safe_d)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_v = np.log(survival)
+        spread = alpha_z * np.sqrt(greenwood) / log_v
+        lower = np.exp(-np.exp(np.log(-log_v) - spread))
+        upper = np.exp(-np.exp(np.log(-log_v) + spread))
+    upper = np.where(survival >= 1.0, 1.0, np.nan_to_num(upper, nan=0.0))
+    lower = np.where(survival >= 1.0, 1.0, np.nan_to_num(lower, nan=0.0))
+
+    curves = {}
+    for code, label in enumerate(s_labels):
+        sl = slice(starts[code], starts[code + 1] if code + 1 < n_strata else len(keys))
+        curve = pd.DataFrame({
+            'survival': survival[sl],
+            'ci_lower': lower[sl],
+            'ci_upper': upper[sl],
+        }, index=pd.Index(key_times[sl], name='timeline'))
+        if len(curve) == 0 or curve.index[0] > 0:
+            curve = pd.concat([pd.DataFrame({'survival': [1.0], 'ci_lower': [1.0], 'ci_upper': [1.0]},
+                                            index=pd.Index([0.0], name='timeline')), curve])
+        curves[label.item() if hasattr(label, 'item') else label] = curve
+    return curves
+
+
+def _km_name(by):
+    return f"km.{'+'.join(by) or 'all'}.pkl"
+
+
+def _strata_curves(df, by):
+    if not by:
+        strata = None
+    else:
+        cols = [STRATA[c](df) if c in STRATA else df[c] for c in by]
+        strata = cols[0] if len(cols) == 1 else pd.MultiIndex.from_arrays(cols)
+    return km_curves(df['AccountAge'], df['Churn'], strata)
+
+
+@lru_cache(maxsize=32)
+def _km_by(path, km_path, by):
+    if os.path.exists(km_path):
+        return pd.read_pickle(km_path)
+
+    curves = _strata_curves(load_churn(path), by)
+    tmp = f"{km_path}.{os.getpid()}.tmp"
+    pd.to_pickle(curves, tmp)
+    os.replace(tmp, km_path)
+    return curves
+
+
+@lru_cache(maxsize=32)
+def _filtered_km(path, version, by, plan, month):
+    return _strata_curves(filtered_frame(path, plan, month), by)
+
+
+def km_by(path=CHURN_CSV, by=(), plan=None, month=None):
+    # by: 그룹 기준 컬럼 이름 (하나 또는 여러 개), plan / month: 사이드바 필터
+    path = os.path.abspath(path)
+    if isinstance(by, str):
+        by = (by,)
+    by = tuple(by)
+    if is_filtered(path, plan, month):
+        return _filtered_km(path, dataset_version(path), by, plan, month)
+    return _km_by(path, artifact_path(path, _km_name(by)), by)
+
+
+def plot_km(ax, curve, label=None, ci=True, **kwargs):
+    # lifelines의 plot과 같은 계단 + 신뢰구간 음영
+    line, = ax.step(curve.index, curve['survival'], where='post', label=label, **kwargs)
+    if ci:
+        ax.fill_between(curve.index, curve['ci_lower'], curve['ci_upper'],
+                        step='post', alpha=0.25, color=line.get_color(), linewidth=0)
+    ax.set_xlabel('timeline')
+    ax.legend()
+    return ax
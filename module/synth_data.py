@@ -0,0 +1,258 @@
+# ======================================================== 합성 이탈 데이터 생성 =============================================================
+# 원본 CSV(약 960행)보다 큰 데이터에서 페이지가 어떻게 동작하는지 보기 위해,
+# 원본과 컬럼 / 타입이 같은 데이터를 원하는 행 수(1만 / 100만 / 1000만)만큼 만든다.
+#   - 분포는 원본(reference)에서 가져온다
+#       범주형 / Yes-No: 결측을 포함한 값 비율
+#       숫자형: 결측 비율 + 분위수(역누적분포)로 뽑기, 정수 컬럼은 반올림
+#       MonthlyCharges: 구독 유형(SubscriptionType)별 분위수, TotalCharges ≈ MonthlyCharges × AccountAge
+#   - 이탈(Churn)은 변수들과 상관이 있도록 로지스틱으로 뽑는다
+#       가중치 = 원본의 (이탈 - 유지) 평균 차이 / 표준편차 × 1.7, 절편은 원본 이탈률에 맞춤
+#   - 한글 파생 컬럼(가입기간 / 이탈여부 / 장기고객 / 요금제)은 원래 정의대로 다시 계산
+#   - CHUNK_ROWS행씩 만들어서 CSV에 이어 쓰므로 1000만 행도 메모리에 다 올리지 않는다
+#     (chunk마다 SeedSequence로 나눈 난수열: seed와 chunk 크기가 같으면 같은 데이터)
+#
+#   python module/synth_data.py --rows 10k 1m 10m --out data/synth
+#   python module/synth_data.py --rows 1m --plain     # 한글 파생 컬럼 없이 (Subscription CSV 형식)
+
+import argparse
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from churn_data import CHURN_CSV, DERIVED_COLUMNS
+from churn_cube import PRICE_BINS
+
+SIZES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+CHUNK_ROWS = 500_000
+SYNTH_DIR = "data/synth"
+
+PROFILE_ROWS = 200_000
+QUANTILES = np.linspace(0, 1, 201)
+
+PLAN_COLUMN = 'SubscriptionType'
+ID_COLUMN = 'CustomerID'
+ID_LENGTH = 10
+ID_ALPHABET = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', dtype=np.uint8)
+
+# 이탈 확률에 들어가는 변수
+CHURN_FEATURES = [
+    'AccountAge',
+    'ViewingHoursPerWeek',
+    'AverageViewingDuration',
+    'ContentDownloadsPerMonth',
+    'SupportTicketsPerMonth',
+    'MonthlyCharges',
+    'WatchlistSize',
+    'UserRating',
+]
+# 표준화 평균 차이 → 로지스틱 계수 (probit ≈ logit / 1.7)
+EFFECT_SCALE = 1.7
+LONG_TERM_MONTHS = 6
+
+
+# ======================================================== 원본 분포 =================================================================
+def _frequencies(series):
+    counts = series.value_counts(dropna=False, normalize=True)
+    values = [None if pd.isna(v) else v for v in counts.index]
+    return values, counts.to_numpy(dtype=np.float64)
+
+
+def _quantiles(values):
+    values = values[~np.isnan(values)]
+    return np.quantile(values, QUANTILES) if len(values) else np.zeros(len(QUANTILES))
+
+
+def build_profile(df):
+    ref = df.drop(columns=[c for c in DERIVED_COLUMNS if c in df.columns])
+    numeric, categorical = {}, {}
+    for col in ref.columns:
+        if col in (ID_COLUMN, 'Churn', 'TotalCharges'):
+            continue
+        if pd.api.types.is_numeric_dtype(ref[col]):
+            values = ref[col].to_numpy(dtype=np.float64)
+            numeric[col] = {
+                'quantiles': _quantiles(values),
+                'missing': float(np.isnan(values).mean()),
+                'integer': bool(np.all(np.nan_to_num(values) == np.round(np.nan_to_num(values)))),
+            }
+        else:
+            categorical[col] = _frequencies(ref[col])
+
+    # 요금은 구독 유형별 분포
+    plan_charges = {
+        str(plan): _quantiles(group['MonthlyCharges'].to_numpy(dtype=np.float64))
+        for plan, group in ref.groupby(PLAN_COLUMN, observed=True)
+    }
+
+    churn = ref['Churn'].to_numpy(dtype=np.float64)
+    weights = {}
+    for col in CHURN_FEATURES:
+        values = ref[col].to_numpy(dtype=np.float64)
+        keep = ~np.isnan(values)
+        std = values[keep].std()
+        if std == 0 or churn[keep].min() == churn[keep].max():
+            continue
+        diff = values[keep][churn[keep] == 1].mean() - values[keep][churn[keep] == 0].mean()
+        weights[col] = (float(values[keep].mean()), float(std), EFFECT_SCALE * diff / std)
+
+    total = ref['TotalCharges'].to_numpy(dtype=np.float64)
+    return {
+        'columns': list(df.columns),
+        'numeric': numeric,
+        'categorical': categorical,
+        'plan_charges': plan_charges,
+        'total_missing': float(np.isnan(total).mean()),
+        'churn_rate': float(churn.mean()),
+        'churn_weights': weights,
+    }
+
+
+@lru_cache(maxsize=2)
+def reference_profile(path=CHURN_CSV):
+    return build_profile(pd.read_csv(path, nrows=PROFILE_ROWS))
+
+
+# ======================================================== 생성 =================================================================
+def _draw_numeric(rng, spec, n):
+    values = np.interp(rng.random(n), QUANTILES, spec['quantiles'])
+    if spec['integer']:
+        values = np.round(values)
+    values[rng.random(n) < spec['missing']] = np.nan
+    return values
+
+
+def _draw_category(rng, values, probs, n):
+    codes = rng.choice(len(values), size=n, p=probs / probs.sum())
+    categories = [v for v in values if v is not None]
+    lookup = np.array([categories.index(v) if v is not None else -1 for v in values])
+    return pd.Categorical.from_codes(lookup[codes], categories=categories)
+
+
+def _customer_ids(rng, n):
+    chars = ID_ALPHABET[rng.integers(0, len(ID_ALPHABET), size=(n, ID_LENGTH))]
+    return chars.view(f'S{ID_LENGTH}').ravel().astype(str)
+
+
+def _logit(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def _churn_logit(columns, profile, n):
+    score = np.zeros(n)
+    for col, (mean, std, weight) in profile['churn_weights'].items():
+        z = (columns[col] - mean) / std
+        score += weight * np.nan_to_num(z)
+    return score
+
+
+def _intercept(score, rate):
+    # 평균 이탈 확률이 원본 이탈률이 되도록 절편을 이분 탐색
+    lo, hi = -20.0, 20.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if _logit(score + mid).mean() < rate:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def generate_chunk(n, seed, profile, intercept=None, plain=False):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for col, spec in profile['numeric'].items():
+        columns[col] = _draw_numeric(rng, spec, n)
+    for col, (values, probs) in profile['categorical'].items():
+        columns[col] = _draw_category(rng, values, probs, n)
+
+    # 구독 유형별 요금 / 총 요금
+    if 'MonthlyCharges' in columns:
+        charges = columns['MonthlyCharges']
+        plan = np.asarray(columns[PLAN_COLUMN].astype(object))
+        for name, quantiles in profile['plan_charges'].items():
+            rows = np.flatnonzero((plan == name) & ~np.isnan(charges))
+            charges[rows] = np.interp(rng.random(len(rows)), QUANTILES, quantiles)
+        total = np.nan_to_num(charges, nan=np.nanmedian(charges)) * columns['AccountAge'] * rng.uniform(0.9, 1.1, n)
+        total[rng.random(n) < profile['total_missing']] = np.nan
+        columns['TotalCharges'] = total
+
+    score = _churn_logit(columns, profile, n)
+    if intercept is None:
+        intercept = _intercept(score, profile['churn_rate'])
+    columns['Churn'] = (rng.random(n) < _logit(score + intercept)).astype(np.int8)
+    columns[ID_COLUMN] = _customer_ids(rng, n)
+
+    if not plain:
+        age = columns['AccountAge']
+        columns['가입기간'] = age.astype(np.int64)
+        columns['이탈여부'] = columns['Churn']
+        columns['장기고객'] = age >= LONG_TERM_MONTHS
+        columns['요금제'] = pd.cut(columns['MonthlyCharges'], bins=PRICE_BINS,
+                                labels=['Basic', 'Standard', 'Premium'])
+
+    order = [c for c in profile['columns'] if c in columns and (not plain or c not in DERIVED_COLUMNS)]
+    df = pd.DataFrame({c: columns[c] for c in order})
+    for col in ('AccountAge',) + tuple(c for c, s in profile['numeric'].items() if s['integer']):
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype(np.int64)
+    return df, intercept
+
+
+def generate(n, seed=42, profile=None, plain=False, chunk=CHUNK_ROWS):
+    # chunk 단위 데이터프레임을 차례로 내보낸다
+    profile = profile or reference_profile()
+    seeds = np.random.SeedSequence(seed).spawn((n + chunk - 1) // chunk)
+    intercept = None
+    for i, child in enumerate(seeds):
+        size = min(chunk, n - i * chunk)
+        df, intercept = generate_chunk(size, child, profile, intercept, plain)
+        yield df
+
+
+def write_dataset(path, n, seed=42, profile=None, plain=False, chunk=CHUNK_ROWS):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    for i, df in enumerate(generate(n, seed, profile, plain, chunk)):
+        df.to_csv(tmp, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def dataset_path(size, out=SYNTH_DIR, plain=False):
+    prefix = 'subscription' if plain else 'churn'
+    return os.path.join(out, f"{prefix}_{size}.csv")
+
+
+def parse_size(size):
+    # '10k' / '1m' / '250000' → 행 수
+    size = str(size).lower()
+    if size in SIZES:
+        return SIZES[size]
+    for suffix, unit in (('k', 1_000), ('m', 1_000_000)):
+        if size.endswith(suffix):
+            return int(float(size[:-1]) * unit)
+    return int(size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='원본과 같은 형식의 합성 이탈 데이터 생성')
+    parser.add_argument('--rows', nargs='+', default=list(SIZES), help='행 수 (10k, 1m, 10m, 250000 ...)')
+    parser.add_argument('--out', default=SYNTH_DIR)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reference', default=CHURN_CSV)
+    parser.add_argument('--plain', action='store_true', help='한글 파생 컬럼 없이')
+    args = parser.parse_args()
+
+    profile = reference_profile(args.reference)
+    for size in args.rows:
+        path = dataset_path(size, args.out, args.plain)
+        write_dataset(path, parse_size(size), args.seed, profile, args.plain)
+        print(f"{path}: {parse_size(size):,} rows")
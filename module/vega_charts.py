@@ -0,0 +1,298 @@
+# ======================================================== 브라우저 렌더링 차트 (Vega-Lite) =============================================================
+# 서버에서 matplotlib 이미지를 만드는 대신, 미리 집계한 작은 데이터와 Vega-Lite 스펙만 보내서
+# 브라우저가 차트를 그리게 한다. 산점도처럼 행이 많은 차트는 서버에서 표본을 줄여서 보낸다.
+#
+# 사이드바의 렌더링 선택(st.session_state['chart_backend'])에 따라 show_chart가
+# figure_cache.show_figure(matplotlib) 또는 st.vega_lite_chart(Vega-Lite)로 그린다.
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from density import density_layers, use_density
+from figure_cache import show_figure
+
+BACKENDS = {
+    'matplotlib': '서버 이미지 (matplotlib)',
+    'vega': '브라우저 (Vega-Lite)',
+}
+
+# 브라우저로 보내는 산점도 최대 점 개수
+VEGA_MAX_POINTS = 5000
+# 표본을 줄일 때 그룹마다 최소로 남길 점 개수
+VEGA_MIN_POINTS_PER_GROUP = 50
+# 밀도 모드에서 브라우저로 보내는 격자 크기 (축마다)
+VEGA_DENSITY_BINS = 60
+
+
+def backend_selector(container=st.sidebar):
+    return container.radio("차트 렌더링", list(BACKENDS), format_func=BACKENDS.get,
+                           key='chart_backend')
+
+
+def current_backend():
+    return st.session_state.get('chart_backend', 'matplotlib')
+
+
+def show_chart(draw, *args, spec=None, key=None, **kwargs):
+    # spec: Vega-Lite 스펙을 만드는 함수 (matplotlib 모드에서는 호출하지 않는다)
+    if spec is not None and current_backend() == 'vega':
+        st.vega_lite_chart(spec=spec(), use_container_width=True)
+    else:
+        show_figure(draw, *args, key=key, **kwargs)
+
+
+# ======================================================== 데이터 준비 =================================================================
+def _records(df):
+    # JSON으로 보낼 수 있게 NaN → None, numpy 타입 → 파이썬 기본 타입
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient='records')
+
+
+def downsample(df, max_points=VEGA_MAX_POINTS, by=None, seed=42):
+    # 전체 비율을 유지하는 무작위 표본. by가 있으면 작은 그룹도 최소 개수는 남긴다.
+    n = len(df)
+    if n <= max_points:
+        return df
+
+    rng = np.random.default_rng(seed)
+    rate = np.full(n, max_points / n)
+    if by is not None:
+        sizes = df.groupby(by, observed=True)[by].transform('size').to_numpy()
+        rate = np.maximum(rate, np.minimum(1.0, VEGA_MIN_POINTS_PER_GROUP / sizes))
+    return df[rng.random(n) < rate]
+
+
+def _rules(rules):
+    # rules: {'x': [값...], 'y': [값...]} 기준선
+    return [{'data': {'values': [{'v': v}]},
+             'mark': {'type': 'rule', 'strokeDash': [6, 4]},
+             'encoding': {axis: {'field': 'v', 'type': 'quantitative'}}}
+            for axis, values in (rules or {}).items() for v in values]
+
+
+def _base(title, data, width='container', height=320):
+    spec = {'data': {'values': data}, 'height': height}
+    if title:
+        spec['title'] = title
+    if width is not None:
+        spec['width'] = width
+    return spec
+
+
+# ======================================================== 차트 스펙 =================================================================
+def bar_spec(series, title=None, y_title=None, y_domain=None, horizontal=False):
+    x_name = series.index.name or 'x'
+    data = _records(pd.DataFrame({x_name: series.index.astype(str), 'value': series.to_numpy()}))
+    cat = {'field': x_name, 'type': 'nominal', 'sort': None, 'title': None}
+    val = {'field': 'value', 'type': 'quantitative', 'title': y_title}
+    if y_domain is not None:
+        val['scale'] = {'domain': list(y_domain)}
+
+    spec = _base(title, data)
+    spec['mark'] = {'type': 'bar', 'tooltip': True}
+    spec['encoding'] = {'y': cat, 'x': val} if horizontal else {'x': dict(cat, axis={'labelAngle': 0}), 'y': val}
+    return spec
+
+
+def line_spec(x, y, title=None, x_title=None, y_title=None, y_domain=None, point=True, x_type='ordinal'):
+    data = _records(pd.DataFrame({'x': list(x), 'y': list(y)}))
+    y_enc = {'field': 'y', 'type': 'quantitative', 'title': y_title}
+    if y_domain is not None:
+        y_enc['scale'] = {'domain': list(y_domain)}
+
+    spec = _base(title, data)
+    spec['mark'] = {'type': 'line', 'point': point, 'strokeWidth': 3, 'tooltip': True}
+    spec['encoding'] = {
+        'x': {'field': 'x', 'type': x_type, 'sort': None, 'title': x_title, 'axis': {'labelAngle': 0}},
+        'y': y_enc,
+    }
+    return spec
+
+
+def interval_line_spec(x, y, lower, upper, title=None, y_title=None, y_domain=None):
+    # 선 + 점별 신뢰구간 막대
+    data = _records(pd.DataFrame({'x': list(x), 'y': list(y), 'lower': list(lower), 'upper': list(upper)}))
+    x_enc = {'field': 'x', 'type': 'ordinal', 'sort': None, 'title': None, 'axis': {'labelAngle': 0}}
+    y_enc = {'field': 'y', 'type': 'quantitative', 'title': y_title}
+    if y_domain is not None:
+        y_enc['scale'] = {'domain': list(y_domain)}
+
+    spec = _base(title, data)
+    spec['layer'] = [
+        {'mark': {'type': 'errorbar', 'ticks': True},
+         'encoding': {'x': x_enc, 'y': dict(y_enc, field='lower'), 'y2': {'field': 'upper'}}},
+        {'mark': {'type': 'line', 'point': True, 'strokeWidth': 3, 'tooltip': True},
+         'encoding': {'x': x_enc, 'y': y_enc}},
+    ]
+    return spec
+
+
+def series_line_spec(series, title=None, y_title=None, y_domain=None):
+    return line_spec(series.index.astype(str), series.to_numpy(), title=title,
+                     x_title=series.index.name, y_title=y_title, y_domain=y_domain)
+
+
+def km_spec(curves, names=None, title=None, x_max=None):
+    # curves: survival.km_curves 결과 {그룹: DataFrame(survival, ci_lower, ci_upper)}
+    frames = []
+    for label, curve in curves.items():
+        name = names(label) if callable(names) else str(label)
+        part = curve.reset_index()
+        part['group'] = name
+        frames.append(part)
+    data = pd.concat(frames, ignore_index=True)
+    if x_max is not None:
+        data = data[data['timeline'] <= x_max]
+
+    x = {'field': 'timeline', 'type': 'quantitative', 'title': 'timeline'}
+    if x_max is not None:
+        x['scale'] = {'domain': [0, x_max]}
+    color = {'field': 'group', 'type': 'nominal', 'title': None}
+
+    spec = _base(title, _records(data))
+    spec['layer'] = [
+        {'mark': {'type': 'area', 'interpolate': 'step-after', 'opacity': 0.25},
+         'encoding': {'x': x, 'y': {'field': 'ci_lower', 'type': 'quantitative', 'title': None},
+                      'y2': {'field': 'ci_upper'}, 'color': color}},
+        {'mark': {'type': 'line', 'interpolate': 'step-after', 'tooltip': True},
+         'encoding': {'x': x, 'y': {'field': 'survival', 'type': 'quantitative'}, 'color': color}},
+    ]
+    return spec
+
+
+def heatmap_spec(matrix, title=None, fmt='.2f'):
+    data = matrix.rename_axis(index='row').reset_index().melt(id_vars='row', var_name='col', value_name='value')
+    data = data.dropna(subset=['value'])
+    order = [str(c) for c in matrix.columns]
+
+    enc = {
+        'x': {'field': 'col', 'type': 'nominal', 'sort': order, 'title': None},
+        'y': {'field': 'row', 'type': 'nominal', 'sort': order, 'title': None},
+    }
+    spec = _base(title, _records(data), height=360)
+    spec['layer'] = [
+        {'mark': 'rect',
+         'encoding': dict(enc, color={'field': 'value', 'type': 'quantitative',
+                                      'scale': {'scheme': 'redblue', 'reverse': True, 'domain': [-1, 1]}})},
+        {'mark': {'type': 'text'},
+         'encoding': dict(enc, text={'field': 'value', 'type': 'quantitative', 'format': fmt})},
+    ]
+    return spec
+
+
+def scatter_spec(df, x, y, color=None, title=None, rules=None, max_points=VEGA_MAX_POINTS, opacity=0.6):
+    # 행이 밀도 모드 기준보다 많으면 점 대신 격자 밀도로 보낸다
+    if use_density(len(df)):
+        return density_spec(df, x, y, color=color, title=title, rules=rules)
+
+    cols = [x, y] + ([color] if color else [])
+    sample = downsample(df[cols], max_points=max_points, by=color)
+    data = sample.copy()
+    if color:
+        data[color] = data[color].astype(str)
+
+    enc = {
+        'x': {'field': x, 'type': 'quantitative'},
+        'y': {'field': y, 'type': 'quantitative'},
+    }
+    if color:
+        enc['color'] = {'field': color, 'type': 'nominal'}
+
+    spec = _base(title, _records(data))
+    spec['layer'] = [{'mark': {'type': 'circle', 'opacity': opacity}, 'encoding': enc}] + _rules(rules)
+    if len(sample) < len(df):
+        spec['title'] = f"{title or ''} (표본 {len(sample):,} / {len(df):,})".strip()
+    return spec
+
+
+def density_spec(df, x, y, color=None, title=None, rules=None, bins=VEGA_DENSITY_BINS):
+    # 격자마다 가장 많은 그룹의 색 + 전체 고객 수(로그)를 투명도로 표시
+    xedges, yedges, grids = density_layers(df[x], df[y], df[color] if color else None,
+                                           bins=bins, sigma=0)
+    labels = list(grids)
+    stack = np.stack([grids[label] for label in labels])
+    total = stack.sum(axis=0)
+    xi, yi = np.nonzero(total)
+
+    data = pd.DataFrame({
+        x: xedges[xi], 'x_end': xedges[xi + 1],
+        y: yedges[yi], 'y_end': yedges[yi + 1],
+        'group': [str(labels[k]) for k in stack[:, xi, yi].argmax(axis=0)],
+        'count': total[xi, yi],
+    })
+    data['log_count'] = np.log1p(data['count'])
+
+    enc = {
+        'x': {'field': x, 'type': 'quantitative'}, 'x2': {'field': 'x_end'},
+        'y': {'field': y, 'type': 'quantitative'}, 'y2': {'field': 'y_end'},
+        'opacity': {'field': 'log_count', 'type': 'quantitative', 'legend': None},
+        'tooltip': [{'field': 'count', 'type': 'quantitative', 'title': '고객 수'}],
+    }
+    if color:
+        enc['color'] = {'field': 'group', 'type': 'nominal', 'title': color}
+        enc['tooltip'].insert(0, {'field': 'group', 'title': color})
+
+    spec = _base(f"{title or ''} (밀도, {len(df):,}명)".strip(), _records(data))
+    spec['layer'] = [{'mark': 'rect', 'encoding': enc}] + _rules(rules)
+    return spec
+
+
+def pie_spec(labels, values, title=None):
+    values = np.asarray(values, dtype=np.float64)
+    data = _records(pd.DataFrame({'label': list(labels), 'value': values,
+                                  'pct': values / values.sum()}))
+    spec = _base(title, data, width=None)
+    spec['mark'] = {'type': 'arc', 'tooltip': True}
+    spec['encoding'] = {
+        'theta': {'field': 'value', 'type': 'quantitative'},
+        'color': {'field': 'label', 'type': 'nominal', 'sort': None, 'title': None},
+        'tooltip': [{'field': 'label'}, {'field': 'pct', 'format': '.1%'}],
+    }
+    return spec
+
+
+def box_spec(df, group, value, title=None, y_title=None):
+    # 박스플롯 통계(사분위, 1.5 IQR 수염)를 서버에서 미리 계산해서 그룹당 한 행만 보낸다
+    q = df.groupby(group, observed=True)[value].quantile([0.25, 0.5, 0.75]).unstack()
+    q.columns = ['q1', 'median', 'q3']
+    merged = df[[group, value]].join(q, on=group)
+    iqr = merged['q3'] - merged['q1']
+    inside = merged[(merged[value] >= merged['q1'] - 1.5 * iqr) &
+                    (merged[value] <= merged['q3'] + 1.5 * iqr)]
+    whisk = inside.groupby(group, observed=True)[value].agg(lower='min', upper='max')
+    stats = q.join(whisk).reset_index()
+    stats[group] = stats[group].astype(str)
+
+    x = {'field': group, 'type': 'nominal', 'title': None, 'axis': {'labelAngle': 0}}
+    spec = _base(title, _records(stats))
+    spec['layer'] = [
+        {'mark': 'rule', 'encoding': {'x': x, 'y': {'field': 'lower', 'type': 'quantitative', 'title': y_title},
+                                      'y2': {'field': 'upper'}}},
+        {'mark': {'type': 'bar', 'size': 40}, 'encoding': {'x': x, 'y': {'field': 'q1', 'type': 'quantitative'},
+                                                           'y2': {'field': 'q3'}, 'color': {'field': group, 'legend': None}}},
+        {'mark': {'type': 'tick', 'color': 'white', 'size': 40}, 'encoding': {'x': x, 'y': {'field': 'median', 'type': 'quantitative'}}},
+    ]
+    return spec
+
+
+def bar_line_spec(x, bars, line, title=None, bar_title=None, line_title=None, bar_domain=None, line_domain=None):
+    # 막대 + 선 (y축 두 개)
+    data = _records(pd.DataFrame({'x': list(x), 'bar': list(bars), 'line': list(line)}))
+    x_enc = {'field': 'x', 'type': 'ordinal', 'sort': None, 'title': None, 'axis': {'labelAngle': 0}}
+
+    bar_y = {'field': 'bar', 'type': 'quantitative', 'title': bar_title}
+    line_y = {'field': 'line', 'type': 'quantitative', 'title': line_title}
+    if bar_domain is not None:
+        bar_y['scale'] = {'domain': list(bar_domain)}
+    if line_domain is not None:
+        line_y['scale'] = {'domain': list(line_domain)}
+
+    spec = _base(title, data)
+    spec['layer'] = [
+        {'mark': {'type': 'bar', 'color': '#000000', 'opacity': 0.7}, 'encoding': {'x': x_enc, 'y': bar_y}},
+        {'mark': {'type': 'line', 'color': '#E50914', 'point': True, 'strokeWidth': 3},
+         'encoding': {'x': x_enc, 'y': line_y}},
+    ]
+    spec['resolve'] = {'scale': {'y': 'independent'}}
+    return spec
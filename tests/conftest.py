@@ -0,0 +1,19 @@
+# module/ 안의 파일들은 서로를 같은 폴더 모듈로 import한다 (streamlit run module/project.py와 같은 방식)
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'module'))
+
+from churn_data import CHURN_CSV  # noqa: E402
+
+
+@pytest.fixture
+def churn_csv(tmp_path):
+    # 저장소의 CSV 복사본 (스냅샷 / data/.cache 결과물이 tmp_path 안에만 생기도록)
+    path = tmp_path / os.path.basename(CHURN_CSV)
+    shutil.copy(os.path.join(ROOT, CHURN_CSV), path)
+    return str(path)
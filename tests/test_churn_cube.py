@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_cube import PRICE_BINS, PRICE_LABELS, VIEWING_LABELS, ChurnCube, load_cube
+from churn_data import load_churn
+
+
+def groupby_rates(df):
+    # 큐브 이전 reason 페이지의 qcut / cut / groupby 그대로
+    df = df.assign(이탈여부=df['Churn'])
+    df['3개월구간'] = np.where(df['AccountAge'] <= 3, '3개월 이전', '3개월 이후')
+    df['시청구간'] = pd.qcut(df['ViewingHoursPerWeek'], 5, labels=VIEWING_LABELS)
+    df['요금제'] = pd.cut(df['MonthlyCharges'], bins=PRICE_BINS, labels=PRICE_LABELS)
+    return {dim: df.groupby(dim, observed=False)['이탈여부'].mean()
+            for dim in ('3개월구간', '시청구간', '요금제')}
+
+
+def assert_rates_equal(cube, expected):
+    for dim, rate in expected.items():
+        got = cube.rate_by(dim)
+        assert list(got.index) == list(rate.index.astype(str))
+        np.testing.assert_allclose(got.to_numpy(), rate.to_numpy(dtype=np.float64))
+
+
+def test_rates_match_groupby_on_dataset(churn_csv):
+    df = load_churn(churn_csv)
+    assert_rates_equal(load_cube(churn_csv), groupby_rates(df))
+
+
+def test_bin_edges_and_missing_values():
+    # 시청 시간은 정수라 분위 경계와 같은 값이 많고, 요금은 구간 경계값 / 범위 밖 / 결측을 포함
+    rng = np.random.default_rng(3)
+    n = 2000
+    charges = rng.choice([0, 5, 12, 12.01, 17, 20, 25, 30, np.nan], n)
+    viewing = rng.integers(0, 41, n).astype(float)
+    viewing[::97] = np.nan
+    df = pd.DataFrame({
+        'AccountAge': rng.integers(1, 12, n),
+        'ViewingHoursPerWeek': viewing,
+        'MonthlyCharges': charges,
+        'SubscriptionType': rng.choice(['Basic', 'Standard', 'Premium'], n),
+        'Churn': rng.integers(0, 2, n),
+    })
+    assert_rates_equal(ChurnCube.build(df), groupby_rates(df))
+
+
+def test_select_plan_matches_subset(churn_csv):
+    df = load_churn(churn_csv)
+    cube = load_cube(churn_csv)
+    subset = df[df['SubscriptionType'] == 'Premium']
+    # 분위 경계는 전체 데이터 기준이므로 시청구간은 빼고 비교
+    expected = groupby_rates(subset)
+    del expected['시청구간']
+    assert_rates_equal(cube.select(SubscriptionType='Premium'), expected)
+
+
+def test_saved_cube_round_trips(tmp_path, churn_csv):
+    cube = load_cube(churn_csv)
+    cube.save(str(tmp_path / 'cube.npz'))
+    loaded = ChurnCube.load(str(tmp_path / 'cube.npz'))
+    assert loaded.labels == cube.labels
+    np.testing.assert_array_equal(loaded.counts, cube.counts)
+    np.testing.assert_array_equal(loaded.viewing_edges, cube.viewing_edges)
+    pd.testing.assert_series_equal(loaded.rate_by('요금제'), cube.rate_by('요금제'))
+
+
+def test_unknown_plan_raises(churn_csv):
+    with pytest.raises(ValueError):
+        load_cube(churn_csv).select(SubscriptionType='Platinum')
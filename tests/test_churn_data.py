@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import churn_data
+from churn_data import load_churn
+from features import feature_frame
+from plan_index import filtered_frame
+
+
+@pytest.fixture(params=['arrow', 'csv'])
+def shared_frame(request, churn_csv, monkeypatch):
+    if request.param == 'csv':
+        monkeypatch.setattr(churn_data, '_pyarrow', lambda: None)
+    elif churn_data._pyarrow() is None:
+        pytest.skip('pyarrow 없음')
+    return load_churn(churn_csv)
+
+
+@pytest.mark.parametrize('column, value', [
+    ('AccountAge', 99),
+    ('MonthlyCharges', 1.5),
+    ('SubscriptionType', 'Premium'),
+    ('PaperlessBilling', False),
+])
+def test_shared_frame_rejects_writes(shared_frame, column, value):
+    before = shared_frame.head().copy()
+    with pytest.raises(ValueError, match='read-only'):
+        shared_frame.loc[0, column] = value
+    pd.testing.assert_frame_equal(shared_frame.head(), before)
+
+
+def test_copies_stay_writable(shared_frame):
+    df = shared_frame.copy()
+    df.loc[0, 'AccountAge'] = 99
+    assert df.loc[0, 'AccountAge'] == 99
+    assert shared_frame.loc[0, 'AccountAge'] != 99
+
+
+def test_cached_filtered_and_feature_frames_are_read_only(churn_csv):
+    for df in (filtered_frame(churn_csv, 'Basic'), feature_frame(churn_csv, ('장기고객',), plan='Basic')):
+        with pytest.raises(ValueError, match='read-only'):
+            df.loc[0, 'AccountAge'] = 99
+    with pytest.raises(ValueError, match='read-only'):
+        feature_frame(churn_csv, ('장기고객',)).loc[0, '장기고객'] = False
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from churn_data import load_churn
+
+pytest.importorskip('sklearn')
+from churn_model import append_rows  # noqa: E402
+
+# 모델 입력 변수 + Churn + 결측 없이 읽는 정수 컬럼만 있는 행 (나머지 컬럼은 빈 값으로 쓰인다)
+PARTIAL_ROW = {
+    'AccountAge': 3,
+    'ViewingHoursPerWeek': 12.5,
+    'SupportTicketsPerMonth': 2,
+    'MonthlyCharges': 9.99,
+    'ContentDownloadsPerMonth': 4,
+    'WatchlistSize': 10,
+    'Churn': 1,
+}
+
+
+def test_partial_row_is_appended_and_file_reloads(churn_csv):
+    before = len(load_churn(churn_csv))
+    append_rows(pd.DataFrame([PARTIAL_ROW]), churn_csv)
+
+    df = load_churn(churn_csv)
+    assert len(df) == before + 1
+    assert df['AccountAge'].dtype == 'int16'
+    assert df.iloc[-1]['AccountAge'] == 3
+    assert pd.isna(df.iloc[-1]['TotalCharges'])
+
+
+@pytest.mark.parametrize('row', [
+    {k: v for k, v in PARTIAL_ROW.items() if k != 'AccountAge'},
+    {**PARTIAL_ROW, 'AccountAge': None},
+])
+def test_row_without_account_age_is_rejected(churn_csv, row):
+    with open(churn_csv, 'rb') as f:
+        original = f.read()
+    with pytest.raises(ValueError, match='AccountAge'):
+        append_rows(pd.DataFrame([row]), churn_csv)
+
+    with open(churn_csv, 'rb') as f:
+        assert f.read() == original
+    load_churn(churn_csv)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from density import density_layers, plot_density
+
+
+def test_counts_each_layer_on_shared_grid():
+    x = np.array([0.0, 1.0, 1.0, 2.0, np.nan])
+    y = np.array([0.0, 1.0, 1.0, 2.0, 1.0])
+    xedges, yedges, grids = density_layers(x, y, ['a', 'b', 'b', 'a', 'a'], bins=4, sigma=0)
+    assert xedges[0] == 0 and xedges[-1] == 2 and len(yedges) == 5
+    assert list(grids) == ['a', 'b']
+    assert grids['a'].sum() == 2 and grids['b'].sum() == 2
+
+
+@pytest.mark.parametrize('x, y', [
+    ([], []),
+    ([np.nan, np.nan], [1.0, 2.0]),
+])
+def test_empty_selection_has_no_layers(x, y):
+    xedges, yedges, grids = density_layers(x, y, ['a'] * len(x))
+    assert grids == {} and len(xedges) == 0 and len(yedges) == 0
+
+    ax = object()
+    assert plot_density(ax, xedges, yedges, grids) is ax
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_cube import PRICE_BINS, PRICE_LABELS, VIEWING_LABELS
+from churn_data import load_churn
+from features import FEATURES, derived, feature, feature_frame
+from plan_index import filtered_frame
+
+REASON_COLUMNS = ('가입기간', '이탈여부', '장기고객', '고객유형', '3개월구간', '시청구간', '요금제')
+
+
+def old_reason_columns(df):
+    # 레지스트리 이전 reason 페이지가 매 rerun마다 df에 붙이던 컬럼
+    df = df.copy()
+    df['가입기간'] = df['AccountAge']
+    df['이탈여부'] = df['Churn']
+    df['장기고객'] = df['가입기간'] >= 6
+    df['고객유형'] = np.where(df['장기고객'], '장기 고객', '초기 이탈 고객')
+    df['3개월구간'] = np.where(df['가입기간'] <= 3, '3개월 이전', '3개월 이후')
+    df['시청구간'] = pd.qcut(df['ViewingHoursPerWeek'], 5, labels=VIEWING_LABELS)
+    df['요금제'] = pd.cut(df['MonthlyCharges'], bins=PRICE_BINS, labels=PRICE_LABELS)
+    return df
+
+
+def test_reason_columns_match_old_page(churn_csv):
+    got = feature_frame(churn_csv, REASON_COLUMNS)
+    old = old_reason_columns(load_churn(churn_csv))
+    for name in REASON_COLUMNS:
+        assert got[name].astype(str).tolist() == old[name].astype(str).tolist(), name
+
+
+def test_filtered_columns_keep_full_data_bands(churn_csv):
+    # 필터한 행도 시청 5분위 경계는 전체 데이터 기준 → 전체에서 계산한 값을 행만 골라낸 것과 같다
+    full = feature_frame(churn_csv, ('시청구간', '고객유형'))
+    part = feature_frame(churn_csv, ('시청구간', '고객유형'), plan='Premium')
+    keep = (full['SubscriptionType'] == 'Premium').to_numpy()
+    assert part['시청구간'].astype(str).tolist() == full.loc[keep, '시청구간'].astype(str).tolist()
+    assert part['고객유형'].tolist() == full.loc[keep, '고객유형'].tolist()
+    assert len(part) == len(filtered_frame(churn_csv, 'Premium'))
+
+
+def test_columns_are_computed_once_and_shared(churn_csv):
+    assert derived('장기고객', churn_csv) is derived('장기고객', churn_csv)
+    frame = feature_frame(churn_csv, ('가입기간', '장기고객'))
+    assert frame is feature_frame(churn_csv, ('가입기간', '장기고객'))
+    # 원본 프레임에는 컬럼이 붙지 않는다
+    assert '장기고객' not in load_churn(churn_csv).columns
+
+
+def test_params_only_split_the_columns_that_use_them(churn_csv):
+    calls = []
+
+    @feature('_test_scaled', 'AccountAge', params=('scale',))
+    def _scaled(age, scale=1):
+        calls.append(scale)
+        return age * scale
+
+    @feature('_test_scaled_plus_one', '_test_scaled')
+    def _plus_one(scaled):
+        return scaled + 1
+
+    try:
+        age = load_churn(churn_csv)['AccountAge']
+        frame = feature_frame(churn_csv, ('_test_scaled_plus_one', '장기고객'), scale=3)
+        np.testing.assert_array_equal(frame['_test_scaled_plus_one'], age * 3 + 1)
+        np.testing.assert_array_equal(frame['장기고객'], age >= 6)
+        # 의존 컬럼은 같은 캐시에서 꺼내므로 다시 계산하지 않는다
+        derived('_test_scaled', churn_csv, scale=3)
+        assert calls == [3]
+    finally:
+        FEATURES.pop('_test_scaled', None)
+        FEATURES.pop('_test_scaled_plus_one', None)
+
+
+def test_unknown_column_raises(churn_csv):
+    with pytest.raises(KeyError):
+        feature_frame(churn_csv, ('가입기간', 'no_such_column'))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpi import customer_months, empty_state, load_kpi, update_kpi
+
+
+def brute_force(signup, churn):
+    # 달마다 고객 전체를 다시 훑는 정의 그대로의 계산
+    rows = []
+    prev = 0
+    for m in range(signup.min(), max(signup.max(), churn.max()) + 1):
+        active = (signup <= m) & ((churn < 0) | (churn > m))
+        churned = np.count_nonzero(churn == m)
+        rows.append({
+            'Subscribers': int(active.sum()),
+            'Retention': round(float((m - signup[active]).mean()), 2) if active.any() else 0.0,
+            'Churn_Rate': round(churned / prev * 100, 2) if prev else 0.0,
+        })
+        prev = int(active.sum())
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def customers():
+    rng = np.random.default_rng(19)
+    signup = rng.integers(24_000, 24_036, 3000)
+    lifetime = rng.integers(1, 30, 3000)
+    churn = np.where(rng.random(3000) < 0.4, signup + lifetime, -1)
+    churn[churn > 24_040] = -1
+    return signup, churn
+
+
+def test_one_pass_matches_month_by_month_loop(customers):
+    signup, churn = customers
+    state = update_kpi(empty_state('dates'), signup, churn)
+    got = pd.DataFrame(state['rows'])[['Subscribers', 'Retention', 'Churn_Rate']]
+    pd.testing.assert_frame_equal(got, brute_force(signup, churn), check_dtype=False)
+
+
+def test_appending_new_months_equals_full_recompute(customers):
+    signup, churn = customers
+    cut = 24_020
+    # cut 달까지 보였던 데이터: 그 뒤 가입자는 없고, 그 뒤 이탈은 아직 일어나지 않음
+    seen = signup <= cut
+    before = update_kpi(empty_state('dates'), signup[seen], np.where(churn[seen] > cut, -1, churn[seen]))
+    assert before['last_month'] == cut
+
+    incremental = update_kpi(before, signup, churn)
+    full = update_kpi(empty_state('dates'), signup, churn)
+    assert incremental['rows'] == full['rows']
+    assert incremental['totals'] == pytest.approx(full['totals'])
+
+
+def test_no_new_months_leaves_state_alone(customers):
+    signup, churn = customers
+    state = update_kpi(empty_state('dates'), signup, churn)
+    assert update_kpi(state, signup, churn) is state
+
+
+def test_snapshot_months_are_inferred_from_account_age():
+    df = pd.DataFrame({'AccountAge': [1, 5, 12], 'Churn': [0, 1, 0]})
+    signup, churn, inferred = customer_months(df, as_of='2025-12')
+    end = 2025 * 12 + 11
+    assert inferred
+    assert signup.tolist() == [end - 1, end - 5, end - 12]
+    assert churn.tolist() == [-1, end, -1]
+
+
+def test_growth_rate_and_window(churn_csv):
+    frame, inferred = load_kpi(churn_csv, months=6)
+    assert inferred and len(frame) == 6
+    growth = frame['Subscribers'] / frame['Prev_Subscribers'] * 100 - 100
+    np.testing.assert_allclose(frame['Growth_Rate'], growth)
+    # 두 번째 호출은 data/.cache 에 저장된 상태를 읽는다
+    again, _ = load_kpi(churn_csv, months=6)
+    pd.testing.assert_frame_equal(frame, again)
@@ -0,0 +1,28 @@
+import pytest
+
+from churn_data import load_churn
+from ltv_projection import STRATEGIES, build_cohort_table, project
+
+
+@pytest.fixture
+def churn_df(churn_csv):
+    return load_churn(churn_csv)
+
+
+def test_strategies_lower_churn_and_raise_ltv(churn_df):
+    table = build_cohort_table(churn_df)
+    reductions = {name: default / 100 for name, (_, _, default) in STRATEGIES.items()}
+    outlook = project(table, reductions)
+    assert outlook['after']['churn'] < outlook['before']['churn']
+    assert outlook['months_gain'] > 0 and outlook['ltv_gain'] > 0
+
+    assert project(table, {})['ltv_gain'] == pytest.approx(0)
+    winback = project(table, {}, winback=0.1)
+    assert winback['winback_customers'] == pytest.approx(churn_df['Churn'].sum() * 0.1)
+    assert winback['ltv_gain'] == pytest.approx(winback['winback_share'])
+
+
+@pytest.mark.parametrize('rows', ['churned', 'none'])
+def test_no_active_customers_gives_no_outlook(churn_df, rows):
+    df = churn_df[churn_df['Churn'] == 1] if rows == 'churned' else churn_df.iloc[:0]
+    assert project(build_cohort_table(df), {}, winback=0.1) is None
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_data import load_churn
+from plan_index import filtered_frame, is_filtered, plan_rows
+
+
+@pytest.fixture(scope='module')
+def dated_csv(tmp_path_factory):
+    # 가입 / 이탈 월이 있는 데이터 (결측 요금제, 결측 가입 월 포함)
+    rng = np.random.default_rng(20)
+    n = 4000
+    signup = pd.Period('2023-01', 'M') + rng.integers(0, 30, n)
+    churn = [str(s + int(k)) if c else '' for s, k, c in zip(signup, rng.integers(1, 12, n), rng.random(n) < 0.3)]
+    df = pd.DataFrame({
+        'SubscriptionType': rng.choice(['Basic', 'Standard', 'Premium', None], n, p=[0.4, 0.3, 0.25, 0.05]),
+        'SignupMonth': [str(s) for s in signup],
+        'ChurnMonth': churn,
+        'AccountAge': rng.integers(1, 40, n),
+        'Churn': [int(bool(c)) for c in churn],
+    })
+    df.loc[::500, 'SignupMonth'] = ''
+    path = tmp_path_factory.mktemp('dated') / 'dated.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def month_of(values):
+    months = pd.to_datetime(pd.Series(values), errors='coerce')
+    return (months.dt.year * 12 + months.dt.month - 1).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def expected_rows(df, plan, month):
+    keep = np.ones(len(df), dtype=bool)
+    if plan is not None:
+        keep &= (df['SubscriptionType'] == plan).to_numpy()
+    if month is not None:
+        signup, churn = month_of(df['SignupMonth']), month_of(df['ChurnMonth'])
+        keep &= (signup <= month) & ((churn < 0) | (churn >= month))
+    return np.flatnonzero(keep)
+
+
+@pytest.mark.parametrize('plan', [None, 'Basic', 'Premium', 'Platinum'])
+@pytest.mark.parametrize('month', [None, 2023 * 12, 2024 * 12 + 5, 2026 * 12])
+def test_rows_match_boolean_mask(dated_csv, plan, month):
+    df = load_churn(dated_csv)
+    rows = plan_rows(dated_csv, plan, month)
+    expected = expected_rows(df, plan, month)
+    if len(expected) == len(df):
+        assert rows is None and not is_filtered(dated_csv, plan, month)
+    else:
+        assert rows.tolist() == expected.tolist()
+        pd.testing.assert_frame_equal(filtered_frame(dated_csv, plan, month),
+                                      df.take(expected).reset_index(drop=True))
+
+
+def test_plan_filter_on_snapshot_data(churn_csv):
+    df = load_churn(churn_csv)
+    frame = filtered_frame(churn_csv, 'Standard')
+    assert len(frame) == (df['SubscriptionType'] == 'Standard').sum()
+    assert (frame['SubscriptionType'] == 'Standard').all()
+    assert filtered_frame(churn_csv) is df
+
+
+def test_filtered_frames_are_cached(dated_csv):
+    assert filtered_frame(dated_csv, 'Basic', 2024 * 12) is filtered_frame(dated_csv, 'Basic', 2024 * 12)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_data import load_churn
+from policy_sim import converted_mask, monte_carlo_policy, simulate_policy, sweep_policy
+
+
+def old_page_policy(df, frac=0.4, max_tenure=3, cutoff=10, seed=42):
+    # mask로 바꾸기 전 페이지 코드: 위험군에서 sample → 복사본의 가입기간을 6으로 덮어쓰기
+    risk_group = df[(df['AccountAge'] <= max_tenure) & (df['ViewingHoursPerWeek'] < cutoff)].copy()
+    baseline = (risk_group['AccountAge'] >= 6).mean()
+    converted_idx = risk_group.sample(frac=frac, random_state=seed).index
+    df_sim = df.copy()
+    df_sim.loc[converted_idx, 'AccountAge'] = 6
+    improved = (df_sim.loc[risk_group.index, 'AccountAge'] >= 6).mean()
+    return baseline, improved
+
+
+@pytest.mark.parametrize('n, frac', [(1, 0.4), (10, 0.15), (333, 0.4), (1000, 1.0), (50, 0.0)])
+def test_converted_mask_is_pandas_sample(n, frac):
+    sampled = pd.Series(range(n)).sample(frac=frac, random_state=42)
+    assert np.flatnonzero(converted_mask(n, frac)).tolist() == sorted(sampled.tolist())
+
+
+def test_simulate_policy_matches_old_page(churn_csv):
+    df = load_churn(churn_csv)
+    result = simulate_policy(df['AccountAge'], df['ViewingHoursPerWeek'])
+    assert result == pytest.approx(old_page_policy(df))
+
+
+def test_sweep_rows_match_old_page_scenarios(churn_csv):
+    df = load_churn(churn_csv)
+    result = sweep_policy(df['AccountAge'], df['ViewingHoursPerWeek'], fracs=[0.2, 0.4, 0.8],
+                          max_tenures=[3, 9], viewing_cutoffs=[5, 10, 30], seed=7)
+    assert len(result) == 18
+    for row in result.itertuples():
+        expected = old_page_policy(df, row.frac, row.max_tenure, row.viewing_cutoff, seed=7)
+        assert (row.baseline, row.improved) == pytest.approx(expected)
+        assert row.lift == pytest.approx(expected[1] - expected[0])
+
+
+def test_empty_risk_group_gives_nan():
+    result = sweep_policy([10, 12], [1.0, 2.0])
+    assert result['eligible'].tolist() == [0]
+    assert np.isnan(result['improved']).all()
+
+
+def test_monte_carlo_mean_is_expected_lift(churn_csv):
+    df = load_churn(churn_csv)
+    tenure, viewing = df['AccountAge'], df['ViewingHoursPerWeek']
+    result = monte_carlo_policy(tenure, viewing, fracs=[0.2, 0.4], max_tenures=[9], n_reps=50_000)
+
+    risk = (tenure <= 9) & (viewing < 10)
+    kept = (tenure[risk] >= 6).mean()
+    assert result['baseline'].to_numpy() == pytest.approx([kept, kept], abs=0.002)
+    assert result['improved'].to_numpy() == pytest.approx(kept + np.array([0.2, 0.4]) * (1 - kept), abs=0.002)
+    assert (result['lift_lower'] < result['lift']).all() and (result['lift'] < result['lift_upper']).all()
+
+
+def test_monte_carlo_interval_matches_pandas_resampling(churn_csv):
+    # 반복마다 위험군을 복원 추출하고 고객마다 frac 확률로 전환하는 pandas 버전과 분포 비교
+    df = load_churn(churn_csv)
+    risk_group = df[(df['AccountAge'] <= 9) & (df['ViewingHoursPerWeek'] < 10)]
+    rng = np.random.RandomState(0)
+    improved = []
+    for _ in range(3000):
+        boot = risk_group.sample(frac=1, replace=True, random_state=rng)
+        kept = boot['AccountAge'].to_numpy() >= 6
+        improved.append((kept | (rng.random_sample(len(boot)) < 0.4)).mean())
+    lower, upper = np.quantile(improved, [0.025, 0.975])
+
+    row = monte_carlo_policy(df['AccountAge'], df['ViewingHoursPerWeek'], fracs=[0.4], max_tenures=[9],
+                             n_reps=20_000).iloc[0]
+    assert row['improved'] == pytest.approx(np.mean(improved), abs=0.005)
+    assert row['improved_lower'] == pytest.approx(lower, abs=0.015)
+    assert row['improved_upper'] == pytest.approx(upper, abs=0.015)
+
+
+def test_process_pool_gives_same_draws(churn_csv):
+    df = load_churn(churn_csv)
+    args = (df['AccountAge'], df['ViewingHoursPerWeek'])
+    kwargs = dict(fracs=[0.4], max_tenures=[3, 6, 9], viewing_cutoffs=[10, 20], n_reps=1000)
+    pd.testing.assert_frame_equal(monte_carlo_policy(*args, **kwargs),
+                                  monte_carlo_policy(*args, workers=2, **kwargs))
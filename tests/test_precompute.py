@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import precompute
+from churn_data import artifact_path
+from precompute import FAILED_NAME, LOCK_NAME, ensure_precomputed, has_failed, start_worker
+
+
+@pytest.fixture
+def broken_csv(tmp_path):
+    path = tmp_path / 'broken.csv'
+    path.write_text('AccountAge,Churn\n1,0\n2,1\n', encoding='utf-8')
+    return str(path)
+
+
+def test_failed_worker_reports_and_records_failure(broken_csv):
+    result = subprocess.run([sys.executable, precompute.__file__, broken_csv],
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 1
+    assert 'Traceback' in result.stderr
+    assert not os.path.exists(artifact_path(broken_csv, LOCK_NAME))
+    assert os.path.exists(artifact_path(broken_csv, FAILED_NAME))
+    assert has_failed(broken_csv)
+
+
+def test_recorded_failure_is_not_retried(broken_csv, monkeypatch):
+    precompute._mark_failed(broken_csv, 'boom')
+
+    def popen(*args, **kwargs):
+        raise AssertionError('워커를 다시 띄우면 안 된다')
+    monkeypatch.setattr(subprocess, 'Popen', popen)
+    assert ensure_precomputed(broken_csv, timeout=1) is False
+
+
+def test_one_worker_per_data_version(broken_csv, monkeypatch):
+    class Finished:
+        pid = -1
+
+        def poll(self):
+            return 1
+    spawned = []
+    monkeypatch.setattr(subprocess, 'Popen', lambda *a, **k: spawned.append(1) or Finished())
+    monkeypatch.setattr(precompute, '_workers', {})
+
+    # 워커가 manifest 없이 끝나고 잠금도 사라져도 같은 버전에서는 다시 띄우지 않는다
+    assert ensure_precomputed(broken_csv, timeout=1) is False
+    os.remove(artifact_path(broken_csv, LOCK_NAME))
+    assert ensure_precomputed(broken_csv, timeout=1) is False
+    assert start_worker(broken_csv) is None
+    assert spawned == [1]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recency_risk import RECENCY_MIDPOINT, RECENCY_SLOPE, churn_curve, fit_curve, recency_frame, simulate
+
+
+def test_simulate_reproduces_old_scatter():
+    # 벡터화 이전 페이지: 전역 seed를 걸고 점마다 churn_prob(day)를 불러 노이즈를 하나씩 뽑았다
+    np.random.seed(42)
+    recency_days = np.random.randint(1, 31, 200)
+
+    def churn_prob(day):
+        base_prob = 1 / (1 + np.exp(-(day - 8) * 0.4))
+        noise = np.random.normal(0, 0.05)
+        return np.clip((base_prob + noise) * 100, 0, 100)
+
+    old = pd.DataFrame({'Recency': recency_days, 'ChurnProb': [churn_prob(d) for d in recency_days]})
+    pd.testing.assert_frame_equal(simulate(), old, check_dtype=False)
+
+
+def test_default_curve_shape():
+    # 기본 곡선: 8일에 50%, 레드라인(14일)에서는 90%를 넘는다
+    assert churn_curve(RECENCY_MIDPOINT) == pytest.approx(0.5)
+    assert churn_curve(7) == pytest.approx(0.401, abs=0.001)
+    assert churn_curve(14) == pytest.approx(0.917, abs=0.001)
+
+
+def test_fit_matches_row_level_logistic_regression():
+    linear_model = pytest.importorskip('sklearn.linear_model')
+    rng = np.random.default_rng(5)
+    days = rng.integers(0, 31, 40_000).astype(float)
+    churned = (rng.random(len(days)) < churn_curve(days, 11, 0.25)).astype(float)
+
+    model = linear_model.LogisticRegression(C=np.inf, tol=1e-10, max_iter=1000).fit(days[:, None], churned)
+    midpoint, slope = fit_curve(days, churned)
+    assert slope == pytest.approx(model.coef_[0, 0], rel=1e-4)
+    assert midpoint == pytest.approx(-model.intercept_[0] / model.coef_[0, 0], rel=1e-4)
+
+
+def test_recency_frame_fits_real_column_and_skips_missing():
+    rng = np.random.default_rng(8)
+    days = rng.integers(0, 31, 100_000).astype(float)
+    churn = (rng.random(len(days)) < churn_curve(days)).astype(float)
+    days[::40] = np.nan
+    df = pd.DataFrame({'DaysSinceLastLogin': days, 'Churn': churn})
+
+    frame, (midpoint, slope) = recency_frame(df)
+    assert len(frame) == np.count_nonzero(~np.isnan(days))
+    assert midpoint == pytest.approx(RECENCY_MIDPOINT, abs=0.25)
+    assert slope == pytest.approx(RECENCY_SLOPE, abs=0.02)
+    assert frame['ChurnProb'].between(0, 100).all()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_data import load_churn
+from survival import km_curves
+
+lifelines = pytest.importorskip('lifelines')
+
+
+def lifelines_fit(durations, events):
+    kmf = lifelines.KaplanMeierFitter().fit(durations, events)
+    frame = pd.concat([kmf.survival_function_, kmf.confidence_interval_], axis=1)
+    frame.columns = ['survival', 'ci_lower', 'ci_upper']
+    return frame
+
+
+def check_against_lifelines(curve, durations, events):
+    expected = lifelines_fit(durations, events)
+    # lifelines는 관측이 없는 0 시점도 넣는다
+    got = curve.reindex(expected.index)
+    assert not got.isna().any().any()
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_hand_computed_curve():
+    # t=1: 5명 중 1명 이탈, t=2: 4명 중 1명 이탈 + 1명 중도절단, t=3: 2명 중 2명 이탈
+    curve = km_curves([1, 2, 2, 3, 3], [1, 0, 1, 1, 1])['KM_estimate']
+    np.testing.assert_allclose(curve['survival'], [1.0, 0.8, 0.6, 0.0])
+    assert list(curve.index) == [0.0, 1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize('by', ['SubscriptionType', 'long_term'])
+def test_groups_match_separate_lifelines_fits(churn_csv, by):
+    df = load_churn(churn_csv)
+    groups = df['AccountAge'] >= 6 if by == 'long_term' else df[by]
+    curves = km_curves(df['AccountAge'], df['Churn'], groups)
+    for key, part in df.groupby(groups, observed=True):
+        check_against_lifelines(curves[key], part['AccountAge'], part['Churn'])
+
+
+def test_two_level_strata(churn_csv):
+    df = load_churn(churn_csv)
+    long_term = df['AccountAge'] >= 6
+    strata = pd.MultiIndex.from_arrays([df['SubscriptionType'], long_term])
+    curves = km_curves(df['AccountAge'], df['Churn'], strata)
+    for key, part in df.groupby([df['SubscriptionType'], long_term], observed=True):
+        check_against_lifelines(curves[key], part['AccountAge'], part['Churn'])
+
+
+def test_heavy_ties_and_censoring():
+    rng = np.random.default_rng(11)
+    durations = rng.integers(1, 25, 5000)
+    events = rng.random(5000) < 0.2
+    curve = km_curves(durations, events)['KM_estimate']
+    check_against_lifelines(curve, durations, events)